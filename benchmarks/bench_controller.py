@@ -0,0 +1,136 @@
+"""Benchmarks of the setup and the per-step latency of the controllers"""
+import numpy as np
+
+from hilo_mpc import NMPC, LMPC
+
+from .common import MODELS, HORIZONS, get_model, get_linear_model
+
+
+def _get_nmpc(name, horizon):
+    """
+
+    :param name:
+    :param horizon:
+    :return:
+    """
+    model, _, x0, u, p = get_model(name)
+
+    nmpc = NMPC(model)
+    nmpc.horizon = horizon
+    nmpc.quad_stage_cost.add_states(names=model.dynamical_state_names, ref=x0, weights=model.n_x * [1.])
+    nmpc.quad_stage_cost.add_inputs(names=model.input_names, weights=model.n_u * [.1])
+    nmpc.set_initial_guess(x_guess=x0, u_guess=u)
+
+    return nmpc, x0, p
+
+
+class NMPCSetup:
+    """"""
+    params = (MODELS, HORIZONS)
+    param_names = ['model', 'horizon']
+    number = 1
+    repeat = 5
+    timeout = 600
+
+    def setup(self, name, horizon):
+        """
+
+        :param name:
+        :param horizon:
+        :return:
+        """
+        self.nmpc, _, _ = _get_nmpc(name, horizon)
+
+    def time_setup(self, name, horizon):
+        """
+
+        :param name:
+        :param horizon:
+        :return:
+        """
+        self.nmpc.setup(options={'print_level': 0})
+
+    def peakmem_setup(self, name, horizon):
+        """
+
+        :param name:
+        :param horizon:
+        :return:
+        """
+        self.nmpc.setup(options={'print_level': 0})
+
+
+class NMPCOptimize:
+    """"""
+    params = (MODELS, HORIZONS)
+    param_names = ['model', 'horizon']
+    number = 1
+    repeat = 20
+    timeout = 600
+
+    def setup(self, name, horizon):
+        """
+
+        :param name:
+        :param horizon:
+        :return:
+        """
+        self.nmpc, self.x0, self.p = _get_nmpc(name, horizon)
+        self.nmpc.setup(options={'print_level': 0})
+
+    def time_optimize(self, name, horizon):
+        """
+
+        :param name:
+        :param horizon:
+        :return:
+        """
+        self.nmpc.optimize(self.x0, cp=self.p or None)
+
+    def peakmem_optimize(self, name, horizon):
+        """
+
+        :param name:
+        :param horizon:
+        :return:
+        """
+        self.nmpc.optimize(self.x0, cp=self.p or None)
+
+
+class LMPCOptimize:
+    """"""
+    params = ([1, 2, 5], HORIZONS)
+    param_names = ['masses', 'horizon']
+    number = 1
+    repeat = 10
+    timeout = 600
+
+    def setup(self, n_masses, horizon):
+        """
+
+        :param n_masses:
+        :param horizon:
+        :return:
+        """
+        model, x0 = get_linear_model(n_masses)
+
+        lmpc = LMPC(model)
+        lmpc.Q = np.eye(model.n_x)
+        lmpc.R = np.eye(model.n_u)
+        lmpc.horizon = horizon
+        lmpc.set_initial_guess(x_guess=x0, u_guess=model.n_u * [0])
+        lmpc.set_box_constraints(x_lb=model.n_x * [-5], x_ub=model.n_x * [5], u_lb=model.n_u * [-1],
+                                 u_ub=model.n_u * [1])
+        lmpc.setup()
+
+        self.lmpc = lmpc
+        self.x0 = x0
+
+    def time_optimize(self, n_masses, horizon):
+        """
+
+        :param n_masses:
+        :param horizon:
+        :return:
+        """
+        self.lmpc.optimize(x0=self.x0)
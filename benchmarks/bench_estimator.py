@@ -0,0 +1,189 @@
+"""Benchmarks of the setup and the per-step latency of the estimators"""
+import numpy as np
+
+from hilo_mpc import MHE, KF, EKF, UKF, PF
+
+from .common import MODELS, HORIZONS, SAMPLE_SIZES, get_model, get_linear_model, measure
+
+
+class MHEEstimate:
+    """"""
+    params = (MODELS, HORIZONS)
+    param_names = ['model', 'horizon']
+    number = 1
+    repeat = 20
+    timeout = 600
+
+    def setup(self, name, horizon):
+        """
+
+        :param name:
+        :param horizon:
+        :return:
+        """
+        model, _, x0, u, p = get_model(name)
+
+        mhe = MHE(model)
+        mhe.horizon = horizon
+        mhe.quad_arrival_cost.add_states(weights=model.n_x * [10.], guess=x0)
+        mhe.quad_stage_cost.add_measurements(weights=model.n_y * [10.])
+        if p:
+            # Parameters of the model are estimated as well
+            mhe.quad_arrival_cost.add_parameters(weights=model.n_p * [10.], guess=p)
+            mhe.set_box_constraints(x_lb=model.n_x * [0.], p_lb=model.n_p * [-np.inf], p_ub=model.n_p * [np.inf])
+            mhe.set_initial_guess(x_guess=x0, p_guess=p)
+        else:
+            mhe.set_box_constraints(x_lb=model.n_x * [0.])
+            mhe.set_initial_guess(x_guess=x0)
+        mhe.setup(options={'print_level': 0})
+
+        # Fill the horizon, such that every call runs an estimation
+        for _ in range(horizon + 1):
+            y = measure(model, u, p)
+            mhe.add_measurements(y, u_meas=u)
+            mhe.estimate()
+
+        self.mhe = mhe
+        self.u = u
+        self.y = y
+
+    def time_estimate(self, name, horizon):
+        """
+
+        :param name:
+        :param horizon:
+        :return:
+        """
+        self.mhe.add_measurements(self.y, u_meas=self.u)
+        self.mhe.estimate()
+
+
+class _KalmanFilterEstimate:
+    """"""
+    params = MODELS
+    param_names = ['model']
+    number = 1
+    repeat = 50
+    estimator = None
+
+    def setup(self, name):
+        """
+
+        :param name:
+        :return:
+        """
+        model, _, x0, u, p = get_model(name)
+
+        estimator = self.estimator(model)
+        estimator.setup()
+        estimator.R = model.n_y * [.01]
+        estimator.Q = model.n_x * [.01]
+        estimator.set_initial_guess(x0)
+        if p:
+            estimator.set_initial_parameter_values(p)
+
+        self.estimator_ = estimator
+        self.u = u
+        self.y = measure(model, u, p)
+
+    def time_estimate(self, name):
+        """
+
+        :param name:
+        :return:
+        """
+        self.estimator_.estimate(y=self.y, u=self.u)
+
+
+class KFEstimate(_KalmanFilterEstimate):
+    """"""
+    params = [1, 5, 20]
+    param_names = ['masses']
+    estimator = KF
+
+    def setup(self, n_masses):
+        """
+
+        :param n_masses:
+        :return:
+        """
+        model, x0 = get_linear_model(n_masses)
+
+        kf = KF(model)
+        kf.setup()
+        kf.R = model.n_y * [.01]
+        kf.Q = model.n_x * [.01]
+        kf.set_initial_guess(x0)
+
+        self.estimator_ = kf
+        self.u = model.n_u * [0.]
+        self.y = measure(model, self.u, [])
+
+    def time_estimate(self, n_masses):
+        """
+
+        :param n_masses:
+        :return:
+        """
+        self.estimator_.estimate(y=self.y, u=self.u)
+
+
+class EKFEstimate(_KalmanFilterEstimate):
+    """"""
+    estimator = EKF
+
+
+class UKFEstimate(_KalmanFilterEstimate):
+    """"""
+    estimator = UKF
+
+
+class PFEstimate:
+    """"""
+    # NOTE: The particle filter only supports models with two states and one measurement at the moment
+    params = (['cstr_schaffner_and_zeitz'], SAMPLE_SIZES, ['serial', 'numpy'])
+    param_names = ['model', 'samples', 'parallelization']
+    number = 1
+    repeat = 50
+
+    def setup(self, name, n_samples, parallelization):
+        """
+
+        :param name:
+        :param n_samples:
+        :param parallelization:
+        :return:
+        """
+        np.random.seed(0)
+        model, _, x0, u, p = get_model(name, discrete=True)
+
+        pf = PF(model)
+        pf.setup(n_samples=n_samples, parallelization=parallelization)
+        pf.R = .01
+        pf.Q = model.n_x * [.001]
+        pf.set_initial_guess(x0, P0=model.n_x * [.01])
+        pf.set_initial_parameter_values(p)
+
+        self.pf = pf
+        self.u = u
+        self.y = measure(model, u, p)
+
+    def time_estimate(self, name, n_samples, parallelization):
+        """
+
+        :param name:
+        :param n_samples:
+        :param parallelization:
+        :return:
+        """
+        self.pf.estimate(y=self.y, u=self.u)
+
+    def peakmem_estimate(self, name, n_samples, parallelization):
+        """
+
+        :param name:
+        :param n_samples:
+        :param parallelization:
+        :return:
+        """
+        self.pf.estimate(y=self.y, u=self.u)
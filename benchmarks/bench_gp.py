@@ -0,0 +1,334 @@
+"""Benchmarks of the training and prediction of Gaussian processes"""
+import numpy as np
+
+from hilo_mpc import GP, MultiOutputGP, Kernel
+
+from .common import TRAINING_SIZES, get_training_data
+
+
+class GPSetup:
+    """"""
+    params = TRAINING_SIZES
+    param_names = ['samples']
+    number = 1
+    repeat = 5
+    timeout = 600
+
+    def setup(self, n_samples):
+        """
+
+        :param n_samples:
+        :return:
+        """
+        X, y = get_training_data(n_samples)
+
+        gp = GP('x', 'y')
+        gp.set_training_data(X, y)
+
+        self.gp = gp
+
+    def time_setup(self, n_samples):
+        """
+
+        :param n_samples:
+        :return:
+        """
+        self.gp.setup()
+
+    def peakmem_setup(self, n_samples):
+        """
+
+        :param n_samples:
+        :return:
+        """
+        self.gp.setup()
+
+
+class GPFitModel:
+    """"""
+    params = (TRAINING_SIZES, [1, 3], ['casadi', 'numpy'])
+    param_names = ['samples', 'features', 'backend']
+    number = 1
+    repeat = 5
+    timeout = 600
+
+    def setup(self, n_samples, n_features, backend):
+        """
+
+        :param n_samples:
+        :param n_features:
+        :param backend:
+        :return:
+        """
+        X, y = get_training_data(n_samples, n_features=n_features)
+
+        gp = GP([f'x_{k}' for k in range(n_features)], 'y', backend=backend)
+        gp.set_training_data(X, y)
+        gp.setup()
+
+        self.gp = gp
+
+    def time_fit_model(self, n_samples, n_features, backend):
+        """
+
+        :param n_samples:
+        :param n_features:
+        :param backend:
+        :return:
+        """
+        self.gp.fit_model()
+
+    def peakmem_fit_model(self, n_samples, n_features, backend):
+        """
+
+        :param n_samples:
+        :param n_features:
+        :param backend:
+        :return:
+        """
+        self.gp.fit_model()
+
+
+class GPPredict:
+    """"""
+    params = (TRAINING_SIZES, [1, 100])
+    param_names = ['samples', 'queries']
+    number = 1
+    repeat = 20
+    timeout = 600
+
+    def setup(self, n_samples, n_queries):
+        """
+
+        :param n_samples:
+        :param n_queries:
+        :return:
+        """
+        X, y = get_training_data(n_samples)
+
+        # NOTE: The default Newton-CG solver can drive the noise variance to zero on these data, which leaves the
+        #  covariance matrix of the training data numerically singular
+        gp = GP('x', 'y', solver='L-BFGS-B')
+        gp.set_training_data(X, y)
+        gp.setup()
+        gp.fit_model()
+
+        self.gp = gp
+        self.X_query, _ = get_training_data(n_queries, seed=1)
+
+    def time_predict(self, n_samples, n_queries):
+        """
+
+        :param n_samples:
+        :param n_queries:
+        :return:
+        """
+        self.gp.predict(self.X_query)
+
+
+class MultiOutputGPFitModel:
+    """"""
+    params = (TRAINING_SIZES, [1, 5])
+    param_names = ['samples', 'labels']
+    number = 1
+    repeat = 5
+    timeout = 600
+
+    def setup(self, n_samples, n_labels):
+        """
+
+        :param n_samples:
+        :param n_labels:
+        :return:
+        """
+        X, y = get_training_data(n_samples)
+
+        gp = MultiOutputGP('x', [f'y_{k}' for k in range(n_labels)])
+        gp.set_training_data(X, np.repeat(y, n_labels, axis=0))
+        gp.setup()
+
+        self.gp = gp
+
+    def time_fit_model(self, n_samples, n_labels):
+        """
+
+        :param n_samples:
+        :param n_labels:
+        :return:
+        """
+        self.gp.fit_model()
+
+
+class GPTimeSeriesFitModel:
+    """"""
+    params = ([500, 2000], [None, 'toeplitz'])
+    param_names = ['samples', 'structure']
+    number = 1
+    repeat = 5
+    timeout = 600
+
+    def setup(self, n_samples, structure):
+        """
+
+        :param n_samples:
+        :param structure:
+        :return:
+        """
+        rng = np.random.default_rng(0)
+        t = np.linspace(0., 100., n_samples).reshape(1, -1)
+        y = np.sin(t) + .1 * rng.standard_normal((1, n_samples))
+
+        gp = GP('t', 'y', kernel=Kernel.matern_32(), backend='numpy', structure=structure)
+        gp.set_training_data(t, y)
+        gp.setup()
+
+        self.gp = gp
+
+    def time_fit_model(self, n_samples, structure):
+        """
+
+        :param n_samples:
+        :param structure:
+        :return:
+        """
+        self.gp.fit_model()
+
+
+class GPRandomFeaturesFitModel:
+    """"""
+    params = ([500, 2000], [None, 200])
+    param_names = ['samples', 'random_features']
+    number = 1
+    repeat = 5
+    timeout = 600
+
+    def setup(self, n_samples, n_random_features):
+        """
+
+        :param n_samples:
+        :param n_random_features:
+        :return:
+        """
+        X, y = get_training_data(n_samples, n_features=2)
+
+        gp = GP(['x_0', 'x_1'], 'y', backend='numpy', n_random_features=n_random_features, seed=0)
+        gp.set_training_data(X, y)
+        gp.setup()
+
+        self.gp = gp
+
+    def time_fit_model(self, n_samples, n_random_features):
+        """
+
+        :param n_samples:
+        :param n_random_features:
+        :return:
+        """
+        self.gp.fit_model()
+
+
+class GPSparseFitModel:
+    """"""
+    params = ([1000, 10000], ['fitc', 'vfe'])
+    param_names = ['samples', 'inference']
+    number = 1
+    repeat = 5
+    timeout = 600
+
+    def setup(self, n_samples, inference):
+        """
+
+        :param n_samples:
+        :param inference:
+        :return:
+        """
+        X, y = get_training_data(n_samples, n_features=2)
+
+        gp = GP(['x_0', 'x_1'], 'y', inference=inference, backend='numpy')
+        gp.set_training_data(X, y)
+        gp.setup()
+
+        self.gp = gp
+
+    def time_fit_model(self, n_samples, inference):
+        """
+
+        :param n_samples:
+        :param inference:
+        :return:
+        """
+        self.gp.fit_model()
+
+    def peakmem_fit_model(self, n_samples, inference):
+        """
+
+        :param n_samples:
+        :param inference:
+        :return:
+        """
+        self.gp.fit_model()
+
+
+class GPExportEvaluate:
+    """"""
+    params = ([100, 1000], [None, 'inducing_points', 'random_features'])
+    param_names = ['samples', 'approximation']
+    number = 100
+    repeat = 5
+    timeout = 600
+
+    def setup(self, n_samples, approximation):
+        """
+
+        :param n_samples:
+        :param approximation:
+        :return:
+        """
+        X, y = get_training_data(n_samples, n_features=2)
+
+        gp = GP(['x_0', 'x_1'], 'y', backend='numpy')
+        gp.set_training_data(X, y)
+        gp.setup()
+
+        self.function = gp.to_function(approximation=approximation, include_variance=False, seed=0)
+        self.x_query = X[:, 0]
+
+    def time_evaluate(self, n_samples, approximation):
+        """
+
+        :param n_samples:
+        :param approximation:
+        :return:
+        """
+        self.function(*self.x_query)
+
+
+class KernelCovarianceMatrix:
+    """"""
+    params = ([100, 1000], ['squared_exponential', 'matern_52', 'sum'])
+    param_names = ['samples', 'kernel']
+    number = 1
+    repeat = 5
+    timeout = 600
+
+    def setup(self, n_samples, kernel):
+        """
+
+        :param n_samples:
+        :param kernel:
+        :return:
+        """
+        if kernel == 'sum':
+            self.kernel = Kernel.squared_exponential() + Kernel.matern_52()
+        else:
+            self.kernel = getattr(Kernel, kernel)()
+        self.X, _ = get_training_data(n_samples, n_features=3)
+
+    def time_covariance_matrix(self, n_samples, kernel):
+        """
+
+        :param n_samples:
+        :param kernel:
+        :return:
+        """
+        self.kernel(self.X)
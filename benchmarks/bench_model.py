@@ -0,0 +1,72 @@
+"""Benchmarks of the setup and simulation of models"""
+from .common import MODELS, get_model
+
+
+class ModelSetup:
+    """"""
+    params = MODELS
+    param_names = ['model']
+    number = 1
+    repeat = 10
+
+    def setup(self, name):
+        """
+
+        :param name:
+        :return:
+        """
+        self.model, self.dt, _, _, _ = get_model(name, setup=False)
+
+    def time_setup(self, name):
+        """
+
+        :param name:
+        :return:
+        """
+        self.model.setup(dt=self.dt)
+
+    def peakmem_setup(self, name):
+        """
+
+        :param name:
+        :return:
+        """
+        self.model.setup(dt=self.dt)
+
+
+class ModelSimulate:
+    """"""
+    params = MODELS
+    param_names = ['model']
+    number = 1
+    repeat = 50
+
+    def setup(self, name):
+        """
+
+        :param name:
+        :return:
+        """
+        self.model, _, _, self.u, self.p = get_model(name)
+
+    def time_simulate(self, name):
+        """
+
+        :param name:
+        :return:
+        """
+        if self.p:
+            self.model.simulate(u=self.u, p=self.p)
+        else:
+            self.model.simulate(u=self.u)
+
+    def time_simulate_steps(self, name):
+        """
+
+        :param name:
+        :return:
+        """
+        if self.p:
+            self.model.simulate(u=self.u, p=self.p, steps=100)
+        else:
+            self.model.simulate(u=self.u, steps=100)
@@ -0,0 +1,126 @@
+"""Models and data shared by the benchmarks"""
+import casadi as ca
+import numpy as np
+
+from hilo_mpc import Model
+from hilo_mpc.library import cstr_schaffner_and_zeitz, cstr_seborg, scerevisiae_SEY2102_fedbatch, ecoli_D1210_fedbatch
+
+# Sizes of the benchmark problems. The models from the library are ordered by their number of states.
+MODELS = ['cstr_schaffner_and_zeitz', 'cstr_seborg', 'scerevisiae_SEY2102_fedbatch', 'ecoli_D1210_fedbatch']
+HORIZONS = [10, 40]
+SAMPLE_SIZES = [100, 10000]
+TRAINING_SIZES = [20, 50, 100]
+
+
+def get_model(name, discrete=False, setup=True):
+    """
+    Returns a model from the library together with its sampling interval, initial conditions and the values of its
+    inputs and parameters, which are used for all benchmarks
+
+    :param name: name of the model in the library
+    :type name: str
+    :param discrete: whether the model should be discretized
+    :type discrete: bool
+    :param setup: whether the model should be set up
+    :type setup: bool
+    :return: model, sampling interval, initial conditions, inputs and parameters
+    """
+    if name == 'cstr_schaffner_and_zeitz':
+        model = cstr_schaffner_and_zeitz()
+        dt = .1
+        x0 = [.1, .1]
+        u = [0.]
+        p = [.5616, .3126, 48.4, .5, .2, .1]
+    elif name == 'cstr_seborg':
+        model = cstr_seborg()
+        dt = .1
+        x0 = [.5, 350., 300.]
+        u = [300.]
+        p = [100., 100., 1., 7.2e10, 72748., 350., -5e4, 1000., .239, 5e4, 1.5]
+    elif name == 'scerevisiae_SEY2102_fedbatch':
+        model = scerevisiae_SEY2102_fedbatch()
+        dt = .5
+        x0 = [1., 10., 0., 0., 1.]
+        u = [.1]
+        p = []
+    elif name == 'ecoli_D1210_fedbatch':
+        model = ecoli_D1210_fedbatch()
+        model.set_measurements([f'y_{k}' for k in model.dynamical_state_names])
+        model.set_measurement_equations(model.x)
+        dt = .5
+        x0 = [.1, 40., 0., 0., 0., 0., 1.]
+        u = [.1, .1]
+        p = []
+    else:
+        raise ValueError(f"Model '{name}' not recognized")
+
+    if discrete:
+        model.discretize('rk4', inplace=True)
+    if setup:
+        model.setup(dt=dt)
+        model.set_initial_conditions(x0=x0)
+        if p:
+            model.set_initial_parameter_values(p)
+
+    return model, dt, x0, u, p
+
+
+def get_linear_model(n_masses):
+    """
+    Returns a discrete-time chain of double integrators, since the library does not contain any linear models
+
+    :param n_masses: number of double integrators
+    :type n_masses: int
+    :return: model and initial conditions
+    """
+    dt = .1
+    A = np.kron(np.eye(n_masses), np.array([[1., dt], [0., 1.]]))
+    B = np.kron(np.eye(n_masses), np.array([[dt ** 2 / 2], [dt]]))
+
+    model = Model(discrete=True)
+    model.A = A
+    model.B = B
+    model.C = np.eye(2 * n_masses)
+    model.setup(dt=dt)
+
+    x0 = np.ones(2 * n_masses).tolist()
+    model.set_initial_conditions(x0=x0)
+
+    return model, x0
+
+
+def get_training_data(n_samples, n_features=1, seed=0):
+    """
+    Returns noisy samples of a smooth function for the benchmarks of the Gaussian processes
+
+    :param n_samples: number of training points
+    :type n_samples: int
+    :param n_features: number of features
+    :type n_features: int
+    :param seed: seed of the random number generator
+    :type seed: int
+    :return: training features and labels
+    """
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(-3., 3., size=(n_features, n_samples))
+    y = np.sin(X).sum(axis=0, keepdims=True) + .1 * rng.standard_normal((1, n_samples))
+    return X, y
+
+
+def measure(model, u, p):
+    """
+    Simulates the model by one sampling interval and returns the latest measurement
+
+    :param model: model to be simulated
+    :type model: Model
+    :param u: values of the inputs
+    :type u: list
+    :param p: values of the parameters
+    :type p: list
+    :return: latest measurement
+    """
+    if p:
+        model.simulate(u=u, p=p)
+    else:
+        model.simulate(u=u)
+    return ca.DM(model.solution['y:f'])
@@ -86,6 +86,8 @@ PeriodicKernel = kernel.PeriodicKernel
 GaussianProcess = gp.GaussianProcess
 GP = GaussianProcess
 GPArray = gp.GPArray
+MultiOutputGaussianProcess = gp.MultiOutputGaussianProcess
+MultiOutputGP = MultiOutputGaussianProcess
 SimpleControlLoop = cl.SimpleControlLoop
 LinearProgram = opti.LinearProgram
 LP = LinearProgram
@@ -146,6 +148,8 @@ __all__ = [
     'GaussianProcess',
     'GP',
     'GPArray',
+    'MultiOutputGaussianProcess',
+    'MultiOutputGP',
     'SimpleControlLoop',
     'LinearProgram',
     'LP',
@@ -26,6 +26,8 @@ from __future__ import annotations
 from abc import ABCMeta, abstractmethod
 from collections.abc import KeysView
 from copy import copy
+import hashlib
+import os
 import platform
 from typing import Any, Optional, Sequence, Union
 import warnings
@@ -37,15 +39,18 @@ from .object import Object
 from ..plugins.plugins import PlotManager
 from ..util.io import save_mat
 from ..util.plotting import get_plot_backend
-from ..util.util import setup_warning, check_compiler, check_if_list_of_type, convert, dump_clean, is_list_like,\
-    lower_case, who_am_i, _split_expression, AOT, JIT
+from ..util.util import setup_warning, check_compiler, check_if_list_of_type, convert, dump_clean, generate_c_code,\
+    is_list_like, lower_case, who_am_i, _split_expression, AOT, JIT
 
 if platform.system() == 'Linux':
-    from hilo_mpc.util.unix import compile_so
+    from hilo_mpc.util.unix import compile_so, find_compiler
 elif platform.system() == 'Windows':
     from hilo_mpc.util.windows import compile_dll
 
 
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'hilo_mpc')
+
+
 class Base(Object):
     """
     Base class for all building blocks
@@ -264,6 +269,76 @@ class Base(Object):
 
         return gen_path, gen_name, gen_opts
 
+    def _get_cache_key(self, function: ca.Function, gen_opts: Optional[dict] = None) -> str:
+        """
+        Hash of the serialized function, the code generation options and the compiler settings
+
+        :param function:
+        :param gen_opts:
+        :return:
+        """
+        compiler_opts = {key: value for key, value in self._compiler_opts.items() if key != 'path'}
+        key = hashlib.sha256()
+        key.update(function.serialize().encode())
+        key.update(repr(sorted(gen_opts.items()) if gen_opts is not None else None).encode())
+        key.update(repr(sorted(compiler_opts.items())).encode())
+        key.update(f"{ca.__version__}-{platform.system()}-{platform.machine()}".encode())
+        return key.hexdigest()
+
+    def _setup_from_cache(
+            self,
+            function: ca.Function,
+            cache: Union[bool, str],
+            gen_name: str,
+            gen_opts: Optional[dict] = None
+    ) -> None:
+        """
+        Loads the compiled function from the cache directory or compiles and stores it, if it is not yet cached
+
+        The cache is content-addressed, i.e. every compiled library is stored in a subdirectory named after the hash
+        of the function, the code generation options and the compiler settings. Since just-in-time compiled code
+        cannot be stored, the library is always compiled ahead-of-time.
+
+        :param function:
+        :param cache: Cache directory. If True, the default cache directory '~/.cache/hilo_mpc' is used.
+        :param gen_name:
+        :param gen_opts:
+        :return:
+        """
+        if cache is True:
+            cache = CACHE_DIR
+        path = os.path.join(cache, self._get_cache_key(function, gen_opts=gen_opts))
+        if platform.system() == 'Windows':
+            library = os.path.join(path, gen_name + '.dll')
+        else:
+            library = os.path.join(path, gen_name + '.so')
+
+        if not os.path.isfile(library):
+            os.makedirs(path, exist_ok=True)
+            self._c_name = generate_c_code(function, path + os.sep, gen_name, opts=gen_opts)
+            # NOTE: Compile to a temporary file first, so that concurrent processes never load a partially written
+            #  library
+            temp = f"{library}.{os.getpid()}.tmp"
+            if platform.system() == 'Linux':
+                if self._compiler_opts.get('method') in AOT:
+                    compiler = self._compiler_opts['compiler']
+                elif gen_opts is not None and gen_opts.get('cpp', False):
+                    compiler = 'g++'
+                else:
+                    compiler = 'gcc'
+                if not find_compiler(compiler):
+                    raise RuntimeError(f"Compiler '{compiler}' is required to populate the cache, but could not be "
+                                       f"found")
+                compile_so(self._c_name, compiler, output=temp)
+            elif platform.system() == 'Windows':
+                if compile_dll(self._c_name, output=temp) is None:
+                    raise RuntimeError("Could not compile library")
+            else:
+                raise RuntimeError(f"Caching of compiled functions is not supported on {platform.system()}")
+            os.replace(temp, library)
+
+        self._function = ca.external(function.name(), library)
+
     @property
     def compiler(self) -> str:
         """
@@ -375,11 +450,29 @@ class Container(Object):
     # TODO: Support for pandas Series and DataFrame?
     # TODO: Typing hints
     # TODO: Add __str__
-    def __init__(self, data_format, values=None, shape=None, id=None, name=None, parent=None):
+    def __init__(self, data_format, values=None, shape=None, id=None, name=None, parent=None, capacity=None):
         """Constructor method"""
         super().__init__(id=id, name=name)
         self._parent = parent
 
+        # NOTE: If a capacity is given, values appended along the second axis are stored in a preallocated (and
+        #  growable) NumPy buffer. The DM object is only materialized when it is actually accessed.
+        self._capacity = capacity
+        self._buffer = None
+        self._buffer_start = 0
+        self._buffer_stop = 0
+        self._buffer_values = None
+        self._buffer_is_stale = False
+
+        # NOTE: If a maximum number of samples is given, only the latest samples are kept in the buffer. Older samples
+        #  are discarded, downsampled into the archive or spilled to disk, depending on the retention policy.
+        self._max_samples = None
+        self._retention = 'discard'
+        self._downsampling = 1
+        self._spill_file = None
+        self._archive = None
+        self._n_evicted = 0
+
         if data_format in [ca.SX, ca.MX, ca.DM]:
             self._fx = data_format
         elif isinstance(data_format, str):
@@ -434,10 +527,16 @@ class Container(Object):
 
     def __getitem__(self, item):
         """Item getter method"""
+        if self._buffer is not None and isinstance(item, tuple) and len(item) == 2 and \
+                all(isinstance(k, (int, slice)) for k in item):
+            # NOTE: Integers are converted to slices, so that NumPy keeps the 2-D layout of CasADi
+            item = tuple(slice(k, k + 1 if k != -1 else None) if isinstance(k, int) else k for k in item)
+            return ca.DM(self._buffer[:, self._buffer_start:self._buffer_stop][item])
         return self._values[item]
 
     def __setitem__(self, key, value):
         """Item setter method"""
+        self._release_buffer()
         self._values[key] = value
 
     def __delitem__(self, key):
@@ -445,6 +544,7 @@ class Container(Object):
         # NOTE: Right now, only working for vectors not matrices
         # NOTE: del is not able to work with lists of indices and SX_remove is not able to deal with slices
         # TODO: Is it possible to deal with matrices?
+        self._release_buffer()
         if isinstance(key, (list, tuple)):
             to_remove = key
         elif isinstance(key, slice):
@@ -499,9 +599,156 @@ class Container(Object):
                     raise ValueError(f"Shape dimensions don't match: {shape} and {self._values.shape}")
                 else:
                     pass
+        elif self._buffer is not None:
+            self._shape = (self._buffer.shape[0], self._buffer_stop - self._buffer_start)
         else:
             self._shape = self._values.shape
 
+    @property
+    def _values(self):
+        """
+
+        :return:
+        """
+        if self._buffer_is_stale:
+            self._buffer_values = ca.DM(self._buffer[:, self._buffer_start:self._buffer_stop])
+            self._buffer_is_stale = False
+        return self._buffer_values
+
+    @_values.setter
+    def _values(self, values):
+        self._buffer = None
+        self._buffer_start = 0
+        self._buffer_stop = 0
+        self._buffer_values = values
+        self._buffer_is_stale = False
+
+    @property
+    def _is_buffered(self) -> bool:
+        """
+
+        :return:
+        """
+        return self._fx is ca.DM and (self._capacity is not None or self._max_samples is not None)
+
+    def _append_to_buffer(self, other):
+        """
+
+        :param other:
+        :return:
+        """
+        other = other.full()
+        n_rows, n_cols = other.shape
+        if n_cols == 0:
+            return
+
+        if self._buffer is None:
+            current = self._values.full()
+            if current.shape[1] == 0:
+                current = np.empty((n_rows, 0))
+            elif current.shape[0] != n_rows:
+                raise ValueError(f"Dimension mismatch. Expected {current.shape[0]} rows, got {n_rows} rows instead.")
+            capacity = self._capacity if self._capacity is not None else 1
+            if self._max_samples is not None:
+                # NOTE: Twice the number of retained samples, so that the buffer only needs to be compacted once
+                #  every self._max_samples appends
+                capacity = max(capacity, 2 * self._max_samples)
+            buffer = np.empty((n_rows, max(capacity, current.shape[1] + n_cols)), order='F')
+            buffer[:, :current.shape[1]] = current
+            self._buffer = buffer
+            self._buffer_start = 0
+            self._buffer_stop = current.shape[1]
+        elif self._buffer.shape[0] != n_rows:
+            raise ValueError(f"Dimension mismatch. Expected {self._buffer.shape[0]} rows, got {n_rows} rows instead.")
+
+        required = self._buffer_stop + n_cols
+        if required > self._buffer.shape[1]:
+            self._compact_buffer()
+            required = self._buffer_stop + n_cols
+        if required > self._buffer.shape[1]:
+            buffer = np.empty((n_rows, max(required, 2 * self._buffer.shape[1])), order='F')
+            buffer[:, :self._buffer_stop] = self._buffer[:, :self._buffer_stop]
+            self._buffer = buffer
+        self._buffer[:, self._buffer_stop:required] = other
+        self._buffer_stop = required
+        self._buffer_is_stale = True
+        if self._max_samples is not None:
+            if isinstance(self._parent, Series):
+                # NOTE: The entries of a series are trimmed at the same sample index, so that they stay aligned
+                self._parent._trim_to_max_samples()
+            else:
+                self._drop_samples(self._n_samples - self._max_samples)
+
+    @property
+    def _n_samples(self) -> int:
+        """
+        Number of samples that were ever stored, including the samples removed by the retention policy
+
+        :return:
+        """
+        if self._buffer is None:
+            return self._n_evicted + self._values.size2()
+        return self._n_evicted + self._buffer_stop
+
+    def _drop_samples(self, n_dropped: int) -> None:
+        """
+        Removes all samples before the sample index **n_dropped** (counted from the first sample ever stored) from
+        memory
+
+        :param n_dropped:
+        :return:
+        """
+        if self._buffer is None:
+            return
+        start = min(max(n_dropped - self._n_evicted, self._buffer_start), self._buffer_stop)
+        if start != self._buffer_start:
+            self._buffer_start = start
+            self._buffer_is_stale = True
+            self._update_shape(None)
+
+    def _compact_buffer(self):
+        """
+
+        :return:
+        """
+        if self._buffer is None or self._buffer_start == 0:
+            return
+        self._evict(self._buffer[:, :self._buffer_start])
+        n_samples = self._buffer_stop - self._buffer_start
+        self._buffer[:, :n_samples] = self._buffer[:, self._buffer_start:self._buffer_stop]
+        self._buffer_start = 0
+        self._buffer_stop = n_samples
+
+    def _evict(self, values):
+        """
+
+        :param values:
+        :return:
+        """
+        n_values = values.shape[1]
+        if self._retention == 'downsample':
+            keep = np.arange(self._n_evicted, self._n_evicted + n_values) % self._downsampling == 0
+            if self._archive is None:
+                archive = values[:, keep]
+            else:
+                archive = np.hstack([self._archive, values[:, keep]])
+            self._archive = archive[:, -self._max_samples:].copy()
+        elif self._retention == 'spill':
+            with open(self._spill_file, 'ab') as file:
+                # NOTE: Column-major order, so that samples are stored consecutively
+                np.ascontiguousarray(values.T).tofile(file)
+        self._n_evicted += n_values
+
+    def _release_buffer(self):
+        """
+
+        :return:
+        """
+        if self._buffer is not None:
+            self._compact_buffer()
+            values = self._values
+            self._values = values
+
     def _update_parent(self):
         """
 
@@ -539,6 +786,64 @@ class Container(Object):
         """
         return self._shape
 
+    @property
+    def capacity(self) -> Optional[int]:
+        """
+
+        :return:
+        """
+        return self._capacity
+
+    @capacity.setter
+    def capacity(self, capacity: Optional[int]) -> None:
+        if capacity is not None and capacity < 1:
+            raise ValueError("The capacity needs to be a positive integer")
+        if capacity is None and self._max_samples is None:
+            self._release_buffer()
+        self._capacity = capacity
+
+    @property
+    def archive(self) -> ca.DM:
+        """
+        Samples that were removed from memory by the retention policy (downsampled or spilled to disk)
+
+        :return:
+        """
+        self._compact_buffer()
+        if self._retention == 'spill' and self._spill_file is not None and os.path.isfile(self._spill_file):
+            archive = np.fromfile(self._spill_file)
+            return ca.DM(archive.reshape(-1, self.size1()).T)
+        if self._archive is not None:
+            return ca.DM(self._archive)
+        return ca.DM()
+
+    def set_retention(
+            self,
+            max_samples: Optional[int],
+            policy: str = 'discard',
+            downsampling: int = 1,
+            spill_file: Optional[str] = None
+    ) -> None:
+        """
+
+        :param max_samples:
+        :param policy:
+        :param downsampling:
+        :param spill_file:
+        :return:
+        """
+        if max_samples is None and self._capacity is None:
+            self._release_buffer()
+        if self._spill_file is not None and self._spill_file != spill_file and os.path.isfile(self._spill_file):
+            os.remove(self._spill_file)
+        if spill_file is not None:
+            # NOTE: Samples spilled by a previous run to a file of the same name must not be mixed with the new ones
+            open(spill_file, 'wb').close()
+        self._max_samples = max_samples
+        self._retention = policy
+        self._downsampling = downsampling
+        self._spill_file = spill_file
+
     def is_constant(self, *args):
         """
 
@@ -553,6 +858,8 @@ class Container(Object):
         :param args:
         :return:
         """
+        if self._buffer is not None and not args:
+            return self._buffer.shape[0] == 0 or self._buffer_stop == self._buffer_start
         return self._values.is_empty(*args)
 
     def is_scalar(self, *args):
@@ -577,6 +884,8 @@ class Container(Object):
         :param args:
         :return:
         """
+        if self._buffer is not None:
+            return self._buffer.shape[0]
         return self._values.size1(*args)
 
     def size2(self, *args):
@@ -585,6 +894,8 @@ class Container(Object):
         :param args:
         :return:
         """
+        if self._buffer is not None:
+            return self._buffer_stop - self._buffer_start
         return self._values.size2(*args)
 
 
@@ -603,10 +914,12 @@ class Vector(Container):
             shape=None,
             id=None,
             name=None,
-            parent=None
+            parent=None,
+            capacity=None
     ):
         """Constructor method"""
-        super().__init__(data_format, values=values_or_names, shape=shape, id=id, name=name, parent=parent)
+        super().__init__(data_format, values=values_or_names, shape=shape, id=id, name=name, parent=parent,
+                         capacity=capacity)
 
         if self._fx is ca.DM:
             if isinstance(values_or_names, str):
@@ -840,7 +1153,10 @@ class Vector(Container):
                 self._update_labels(self._labels + obj.labels)
                 self._update_units(self._units + obj.units)
             elif axis == 1:
-                self._values = ca.horzcat(self._values, obj.values)
+                if self._is_buffered:
+                    self._append_to_buffer(obj.values)
+                else:
+                    self._values = ca.horzcat(self._values, obj.values)
             else:
                 raise IndexError("Argument 'axis' is out of bounds for array of dimension 2")
         else:
@@ -849,7 +1165,10 @@ class Vector(Container):
                 self._values = ca.vertcat(self._values, other)
                 self._update_names()
             elif axis == 1:
-                self._values = ca.horzcat(self._values, other)
+                if self._is_buffered:
+                    self._append_to_buffer(other)
+                else:
+                    self._values = ca.horzcat(self._values, other)
             else:
                 raise IndexError("Argument 'axis' is out of bounds for array of dimension 2")
             n1 = other.size1()
@@ -2162,7 +2481,8 @@ class Series(Object, metaclass=ABCMeta):
             backend: Optional[Union[str, PlotManager]] = None,
             id: Optional[str] = None,
             name: Optional[str] = None,
-            parent: Optional[Any] = None
+            parent: Optional[Any] = None,
+            capacity: Optional[int] = None
     ) -> None:
         """Constructor method"""
         super().__init__(id=id, name=name)
@@ -2180,6 +2500,8 @@ class Series(Object, metaclass=ABCMeta):
             self._plot_manager = None
             warnings.warn("Backend for plots not recognized. Plots are disabled.")
         self._parent = parent
+        self._capacity = None
+        self._retention = None
         self._data = {}
         self._reference = {}
         self._lower_bound = {}
@@ -2194,6 +2516,9 @@ class Series(Object, metaclass=ABCMeta):
 
         self._n_samples = 0
 
+        if capacity is not None:
+            self.capacity = capacity
+
     def __del__(self):
         """Deletion method"""
         self._data = {}
@@ -2287,6 +2612,147 @@ class Series(Object, metaclass=ABCMeta):
         self._check_samples()
         return self._n_samples
 
+    @property
+    def capacity(self) -> Optional[int]:
+        """
+        Initial number of samples that is preallocated for every entry of the series
+
+        If the capacity is set, new samples are written into preallocated NumPy buffers instead of concatenating the
+        complete history on every append. The buffers grow automatically (by doubling) if the capacity is exceeded.
+
+        :return:
+        """
+        return self._capacity
+
+    @capacity.setter
+    def capacity(self, capacity: Optional[int]) -> None:
+        if capacity is not None:
+            if not isinstance(capacity, int) or capacity < 1:
+                raise ValueError("The capacity needs to be a positive integer")
+        self._capacity = capacity
+        for container in [self._data, self._reference, self._lower_bound, self._upper_bound, self._noise]:
+            for vector in container.values():
+                vector.capacity = capacity
+
+    def _apply_retention(self, arg: str, suffix: str, vector: Vector) -> None:
+        """
+
+        :param arg:
+        :param suffix:
+        :param vector:
+        :return:
+        """
+        if self._retention is None:
+            vector.set_retention(None)
+        else:
+            spill_file = None
+            if self._retention['policy'] == 'spill':
+                spill_file = os.path.join(self._retention['path'], f"{self._retention['prefix']}_{arg}{suffix}.bin")
+            vector.set_retention(self._retention['max_samples'], policy=self._retention['policy'],
+                                 downsampling=self._retention['downsampling'], spill_file=spill_file)
+
+    def _trim_to_max_samples(self) -> None:
+        """
+        Removes the oldest samples of all entries from memory at the same sample index, such that the entry with the
+        most samples keeps the maximum number of samples of the retention policy
+
+        Entries with fewer samples (e.g. the inputs, which lag the states by one sample) keep correspondingly fewer
+        samples, so that all entries stay aligned with the abscissa.
+
+        :return:
+        """
+        vectors = [vector for container in [self._data, self._reference, self._lower_bound, self._upper_bound,
+                                            self._noise] for vector in container.values()]
+        n_dropped = max(vector._n_samples for vector in vectors) - self._retention['max_samples']
+        for vector in vectors:
+            vector._drop_samples(n_dropped)
+
+    def set_retention(
+            self,
+            max_samples: Optional[int],
+            policy: str = 'discard',
+            downsampling: int = 10,
+            path: Optional[str] = None,
+            prefix: Optional[str] = None
+    ) -> None:
+        """
+        Bounds the number of samples that are kept in memory for every entry of the series
+
+        Only the latest **max_samples** samples are kept. Older samples are handled according to the retention policy:
+
+        * 'discard': older samples are dropped
+        * 'downsample': every **downsampling**-th older sample is kept in the archive (which is bounded by
+          **max_samples** as well)
+        * 'spill': older samples are appended to binary files in the directory **path**, which are named
+          '<prefix>_<entry>.bin' (e.g. 'series_x_ref.bin'). Existing files of the same name are truncated.
+
+        All entries are trimmed at the same sample index, so that they stay aligned. Archived samples can be retrieved
+        via :meth:`get_archive`. Supplying None for **max_samples** disables the retention policy and deletes the files
+        of the policy 'spill'.
+
+        :param max_samples: Maximum number of samples that are kept in memory
+        :param policy: Retention policy for older samples, defaults to 'discard'
+        :param downsampling: Downsampling factor for the policy 'downsample', defaults to 10
+        :param path: Directory for the policy 'spill'
+        :param prefix: Prefix of the file names for the policy 'spill'. Defaults to the name of the series or, if the
+            series has no name, its id.
+        :return:
+        """
+        if max_samples is None:
+            self._retention = None
+        else:
+            if not isinstance(max_samples, int) or max_samples < 1:
+                raise ValueError("The maximum number of samples needs to be a positive integer")
+            policy = policy.lower()
+            if policy not in ['discard', 'downsample', 'spill']:
+                raise ValueError(f"Retention policy '{policy}' not recognized. Choose one of 'discard', 'downsample' "
+                                 f"or 'spill'.")
+            if policy == 'downsample' and (not isinstance(downsampling, int) or downsampling < 1):
+                raise ValueError("The downsampling factor needs to be a positive integer")
+            if policy == 'spill':
+                if path is None:
+                    raise ValueError("The retention policy 'spill' requires a directory supplied via the keyword "
+                                     "'path'")
+                os.makedirs(path, exist_ok=True)
+            if prefix is None:
+                prefix = self.name if self.name is not None else self._id
+            self._retention = {'max_samples': max_samples, 'policy': policy, 'downsampling': downsampling,
+                               'path': path, 'prefix': prefix}
+
+        for suffix, container in [('', self._data), ('_ref', self._reference), ('_lb', self._lower_bound),
+                                  ('_ub', self._upper_bound), ('_noise', self._noise)]:
+            for arg, vector in container.items():
+                self._apply_retention(arg, suffix, vector)
+
+    def get_archive(self, arg: str) -> ca.DM:
+        """
+        Returns the samples of an entry that were removed from memory by the retention policy
+
+        :param arg: Identifier of the entry, e.g. 'x' or 'x_ref'
+        :return:
+        """
+        arg = arg.rsplit('_')
+        if len(arg) == 1:
+            container = self._data
+        elif len(arg) == 2:
+            if arg[1] in ['ref', 'reference']:
+                container = self._reference
+            elif arg[1] in ['lb', 'lower_bound']:
+                container = self._lower_bound
+            elif arg[1] in ['ub', 'upper_bound']:
+                container = self._upper_bound
+            elif arg[1] == 'noise':
+                container = self._noise
+            else:
+                raise ValueError(f"Unsupported key {'_'.join(arg)}")
+        else:
+            raise ValueError(f"Unsupported key {'_'.join(arg)}")
+        arg = arg[0]
+
+        if arg not in container:
+            raise KeyError(f"Argument '{arg}' not found in data container.")
+        return container[arg].archive
+
     def add(self, arg, value):
         """
 
@@ -2391,9 +2857,10 @@ class Series(Object, metaclass=ABCMeta):
         :return:
         """
         if self.name is not None:
-            new = self.__class__(backend=self._plot_manager.backend, name='copy_of_' + self.name)
+            new = self.__class__(backend=self._plot_manager.backend, name='copy_of_' + self.name,
+                                 capacity=self._capacity)
         else:
-            new = self.__class__(backend=self._plot_manager.backend)
+            new = self.__class__(backend=self._plot_manager.backend, capacity=self._capacity)
 
         kwargs = {key: {
             'data_format': ca.DM,
@@ -2664,11 +3131,14 @@ class Series(Object, metaclass=ABCMeta):
         else:
             return self._data[arg].units
 
-    def is_empty(self) -> bool:
+    def is_empty(self, *args: str) -> bool:
         """
 
+        :param args: Identifiers of the entries to be checked. If no identifiers are supplied, all entries are checked.
         :return:
         """
+        if args:
+            return all(arg not in self._data or self._data[arg].is_empty() for arg in args)
         return all(data.is_empty() for data in self._data.values())
 
     def is_set_up(self) -> bool:
@@ -3448,11 +3918,17 @@ class Series(Object, metaclass=ABCMeta):
             self.merge(args[0])
         else:
             for arg in args:
-                self._data[arg] = Vector(**kwargs[arg], parent=self)
-                self._reference[arg] = Vector(**kwargs[arg], parent=self)
-                self._lower_bound[arg] = Vector(**kwargs[arg], parent=self)
-                self._upper_bound[arg] = Vector(**kwargs[arg], parent=self)
-                self._noise[arg] = Vector(**kwargs[arg], parent=self)
+                self._data[arg] = Vector(**kwargs[arg], parent=self, capacity=self._capacity)
+                self._reference[arg] = Vector(**kwargs[arg], parent=self, capacity=self._capacity)
+                self._lower_bound[arg] = Vector(**kwargs[arg], parent=self, capacity=self._capacity)
+                self._upper_bound[arg] = Vector(**kwargs[arg], parent=self, capacity=self._capacity)
+                self._noise[arg] = Vector(**kwargs[arg], parent=self, capacity=self._capacity)
+                if self._retention is not None:
+                    self._apply_retention(arg, '', self._data[arg])
+                    self._apply_retention(arg, '_ref', self._reference[arg])
+                    self._apply_retention(arg, '_lb', self._lower_bound[arg])
+                    self._apply_retention(arg, '_ub', self._upper_bound[arg])
+                    self._apply_retention(arg, '_noise', self._noise[arg])
                 self._names.extend(self._data[arg].names)
 
     def to_dict(self, *args, **kwargs):
@@ -3542,9 +4018,9 @@ class Series(Object, metaclass=ABCMeta):
 class TimeSeries(Series):
     """"""
     # TODO: Typing hints
-    def __init__(self, backend=None, id=None, name=None, parent=None, **kwargs):
+    def __init__(self, backend=None, id=None, name=None, parent=None, capacity=None, **kwargs):
         """Constructor method"""
-        super().__init__(backend=backend, id=id, name=name, parent=parent)
+        super().__init__(backend=backend, id=id, name=name, parent=parent, capacity=capacity)
 
         self._n_x = 0
         self._n_y = 0
@@ -3690,14 +4166,22 @@ class TimeSeries(Series):
                 args['x0'] = self._data['x'][:, -1]
             if 'z' in self._data and 'z' not in skip:
                 args['z0'] = ca.repmat(self._data['z'][:, -1], 1, steps)
+            if 'p' in self._data and 'p' not in skip:
+                # Parameters that were only set once are kept constant over all steps
+                if self._data['p'].size2() < steps:
+                    p = ca.repmat(self._data['p'][:, -1], 1, steps)
+                else:
+                    p = self._data['p'][:, -steps:]
+            else:
+                p = None
             if 'u' in self._data and 'u' not in skip:
-                if 'p' in self._data and 'p' not in skip:
-                    args['p'] = ca.vertcat(self._data['u'][:, -steps:], self._data['p'][:, -steps:])
+                if p is not None:
+                    args['p'] = ca.vertcat(self._data['u'][:, -steps:], p)
                 else:
                     args['p'] = self._data['u'][:, -steps:]
             else:
-                if 'p' in self._data and 'p' not in skip:
-                    args['p'] = self._data['p'][:, -steps:]
+                if p is not None:
+                    args['p'] = p
             return args
         else:
             raise ValueError("The 'steps' argument has to be greater than 0.")
@@ -3721,9 +4205,9 @@ class OptimizationSeries(Series):
     """"""
     # TODO: Typing hints
     # TODO: Add objective value to data (and maybe g and lam_g / lam_x too)
-    def __init__(self, backend=None, id=None, name=None, parent=None, **kwargs):
+    def __init__(self, backend=None, id=None, name=None, parent=None, capacity=None, **kwargs):
         """Constructor method"""
-        super().__init__(backend=backend, id=id, name=name, parent=parent)
+        super().__init__(backend=backend, id=id, name=name, parent=parent, capacity=capacity)
 
         self._n_x = 0
         self._n_p = 0
@@ -87,6 +87,10 @@ class NMPC(Controller, DynamicOptimization):
         self._e_soft_stage_ind = []
         self._e_term_stage_ind = []
 
+        # Multipliers for the warm start of the next optimization
+        self._lam_x0 = None
+        self._lam_g0 = None
+
         # In some cases, for example path following with interpolated path using spline, the objective
         # function needs to be defined in MX variable instead of SX, because the CasADi spline interpolation
         # is defined only in MX functions.
@@ -214,13 +218,15 @@ class NMPC(Controller, DynamicOptimization):
             self._may_term_flag = True
 
         self.quad_stage_cost._setup(x_scale=self._x_scaling, u_scale=self._u_scaling, y_scale=self._y_scaling,
-                                    time_variable=self.time_var, path_variables=self._paths_var_list)
+                                    time_variable=self.time_var, path_variables=self._paths_var_list,
+                                    parametric=self._nlp_options['parametric_cost'])
         if self.quad_stage_cost._is_set:
             self._lag_term += self.quad_stage_cost.cost
             self._lag_term_flag = True
 
         self.quad_terminal_cost._setup(x_scale=self._x_scaling, u_scale=self._u_scaling, y_scale=self._y_scaling,
-                                       time_variable=self.time_var, path_variables=self._paths_var_list)
+                                       time_variable=self.time_var, path_variables=self._paths_var_list,
+                                       parametric=self._nlp_options['parametric_cost'])
         if self.quad_terminal_cost._is_set:
             self._may_term += self.quad_terminal_cost.cost
             self._may_term_flag = True
@@ -241,6 +247,58 @@ class NMPC(Controller, DynamicOptimization):
                                                    self.quad_terminal_cost._trajectories_list[i]['placeholder'],
                                                    self.quad_terminal_cost._trajectories_list[i]['ref'])
 
+    def _evaluate_over_horizon(self, fun, args):
+        """
+        Evaluates a stage-wise function for every interval of the prediction horizon. If the option 'map_horizon' is
+        set, the function is evaluated through a single call of its mapped version, which keeps the expression graph
+        small for long horizons. Otherwise, the function is called once for every interval.
+
+        :param fun: stage-wise function
+        :type fun: casadi.Function
+        :param args: arguments for every interval of the horizon, either as lists of positional arguments or as dicts
+        :type args: list
+        :return: outputs for every interval of the horizon, in the same format as a direct call of the function
+        """
+        map_horizon = self._nlp_options['map_horizon']
+        if map_horizon is False:
+            if isinstance(args[0], dict):
+                return [fun(**arg) for arg in args]
+            return [fun(*arg) for arg in args]
+
+        if map_horizon is True:
+            map_horizon = 'serial'
+        n_stages = len(args)
+        mapped_fun = fun.map(n_stages, map_horizon)
+
+        def stack(k, key):
+            """Stacks the argument of every interval horizontally. Empty inputs are passed as they are."""
+            shape = fun.size_in(k)
+            if fun.sparsity_in(k).is_empty():
+                return ca.DM.zeros(shape)
+            stacked = ca.horzcat(*[arg[key] for arg in args])
+            if stacked.is_empty():
+                # Empty arguments are replaced by the default values of the inputs, same as for a direct call
+                return stacked
+            return ca.horzcat(*[ca.reshape(arg[key], shape) for arg in args])
+
+        def split(k, val):
+            """Splits the stacked output of the mapped function into the outputs of every interval"""
+            n_col = fun.size2_out(k)
+            if n_col == 0:
+                return [val for _ in range(n_stages)]
+            return [val[:, ii * n_col:(ii + 1) * n_col] for ii in range(n_stages)]
+
+        if isinstance(args[0], dict):
+            out = mapped_fun(**{key: stack(fun.index_in(key), key) for key in args[0]})
+            out = {key: split(fun.index_out(key), val) for key, val in out.items()}
+            return [{key: val[ii] for key, val in out.items()} for ii in range(n_stages)]
+
+        out = mapped_fun(*[stack(k, k) for k in range(len(args[0]))])
+        if fun.n_out() == 1:
+            return split(0, out)
+        out = [split(k, val) for k, val in enumerate(out)]
+        return [[val[ii] for val in out] for ii in range(n_stages)]
+
     def _scale_problem(self):
         """
 
@@ -508,6 +566,15 @@ class NMPC(Controller, DynamicOptimization):
 
         param['time'] = self._time
 
+        # Weights, set points and soft constraint penalties for parametric costs
+        if self._nlp_options['parametric_cost']:
+            param['sc_p'] = self.quad_stage_cost.parameter_values
+            param['tc_p'] = self.quad_terminal_cost.parameter_values
+            if self.stage_constraint.is_soft:
+                param['W_soft_stage'] = ca.DM(self.stage_constraint.weight)
+            if self.terminal_constraint.is_soft:
+                param['W_soft_term'] = ca.DM(self.terminal_constraint.weight)
+
         return param
 
     def _save_references(self, param):
@@ -705,28 +772,35 @@ class NMPC(Controller, DynamicOptimization):
         :param kwargs:
         :return:
         """
-        if runs == 0:
-            sol = self._solver(x0=v0, lbx=self._v_lb, ubx=self._v_ub, lbg=self._g_lb, ubg=self._g_ub, p=param)
-            self._nlp_solution = sol
-            u_opt = sol['x'][self._u_ind[0]]
-            if self._nlp_options['warm_start']:
-                self._v0 = sol['x']
-        else:
-            pert_factor = kwargs.get('pert_factor', 0.1)
-            f_r_better = np.inf
-            v00 = v0
-            for r in range(runs):
-                sol = self._solver(x0=v00, lbx=self._v_lb, ubx=self._v_ub, lbg=self._g_lb, ubg=self._g_ub, p=param)
-                if sol['f'] < f_r_better:
-                    f_r_better = sol['f']
-                    self._nlp_solution = sol
-                    u_opt = sol['x'][self._u_ind[0]]
-                    if self._nlp_options['warm_start']:
-                        self._v0 = sol['x']
-                v00 = v0 + v0 * (1 - 2 * np.random.rand(self._n_v)) * pert_factor
+        # Multipliers of the shifted previous solution
+        lam0 = None
+        if self._nlp_options['warm_start'] == 'shift' and self._lam_x0 is not None:
+            lam0 = {'lam_x0': self._lam_x0, 'lam_g0': self._lam_g0}
+
+        sol = self._multi_start(v0, max(runs, 1), param, lam0=lam0, pert_factor=kwargs.get('pert_factor', 0.1))
+        self._nlp_solution = sol
+        u_opt = sol['x'][self._u_ind[0]]
+        if self._nlp_options['warm_start']:
+            self._update_warm_start(sol)
 
         return u_opt
 
+    def _update_warm_start(self, sol):
+        """
+        Updates the initial guess of the next optimization with the given solution. If the option 'warm_start' is set
+        to 'shift', the solution and its multipliers are shifted one interval ahead in the horizon.
+
+        :param sol: solution of the nonlinear program
+        :type sol: dict
+        :return:
+        """
+        if self._nlp_options['warm_start'] == 'shift':
+            self._v0 = self._shift_horizon(sol['x'], self._horizon_ind)
+            self._lam_x0 = self._shift_horizon(sol['lam_x'], self._horizon_ind)
+            self._lam_g0 = self._shift_horizon(sol['lam_g'], [self._g_stage_ind])
+        else:
+            self._v0 = sol['x']
+
     def optimize(self, x0, cp=None, tvp=None, v0=None, runs=0, fix_x0=True, **kwargs):
         """
         Solves the MPC problem
@@ -744,6 +818,8 @@ class NMPC(Controller, DynamicOptimization):
             initial guess v0 randomly.
             ACHTUNG: This could cause problems with the integrators or give something outside constraints. The output
             will be the solution with the minimum objective function (default 0)
+            The runs are distributed over worker processes if the option 'n_jobs' is greater than 1 and stop early once
+            the objective function is below the option 'multi_start_tol'. The worker processes are shut down by close().
         :type runs: int
         :param fix_x0: If True, the first state is fixed as the measured states. This is the classic MPC approach. If
             False, also the initial state is optimized.
@@ -754,32 +830,14 @@ class NMPC(Controller, DynamicOptimization):
             raise ValueError("Howdy! You need to setup the MPC before optimizing. Run .setup() on the MPC object.")
 
         # Check the constant parameters
-        if self._model.n_p - self._n_tvp != 0:
-            if cp is not None:
-                cp = check_and_wrap_to_DM(cp)
-
-            if cp is None or cp.size1() != self._model.n_p - self._n_tvp:
-                raise ValueError(
-                    f"The model has {self._model.n_p - self._n_tvp} constant parameter(s): "
-                    f"{self._model.parameter_names}. You must pass me the value of these before running the "
-                    f"optimization to the 'cp' parameter."
-                )
-        else:
-            if cp is not None:
-                warnings.warn("You are passing a parameter vector in the optimizer, but the model has no defined "
-                              "parameters. I am ignoring the vector.")
+        cp = self._check_constant_parameters(cp)
 
         if self._nlp_options['ipopt_debugger']:
             # Reset the solution of the debugger before next optimization
             self.debugger.reset_solution()
         # Check the state
-        x0 = check_and_wrap_to_DM(x0)
+        x0 = self._check_initial_state(x0)
 
-        if x0.shape[0] != self._n_x:
-            raise ValueError(
-                f"We have an issue mate, the x0 you supplied has dimension {x0.shape[0]} but the model has {self._n_x} "
-                f"states."
-            )
         if fix_x0 is True:
             # Force the initial state to be the measured state.
             # Note that the path following problem modifies the model dimensions,
@@ -810,11 +868,60 @@ class NMPC(Controller, DynamicOptimization):
         # Print output
         self._print_message()
 
+        return self._update_solution(u_opt, param, start=start if self._stats else None)
+
+    def _check_constant_parameters(self, cp):
+        """
+
+        :param cp:
+        :return:
+        """
+        if self._model.n_p - self._n_tvp != 0:
+            if cp is not None:
+                cp = check_and_wrap_to_DM(cp)
+
+            if cp is None or cp.size1() != self._model.n_p - self._n_tvp:
+                raise ValueError(
+                    f"The model has {self._model.n_p - self._n_tvp} constant parameter(s): "
+                    f"{self._model.parameter_names}. You must pass me the value of these before running the "
+                    f"optimization to the 'cp' parameter."
+                )
+        else:
+            if cp is not None:
+                warnings.warn("You are passing a parameter vector in the optimizer, but the model has no defined "
+                              "parameters. I am ignoring the vector.")
+        return cp
+
+    def _check_initial_state(self, x0):
+        """
+
+        :param x0:
+        :return:
+        """
+        x0 = check_and_wrap_to_DM(x0)
+
+        if x0.shape[0] != self._n_x:
+            raise ValueError(
+                f"We have an issue mate, the x0 you supplied has dimension {x0.shape[0]} but the model has {self._n_x} "
+                f"states."
+            )
+        return x0
+
+    def _update_solution(self, u_opt, param, start=None):
+        """
+        Stores the results of the last optimization in the solution object, advances the clock of the MPC and returns
+        the first optimal input
+
+        :param u_opt:
+        :param param:
+        :param start:
+        :return:
+        """
         # Reset the solution
         self.reset_solution()
 
         # Populate solution with new results
-        if self._stats:
+        if start is not None:
             elapsed_time = time.time() - start
             self.solution.add('extime', elapsed_time)
             self.solution.add('niterations', self._n_iterations)
@@ -842,6 +949,90 @@ class NMPC(Controller, DynamicOptimization):
         uopt = u_opt[0:self._n_u] * self._u_scaling[0:self._n_u]
         return uopt
 
+    def prepare(self, cp=None, tvp=None, v0=None, **kwargs):
+        """
+        Preparation phase of the real-time iteration scheme. Linearizes the nonlinear program around the last iterate
+        (shifted by one interval if the option 'warm_start' is set to 'shift') or the initial guess `v0` and sets up
+        the QP of the next SQP step. Since the current state is not needed here, this can be run in between two
+        sampling instants. The QP is then solved by :meth:`feedback` as soon as the state is available.
+
+        :param cp: constant system parameters (these will be assumed constant along the prediction horizon)
+        :type cp: list or casadi DM, optional
+        :param tvp: time-varying system parameters (these can change during prediction horizon, entire parameter
+            history must be passed in)
+        :type tvp: dict, optional
+        :param v0: point of linearization. If not given, the last iterate is used
+        :type v0: list or casadi DM, optional
+        :return:
+        """
+        if not self._nlp_setup_done:
+            raise ValueError("Howdy! You need to setup the MPC before optimizing. Run .setup() on the MPC object.")
+        if not self._nlp_options['real_time_iteration']:
+            raise RuntimeError(f"The real-time iteration scheme is not active. Pass "
+                               f"options={{'real_time_iteration': True}} to {self.__class__.__name__}.setup().")
+
+        cp = self._check_constant_parameters(cp)
+        param = self._get_nlp_parameters(cp, tvp, **kwargs)
+
+        if v0 is not None:
+            v = check_and_wrap_to_DM(v0)
+        elif self._rti_v is not None:
+            v = self._rti_v
+            if self._nlp_options['warm_start'] == 'shift':
+                v = self._shift_horizon(v, self._horizon_ind)
+        else:
+            v = self._v0
+
+        lin = self._rti_linearization(v=v, p=param.cat)
+        self._rti_qp = {
+            'h': lin['H'],
+            'g': lin['grad'],
+            'a': lin['jac_g'],
+            'lba': self._g_lb - lin['g'],
+            'uba': self._g_ub - lin['g'],
+            'lbx': self._v_lb - v,
+            'ubx': self._v_ub - v
+        }
+        self._rti_v = v
+        self._rti_param = param
+
+    def feedback(self, x0):
+        """
+        Feedback phase of the real-time iteration scheme. Embeds the current state into the QP prepared by
+        :meth:`prepare` and returns the first input of the new iterate. Only one QP is solved, so the computation time
+        of this phase is bounded.
+
+        :param x0: current system state
+        :type x0: list or casadi DM
+        :return: u_opt: first piece of the control sequence
+        """
+        if self._rti_qp is None:
+            raise RuntimeError(f"The QP of the real-time iteration was not prepared. Run "
+                               f"{self.__class__.__name__}.prepare() before {self.__class__.__name__}.feedback().")
+
+        if self._stats:
+            start = time.time()
+
+        x0 = self._check_initial_state(x0)
+
+        # The initial state enters the QP only through the bounds of the step
+        ind = self._x_ind[0][0:self._n_x]
+        dx0 = x0 / ca.DM(self._x_scaling[0:self._n_x]) - self._rti_v[ind]
+        self._rti_qp['lbx'][ind] = dx0
+        self._rti_qp['ubx'][ind] = dx0
+
+        sol = self._rti_solver(**self._rti_qp)
+        stats = self._rti_solver.stats()
+        self._solver_status = stats['return_status'].lower()
+        self._solver_status_code = 1 if stats['success'] else -1
+
+        v = self._rti_v + sol['x']
+        self._nlp_solution = {'x': v, 'f': sol['cost'], 'lam_x': sol['lam_x'], 'lam_g': sol['lam_a']}
+        self._rti_v = v
+        self._rti_qp = None
+
+        return self._update_solution(v[self._u_ind[0]], self._rti_param, start=start if self._stats else None)
+
     def minimize_final_time(self, weight=1):
         """
 
@@ -1223,6 +1414,8 @@ class NMPC(Controller, DynamicOptimization):
                         references = ca.SX.sym('r', 0)
                     else:
                         references = ca.MX.sym('r', 0)
+                # Weights and set points are appended to the references if the cost is parametric
+                references = ca.vertcat(references, self.quad_terminal_cost.parameter_placeholder)
 
                 self._may_term_fun = ca.Function('mayor_term',
                                                  [model.t, model.x,
@@ -1283,6 +1476,8 @@ class NMPC(Controller, DynamicOptimization):
                         references = ca.SX.sym('r', 0)
                     else:
                         references = ca.MX.sym('r', 0)
+                # Weights and set points are appended to the references if the cost is parametric
+                references = ca.vertcat(references, self.quad_stage_cost.parameter_placeholder)
 
                 u_old = self.quad_stage_cost.input_change_placeholder
                 self._lag_term_fun = ca.Function('lagrange_term',
@@ -1469,9 +1664,9 @@ class NMPC(Controller, DynamicOptimization):
                     self._discrete_variables_bool.extend(model.discrete_u)
                 offset += model.n_u
 
+            z_ind = []
             if model.n_z > 0:
                 z = np.resize(np.array([], dtype=ca.MX), (self._prediction_horizon + 1, 1))
-                z_ind = []
                 for ii in range(self._prediction_horizon + 1):
                     z[ii, 0] = v[offset:offset + model.n_z]
                     z_ind.append([j for j in range(offset, offset + model.n_z)])
@@ -1480,6 +1675,10 @@ class NMPC(Controller, DynamicOptimization):
                     v_ub[offset:offset + model.n_z] = self._z_ub
                     offset += model.n_z
 
+            # Indices of the variables at the collocation or discretization points of every interval
+            x_col_ind = []
+            z_col_ind = []
+
             # Some other variables must be added, depending on the approximation method used
             if self._nlp_options['integration_method'] == 'collocation':
                 ip = np.resize(np.array([], dtype=ca.MX), (self._prediction_horizon, 1))
@@ -1487,6 +1686,7 @@ class NMPC(Controller, DynamicOptimization):
 
                 for ii in range(self._prediction_horizon):
                     ip[ii, 0] = v[offset:offset + n_xik]
+                    x_col_ind.append([j for j in range(offset, offset + n_xik)])
                     v_guess[offset:offset + n_xik] = x_ik_guess
                     v_lb[offset:offset + n_xik] = x_ik_lb
                     v_ub[offset:offset + n_xik] = x_ik_ub
@@ -1497,6 +1697,7 @@ class NMPC(Controller, DynamicOptimization):
 
                     if model.n_z > 0:
                         zp[ii, 0] = v[offset:offset + n_zik]
+                        z_col_ind.append([j for j in range(offset, offset + n_zik)])
                         v_guess[offset:offset + n_zik] = z_ik_guess
                         v_lb[offset:offset + n_zik] = z_ik_lb
                         v_ub[offset:offset + n_zik] = z_ik_ub
@@ -1506,6 +1707,7 @@ class NMPC(Controller, DynamicOptimization):
                 zp = np.resize(np.array([], dtype=ca.MX), (self._prediction_horizon, 1))
                 for ii in range(self._prediction_horizon):
                     zp[ii, 0] = v[offset:offset + n_zik]
+                    z_col_ind.append([j for j in range(offset, offset + n_zik)])
                     v_guess[offset:offset + n_zik] = z_ik_guess
                     v_lb[offset:offset + n_zik] = z_ik_lb
                     v_ub[offset:offset + n_zik] = z_ik_ub
@@ -1555,13 +1757,29 @@ class NMPC(Controller, DynamicOptimization):
                             self.quad_terminal_cost._trajectories_list[ii]['ref'], ca.MX):
                         tv_term_ref_list.append(catools.entry(name + '_tr', shape=1))
 
+            # Weights, set points and penalties of the soft constraints are parameters of the nonlinear program if the
+            # cost is parametric
+            n_sc_p = self.quad_stage_cost.parameter_placeholder.numel()
+            n_tc_p = self.quad_terminal_cost.parameter_placeholder.numel()
+            w_soft_stage_shape = (0, 0)
+            w_soft_term_shape = (0, 0)
+            if self._nlp_options['parametric_cost']:
+                if self.stage_constraint.is_soft:
+                    w_soft_stage_shape = (self.stage_constraint.size, self.stage_constraint.size)
+                if self.terminal_constraint.is_soft:
+                    w_soft_term_shape = (self.terminal_constraint.size, self.terminal_constraint.size)
+
             # Predefine parameters (those are fixed and not optimized)
             param_npl_mpc = catools.struct_symMX([catools.entry("tv_p", shape=(self._n_tvp, self._prediction_horizon)),
                                                   catools.entry("c_p", shape=model.n_p - self._n_tvp),
                                                   catools.entry('u_old',
                                                                 shape=len(self.quad_stage_cost._ind_input_changes)),
                                                   catools.entry('dt', shape=self._prediction_horizon),
-                                                  catools.entry('time', shape=1)] +
+                                                  catools.entry('time', shape=1),
+                                                  catools.entry('sc_p', shape=n_sc_p),
+                                                  catools.entry('tc_p', shape=n_tc_p),
+                                                  catools.entry('W_soft_stage', shape=w_soft_stage_shape),
+                                                  catools.entry('W_soft_term', shape=w_soft_term_shape)] +
                                                  tv_term_ref_list + tv_stage_ref_list)
 
             tv_p = param_npl_mpc['tv_p']
@@ -1588,6 +1806,7 @@ class NMPC(Controller, DynamicOptimization):
                 tv_ref_tc = ca.vertcat(*tv_ref_tc)
             else:
                 tv_ref_tc = ca.MX.sym('bla', 0)
+            tv_ref_tc = ca.vertcat(tv_ref_tc, param_npl_mpc['tc_p'])
 
             t_ind = []
             if self._minimize_final_time_flag is False:
@@ -1609,8 +1828,10 @@ class NMPC(Controller, DynamicOptimization):
             ind_g = 0
             # get the current sampling time
             time = param_npl_mpc['time']
+
+            # Collect the arguments of the stage-wise functions for every interval of the horizon
+            stages = []
             for ii in range(self._prediction_horizon):
-                x_ii = x[ii, 0]
                 if ii < self._control_horizon:
                     u_ii = u[ii, 0]
                     if ii >= 1:
@@ -1619,18 +1840,59 @@ class NMPC(Controller, DynamicOptimization):
                     else:
                         u_old0 = u_old
 
-                p_ii = self._rearrange_parameters(tv_p[:, ii], c_p)
-                tv_ref_sc_ii = tv_ref_sc[:, ii]
                 dt_ii = _dt[ii]
+                stages.append({'time': time, 'dt': dt_ii, 'x': x[ii, 0], 'u': u_ii, 'z': zp[ii, 0],
+                               'p': self._rearrange_parameters(tv_p[:, ii], c_p),
+                               'ref': ca.vertcat(tv_ref_sc[:, ii], param_npl_mpc['sc_p']), 'u_old': u_old0})
+                if self._nlp_options['integration_method'] == 'collocation':
+                    stages[-1]['ip'] = ip[ii, 0]
+
+                # update time in the horizon
+                time += dt_ii
+
+            # Evaluate the stage-wise functions over the whole horizon
+            if self._nlp_options['integration_method'] in ['idas', 'cvodes']:
+                int_args = [{'x0': ca.vertcat(st['x'], st['z']),
+                             'p': ca.vertcat(st['u'], st['p'], st['u_old'], st['ref'], st['dt'])} for st in stages]
+            elif self._nlp_options['integration_method'] in ['rk4', 'rk']:
+                int_args = [[st['time'], st['dt'], st['x'], st['u'], st['z'], st['p'], st['ref'], e_soft_stage,
+                             st['u_old']] for st in stages]
+            elif self._nlp_options['integration_method'] == 'collocation':
+                int_args = [[st['time'], st['dt'], st['ip'], st['x'], st['u'], st['z'], st['p'], e_soft_stage,
+                             st['ref'], st['u_old']] for st in stages]
+            else:
+                int_args = [[st['time'], st['dt'], st['x'], st['u'], st['z'], st['p']] for st in stages]
+            int_out = self._evaluate_over_horizon(int_dynamics_fun, int_args)
+
+            if self._lag_term_flag and (self._nlp_options['integration_method'] == 'discrete' or
+                                        self._nlp_options['objective_function'] == 'discrete'):
+                lag_out = self._evaluate_over_horizon(self._lag_term_fun, [
+                    [st['time'], st['x'], st['u'], st['z'], st['p'], st['ref'], st['u_old']] for st in stages])
+            else:
+                lag_out = None
+
+            if self.stage_constraint.is_set:
+                if self.stage_constraint.is_soft:
+                    stage_const_args = [[st['time'], st['x'], st['u'], st['z'], st['p'], e_soft_stage] for st in
+                                        stages]
+                else:
+                    stage_const_args = [[st['time'], st['x'], st['u'], st['z'], st['p']] for st in stages]
+                stage_const_out = self._evaluate_over_horizon(self._stage_constraints_fun, stage_const_args)
+
+            # Positions in the constraint list of the stage-wise constraints of every interval (used for shifting)
+            g_stage_items = []
+            for ii, stage in enumerate(stages):
+                n_items = len(g)
+                time = stage['time']
+                dt_ii = stage['dt']
+                x_ii = stage['x']
+                p_ii = stage['p']
 
                 if self._nlp_options['integration_method'] in ['idas', 'cvodes']:
-                    sol = int_dynamics_fun(x0=ca.vertcat(x_ii, zp[ii, 0]),
-                                           p=ca.vertcat(u_ii, p_ii, u_old0, tv_ref_sc_ii, dt_ii))
-                    x_ii_1 = sol['xf']
-                    quad = sol['qf']
+                    x_ii_1 = int_out[ii]['xf']
+                    quad = int_out[ii]['qf']
                 elif self._nlp_options['integration_method'] in ['rk4', 'rk']:
-                    [alg, x_ii_1, quad] = int_dynamics_fun(
-                        time, dt_ii, x_ii, u_ii, zp[ii, 0], p_ii, tv_ref_sc_ii, e_soft_stage, u_old0)
+                    [alg, x_ii_1, quad] = int_out[ii]
                     g.append(alg)
                     g_lb.append(np.zeros(alg.size1()))
                     g_ub.append(np.zeros(alg.size1()))
@@ -1638,8 +1900,7 @@ class NMPC(Controller, DynamicOptimization):
                         self._g_indices['dynamics_collocation'].append([ind_g, ind_g + alg.size1()])
                         ind_g += alg.size1()
                 elif self._nlp_options['integration_method'] == 'collocation':
-                    [g_coll, x_ii_1, quad] = int_dynamics_fun(
-                        time, dt_ii, ip[ii, 0], x_ii, u_ii, zp[ii, 0], p_ii, e_soft_stage, tv_ref_sc_ii, u_old0)
+                    [g_coll, x_ii_1, quad] = int_out[ii]
                     g.append(g_coll)
                     g_lb.extend(gk_col_lb)
                     g_ub.extend(gk_col_ub)
@@ -1647,7 +1908,7 @@ class NMPC(Controller, DynamicOptimization):
                         self._g_indices['dynamics_collocation'].append([ind_g, ind_g + g_coll.size1()])
                         ind_g += g_coll.size1()
                 elif self._nlp_options['integration_method'] == 'discrete':
-                    x_ii_1 = int_dynamics_fun(time, dt_ii, x_ii, u_ii, zp[ii, 0], p_ii)
+                    x_ii_1 = int_out[ii]
 
                 g.append(x[ii + 1, 0] - x_ii_1)
                 g_lb.append(np.zeros(model.n_x))
@@ -1661,14 +1922,18 @@ class NMPC(Controller, DynamicOptimization):
                 if self._lag_term_flag:
                     if self._nlp_options['integration_method'] == 'discrete' or \
                             self._nlp_options['objective_function'] == 'discrete':
-                        quad = self._lag_term_fun(time, x_ii, u_ii, zp[ii, 0], p_ii, tv_ref_sc_ii, u_old0)
+                        quad = lag_out[ii]
                     J += quad
                 if self._may_term_flag and ii == self._prediction_horizon - 1:
                     J += self._may_term_fun(time + dt_ii, x_ii_1, tv_ref_tc)
+                n_items_terminal = len(g)
                 if self.terminal_constraint.is_set and ii == self._prediction_horizon - 1:
                     if self.terminal_constraint.is_soft:
                         residual = self._terminal_constraints_fun(time, x_ii, zp[ii, 0], p_ii, e_soft_term)
-                        J += self.terminal_constraint.cost(e_soft_term)
+                        if self._nlp_options['parametric_cost']:
+                            J += ca.mtimes(e_soft_term.T, ca.mtimes(param_npl_mpc['W_soft_term'], e_soft_term))
+                        else:
+                            J += self.terminal_constraint.cost(e_soft_term)
                         g.append(residual)
                         g_lb.append([-ca.inf] * self.terminal_constraint.size * 2)
                         g_ub.append([ub for ub in self.terminal_constraint.ub])
@@ -1686,11 +1951,15 @@ class NMPC(Controller, DynamicOptimization):
                             self._g_indices['nonlin_term_const'].append(
                                 [ind_g, ind_g + residual.size1()])
                             ind_g += residual.size1()
+                n_items_stage = len(g)
 
                 if self.stage_constraint.is_set:
                     if self.stage_constraint.is_soft:
-                        residual = self._stage_constraints_fun(time, x_ii, u_ii, zp[ii, 0], p_ii, e_soft_stage)
-                        J += self.stage_constraint.cost(e_soft_stage)
+                        residual = stage_const_out[ii]
+                        if self._nlp_options['parametric_cost']:
+                            J += ca.mtimes(e_soft_stage.T, ca.mtimes(param_npl_mpc['W_soft_stage'], e_soft_stage))
+                        else:
+                            J += self.stage_constraint.cost(e_soft_stage)
                         g.append(residual)
                         g_lb.append([-ca.inf] * self.stage_constraint.size * 2)
                         g_ub.append([ub for ub in self.stage_constraint.ub])
@@ -1700,7 +1969,7 @@ class NMPC(Controller, DynamicOptimization):
                                 [ind_g, ind_g + residual.size1()])
                             ind_g += residual.size1()
                     else:
-                        residual = self._stage_constraints_fun(time, x_ii, u_ii, zp[ii, 0], p_ii)
+                        residual = stage_const_out[ii]
                         g.append(residual)
                         g_lb.append(self.stage_constraint.lb)
                         g_ub.append(self.stage_constraint.ub)
@@ -1709,8 +1978,11 @@ class NMPC(Controller, DynamicOptimization):
                                 [ind_g, ind_g + residual.size1()])
                             ind_g += residual.size1()
 
-                # update time in the horizon
-                time += dt_ii
+                g_stage_items.append(list(range(n_items, n_items_terminal)) + list(range(n_items_stage, len(g))))
+
+            g_offsets = np.cumsum([0] + [item.size1() for item in g])
+            g_stage_ind = [[j for item in items for j in range(g_offsets[item], g_offsets[item + 1])] for items in
+                           g_stage_items]
 
             if self._custom_constraint_flag:
                 if self._custom_constraint_is_soft_flag:
@@ -1746,7 +2018,10 @@ class NMPC(Controller, DynamicOptimization):
             self._v_ub = ca.DM(v_ub)
             self._u_ind = u_ind
             self._x_ind = x_ind
+            self._z_ind = z_ind
             self._dt_ind = t_ind
+            self._horizon_ind = [x_ind, u_ind, z_ind, x_col_ind, z_col_ind, [[j] for j in t_ind]]
+            self._g_stage_ind = g_stage_ind
             self._J = J
             self._v = v
             self._param_npl_mpc = param_npl_mpc
@@ -1760,6 +2035,10 @@ class NMPC(Controller, DynamicOptimization):
                 self.debugger = debugger
                 self._nlp_opts.update({'iteration_callback': debugger})
 
+            if self._nlp_options['warm_start'] == 'shift' and self._solver_name == 'ipopt':
+                # Let IPOPT use the shifted multipliers of the previous solution
+                self._nlp_opts.setdefault('ipopt.warm_start_init_point', 'yes')
+
             nlp_dict = {'f': self._J, 'x': self._v, 'p': self._param_npl_mpc, 'g': self._g}
             if self._solver_name in self._solver_name_list_nlp:
                 solver = ca.nlpsol('solver', self._solver_name, nlp_dict, self._nlp_opts)
@@ -1771,6 +2050,37 @@ class NMPC(Controller, DynamicOptimization):
                 )
             self._solver = solver
 
+            if self._nlp_options['real_time_iteration']:
+                self._setup_real_time_iteration()
+
+    def _setup_real_time_iteration(self):
+        """
+        Creates the functions needed for the real-time iteration scheme. These are the linearization of the nonlinear
+        program around a given point and the QP solver that computes the full step of one SQP iteration.
+
+        The Hessian of the QP is the Hessian of the objective function only, i.e. the second derivatives of the
+        constraints weighted by their multipliers are neglected. The scheme is therefore Gauss-Newton-like: for costs
+        that are quadratic in the optimization variables (e.g. quadratic stage and terminal costs on states and inputs)
+        this is the Gauss-Newton approximation of the Hessian of the Lagrangian, which is exact only if the constraints
+        are linear. For strongly nonlinear dynamics the step can therefore differ from a full Newton step.
+
+        :return:
+        """
+        p = self._param_npl_mpc.cat
+        H, grad = ca.hessian(self._J, self._v)
+        # NOTE: The diagonal is added structurally, so that the sparsity of the Hessian passed to the QP solver contains
+        #  the diagonal even for optimization variables without curvature, and matches the sparsity of the QP
+        H += ca.DM.zeros(ca.Sparsity.diag(self._n_v))
+        jac_g = ca.jacobian(self._g, self._v)
+        self._rti_linearization = ca.Function('rti_linearization', [self._v, p], [H, grad, self._g, jac_g],
+                                              ['v', 'p'], ['H', 'grad', 'g', 'jac_g'])
+
+        qp = {'h': H.sparsity(), 'a': jac_g.sparsity()}
+        opts = {'print_iter': False, 'print_header': False, 'error_on_fail': False}
+        self._rti_solver = ca.conic('rti_qp', 'qrqp', qp, opts)
+        self._rti_qp = None
+        self._rti_v = None
+
     def return_prediction(self):
         """
         Returns the mpc prediction.
@@ -126,7 +126,7 @@ class PID(Controller, Base):
         :param process_value:
         :return:
         """
-        if self._solution.get_by_id('x').is_empty():
+        if self._solution.is_empty('x'):
             process_value_vector = ca.DM.zeros(self._n_set_points, 3)
         else:
             process_value_vector = ca.reshape(self._solution.get_by_id('x:f'), self._n_set_points, 3)
@@ -139,7 +139,7 @@ class PID(Controller, Base):
 
         :return:
         """
-        if self._solution.get_by_id('p').is_empty():
+        if self._solution.is_empty('p'):
             set_point_vector = ca.DM.zeros(self._n_set_points, 3)
         else:
             params = self._solution.get_by_id('p:f')
@@ -355,7 +355,7 @@ class PID(Controller, Base):
             pv = ca.DM.zeros(self._n_set_points, 1)
         self._append_process_value(pv)
         self._append_set_point()
-        if self._solution.get_by_id('u').is_empty():
+        if self._solution.is_empty('u'):
             self._initialize_controller_output()
 
         args = self._solution.get_function_args()
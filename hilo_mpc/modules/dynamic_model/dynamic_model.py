@@ -2972,9 +2972,12 @@ class _Model(Base):
                                                            **col_points)
 
         use_c_code = kwargs.get('c_code', False)
+        cache = kwargs.get('cache')
         if use_c_code:
             gen_path, gen_name, gen_opts = self._generator(**kwargs)
-            if gen_path is not None:
+            if cache is not None and cache is not False:
+                self._setup_from_cache(function, cache, gen_name, gen_opts=gen_opts)
+            elif gen_path is not None:
                 self._c_name = generate_c_code(function, gen_path, gen_name, opts=gen_opts)
                 if self._compiler_opts['method'] in JIT and self._compiler_opts['compiler'] == 'shell':
                     self._compiler_opts['path'] = gen_path
@@ -3322,7 +3325,7 @@ class Model(_Model):
         :return:
         :rtype: DM
         """
-        if 't' not in self._solution or self._solution.get_by_id('t').is_empty():
+        if 't' not in self._solution or self._solution.is_empty('t'):
             # TODO: Put warnings here, to inform user?
             return None
         return self._solution.get_by_id('t:0')
@@ -3335,7 +3338,7 @@ class Model(_Model):
 
         :return:
         """
-        if 'x' not in self._solution or self._solution.get_by_id('x').is_empty():
+        if 'x' not in self._solution or self._solution.is_empty('x'):
             # TODO: Put warnings here, to inform user?
             return None
         return self._solution.get_by_id('x:0')
@@ -3348,7 +3351,7 @@ class Model(_Model):
 
         :return:
         """
-        if 'z' not in self._solution or self._solution.get_by_id('z').is_empty():
+        if 'z' not in self._solution or self._solution.is_empty('z'):
             # TODO: Put warnings here, to inform user?
             return None
         return self._solution.get_by_id('z:0')
@@ -3417,7 +3420,7 @@ class Model(_Model):
                           )
 
         if not self._y.is_empty():
-            if self._dydp_nnz > 0 and self._solution.get_by_id('p').is_empty():
+            if self._dydp_nnz > 0 and self._solution.is_empty('p'):
                 raise RuntimeError("Please set the values for the parameters by executing the "
                                    "'set_initial_parameter_values' method before setting the initial conditions.")
 
@@ -3516,7 +3519,7 @@ class Model(_Model):
             raise ValueError(f"Dimension mismatch for the input information of the equilibrium point. "
                              f"Got {u_eq.size1()}, expected {self._n_u}.")
 
-        if (self._dxdp_nnz > 0 or self._dzdp_nnz > 0) and self._solution.get_by_id('p').is_empty():
+        if (self._dxdp_nnz > 0 or self._dzdp_nnz > 0) and self._solution.is_empty('p'):
             # NOTE: The symbolic linearization should also contain the parameters of the original nonlinear model, i.e.,
             #  if the symbolic linearized model depends on parameters, so does the original nonlinear model, which we
             #  will use to check the equilibrium point.
@@ -3923,11 +3926,11 @@ class Model(_Model):
             # NOTE: Not sure if we want to throw an error here
             raise RuntimeError("Model is not set up. Run Model.setup() before running simulations.")
 
-        if self._solution.get_by_id('x').is_empty():
+        if self._solution.is_empty('x'):
             raise RuntimeError("No initial dynamical states found. Please set initial conditions before simulating the "
                                "model!")
 
-        if self._n_z > 0 and self._solution.get_by_id('z').is_empty():
+        if self._n_z > 0 and self._solution.is_empty('z'):
             raise RuntimeError("No initial algebraic states found. Please set initial conditions before simulating the "
                                "model!")
 
@@ -3993,14 +3996,14 @@ class Model(_Model):
                 # NOTE: Don't know if this is necessary
                 tf = ca.linspace(dt, tf, steps).T
 
-            if self._solution['t'].is_empty():
+            if self._solution.is_empty('t'):
                 self._solution.add('t', 0.)
         else:
             steps = 1
             grid = self._solution.grid
             tf = grid[1:].reshape(1, -1)
 
-            if self._solution['t'].is_empty():
+            if self._solution.is_empty('t'):
                 self._solution.add('t', grid[0])
             else:
                 if self._solution['t:f'] != grid[0]:
@@ -4022,9 +4025,9 @@ class Model(_Model):
         tf += t0
 
         if self._is_linearized and not self._linearization_about_trajectory:
-            x_eq_is_required = self._n_x > 0 and self._steady_state.get_by_id('x').is_empty()
-            z_eq_is_required = self._n_z > 0 and self._steady_state.get_by_id('z').is_empty()
-            u_eq_is_required = self._n_u > 0 and self._steady_state.get_by_id('u').is_empty()
+            x_eq_is_required = self._n_x > 0 and self._steady_state.is_empty('x')
+            z_eq_is_required = self._n_z > 0 and self._steady_state.is_empty('z')
+            u_eq_is_required = self._n_u > 0 and self._steady_state.is_empty('u')
             if x_eq_is_required or z_eq_is_required or u_eq_is_required:
                 raise RuntimeError("Model is linearized, but no equilibrium point was set. Please set equilibrium point"
                                    " before simulating the model!")
@@ -4209,6 +4212,132 @@ class Model(_Model):
             result['q'] = result.pop('qf')
         self._solution.update(**result)
 
+    def simulate_batch(
+            self,
+            x0: Union[NumArray, ca.DM],
+            u: Optional[Union[NumArray, ca.DM]] = None,
+            p: Optional[Union[NumArray, ca.DM]] = None,
+            steps: int = 1,
+            z0: Optional[Union[NumArray, ca.DM]] = None,
+            t0: Numeric = 0.,
+            parallelization: str = 'serial',
+            n_threads: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Simulates a batch of trajectories at once without touching the solution object of the model
+
+        Every column of **x0** (and **z0**) is one initial condition. The inputs **u** and parameters **p** can either
+        be supplied as a 2-D array with one column per trajectory (kept constant over all steps) or as a 3-D array of
+        shape (n_u x steps x batch) or (n_p x steps x batch), respectively.
+
+        :param x0: Initial dynamical states of dimension (n_x x batch)
+        :param u: Inputs of the trajectories
+        :param p: Parameters of the trajectories. If not supplied, the latest parameter values of the solution object
+            will be used for all trajectories.
+        :param steps: Number of sampling intervals to simulate, defaults to 1
+        :param z0: Initial algebraic states of dimension (n_z x batch)
+        :param t0: Initial time of all trajectories (only used for time-variant models), defaults to 0
+        :param parallelization: Evaluation mode of the batch, i.e. 'serial', 'openmp' or 'thread', defaults to
+            'serial'
+        :param n_threads: Maximum number of threads, if **parallelization** is 'thread'
+        :return: Dynamical states of dimension (n_x x (steps + 1) x batch) including the initial states
+        """
+        if self._function is None:
+            raise RuntimeError("Model is not set up. Run Model.setup() before running simulations.")
+        if parallelization not in ['serial', 'openmp', 'thread']:
+            raise ValueError(f"Parallelization mode '{parallelization}' not recognized. Choose one of 'serial', "
+                             f"'openmp' or 'thread'.")
+        if steps < 1:
+            raise ValueError("The 'steps' argument has to be greater than 0.")
+
+        if isinstance(x0, ca.DM):
+            x0 = x0.full()
+        x0 = np.asarray(x0, dtype=float)
+        if x0.ndim < 2:
+            x0 = x0.reshape(self._n_x, -1)
+        if x0.shape[0] != self._n_x:
+            raise ValueError(f"Dimension mismatch. Supplied dimension for the initial states 'x0' is "
+                             f"{x0.shape[0]}x{x0.shape[1]}, but required dimension is {self._n_x}xN.")
+        n_batch = x0.shape[1]
+
+        def _stack(name, value, n_dim):
+            """Stack a (n x batch) or (n x steps x batch) array into (n x batch*steps) in batch-major order"""
+            if isinstance(value, ca.DM):
+                value = value.full()
+            value = np.asarray(value, dtype=float)
+            if value.ndim < 2:
+                value = value.reshape(n_dim, -1)
+            if value.shape[0] != n_dim:
+                raise ValueError(f"Dimension mismatch. Supplied dimension for '{name}' is {value.shape}, but required "
+                                 f"first dimension is {n_dim}.")
+            if value.ndim == 2:
+                if value.shape[1] == 1:
+                    value = np.repeat(value, n_batch, axis=1)
+                elif value.shape[1] != n_batch:
+                    raise ValueError(f"Dimension mismatch. Supplied dimension for '{name}' is {value.shape}, but "
+                                     f"required dimension is {n_dim}x{n_batch}.")
+                return np.repeat(value, steps, axis=1)
+            if value.shape[1:] != (steps, n_batch):
+                raise ValueError(f"Dimension mismatch. Supplied dimension for '{name}' is {value.shape}, but required "
+                                 f"dimension is {n_dim}x{steps}x{n_batch}.")
+            return value.transpose(0, 2, 1).reshape(n_dim, -1)
+
+        parameter_args = []
+        if self._n_u > 0:
+            if u is None:
+                raise RuntimeError("No input 'u' to the system was supplied")
+            parameter_args.append(_stack('u', u, self._n_u))
+        if self._n_p > 0:
+            if p is None:
+                if 'p' not in self._solution or self._solution.is_empty('p'):
+                    raise RuntimeError("No parameter 'p' of the system was supplied")
+                p = self._solution.get_by_id('p:f')
+            parameter_args.append(_stack('p', p, self._n_p))
+        if self._is_time_variant:
+            dt = self._solution.dt
+            if dt is None:
+                raise RuntimeError("Batched simulation of time-variant models requires a sampling time 'dt'")
+            t_args = t0 + dt * np.arange(steps).reshape(1, -1)
+            parameter_args.append(np.tile(t_args, (1, n_batch)))
+        if self._is_linearized and not self._linearization_about_trajectory:
+            steady_state = []
+            for k, n_k in [('x', self._n_x), ('z', self._n_z), ('u', self._n_u)]:
+                if n_k > 0:
+                    eq = self._steady_state.get_by_id(k)
+                    if eq.is_empty():
+                        raise RuntimeError("Model is linearized, but no equilibrium point was set. Please set "
+                                           "equilibrium point before simulating the model!")
+                    steady_state.append(eq[:, -1].full())
+            if steady_state:
+                parameter_args.append(np.tile(np.vstack(steady_state), (1, n_batch * steps)))
+
+        args = {'x0': x0}
+        if parameter_args:
+            args['p'] = np.vstack(parameter_args)
+        if self._n_z > 0:
+            if z0 is None:
+                if self._solution.is_empty('z'):
+                    raise RuntimeError("No initial algebraic states found. Please supply 'z0' for the batch.")
+                z0 = self._solution.get_by_id('z:f')
+            z0 = _stack('z0', z0, self._n_z)
+            args['z0'] = z0
+        if not self._x_col.is_empty():
+            args['x_col'] = np.repeat(np.tile(x0, (self._collocation_points.degree, 1)), steps, axis=1)
+        if not self._z_col.is_empty():
+            args['z_col'] = np.tile(args['z0'], (self._collocation_points.degree, 1))
+
+        function = self._function
+        if steps > 1:
+            function = function.mapaccum(steps)
+        if parallelization == 'thread' and n_threads is not None:
+            function = function.map(n_batch, parallelization, n_threads)
+        else:
+            function = function.map(n_batch, parallelization)
+        result = function(**args)
+
+        xf = result['xf'].full().reshape(self._n_x, n_batch, steps).transpose(0, 2, 1)
+        return np.concatenate([x0[:, np.newaxis, :], xf], axis=1)
+
     def generate_data(
             self,
             signal_type: str,
@@ -153,11 +153,11 @@ class _Estimator(Estimator, Base, metaclass=ABCMeta):
             msg = f"{' '.join(type_)} is not set up. Run {self.__class__.__name__}.setup() before running simulations."
             raise RuntimeError(msg)
 
-        if self.n_x > 0 and self._solution.get_by_id('x').is_empty():
+        if self.n_x > 0 and self._solution.is_empty('x'):
             raise RuntimeError(f"No initial guess for the states found. Please set initial guess before running the "
                                f"{self.type}!")
 
-        if self._n_z > 0 and self._solution.get_by_id('z').is_empty():
+        if self._n_z > 0 and self._solution.is_empty('z'):
             raise RuntimeError(f"No initial guess for the algebraic variables found. Please set initial guess before "
                                f"running the {self.type}!")
 
@@ -178,7 +178,7 @@ class _Estimator(Estimator, Base, metaclass=ABCMeta):
             else:
                 steps = int(tf / dt)
 
-                if self._solution['t'].is_empty():
+                if self._solution.is_empty('t'):
                     self._solution.add('t', 0.)
         else:
             raise NotImplementedError("Support for grids is not yet implemented in the Kalman filter.")
@@ -137,6 +137,13 @@ class MovingHorizonEstimator(Estimator, DynamicOptimization):
         self._p_ind = []
         self._x_ind = []
         self._w_ind = []
+        self._x_col_ind = []
+        self._z_col_ind = []
+        self._g_stage_ind = []
+
+        # Multipliers for the warm start of the next estimation
+        self._lam_x0 = None
+        self._lam_g0 = None
 
         # Initialize generic stage and terminal constraints
         self.stage_constraint = GenericConstraint(self._model)
@@ -308,6 +315,24 @@ class MovingHorizonEstimator(Estimator, DynamicOptimization):
             if u_meas is not None:
                 self._u_history.pop(0)
 
+    def _update_warm_start(self, sol):
+        """
+        Updates the initial guess of the next estimation with the given solution. If the option 'warm_start' is set to
+        'shift', the solution and its multipliers are shifted one interval ahead, since the horizon of the next
+        estimation will be moved by one measurement.
+
+        :param sol: solution of the nonlinear program
+        :type sol: dict
+        :return:
+        """
+        if self._nlp_options['warm_start'] == 'shift':
+            blocks = [self._x_ind, self._w_ind, self._x_col_ind, self._z_col_ind]
+            self._v0 = self._shift_horizon(sol['x'], blocks)
+            self._lam_x0 = self._shift_horizon(sol['lam_x'], blocks)
+            self._lam_g0 = self._shift_horizon(sol['lam_g'], [self._g_stage_ind])
+        else:
+            self._v0 = sol['x']
+
     def estimate(self, x_arrival=None, p_arrival=None, v0=None, runs=0, **kwargs):
         """
         Compute MHE
@@ -319,6 +344,8 @@ class MovingHorizonEstimator(Estimator, DynamicOptimization):
             initial guess v0 randomly.
             ACHTUNG: this could cause problems with the integrators or give something outside constraints.
             The output will be the solution with the minimum objective function (default 0)
+            The runs are distributed over worker processes if the option 'n_jobs' is greater than 1 and stop early once
+            the objective function is below the option 'multi_start_tol'. The worker processes are shut down by close().
         :param kwargs:
         :return: u_opt: first piece of optimal control sequence
         """
@@ -371,32 +398,23 @@ class MovingHorizonEstimator(Estimator, DynamicOptimization):
             if v0 is None:
                 v0 = self._v0
 
-            if runs == 0:
-                sol = self._solver(x0=v0, lbx=self._v_lb, ubx=self._v_ub, lbg=self._g_lb, ubg=self._g_ub, p=param)
-                self._nlp_solution = sol
+            # Multipliers of the shifted previous solution
+            lam0 = None
+            if self._nlp_options['warm_start'] == 'shift' and self._lam_x0 is not None:
+                lam0 = {'lam_x0': self._lam_x0, 'lam_g0': self._lam_g0}
 
-                if self._model.n_p > 0:
-                    p_opt = sol['x'][self._p_ind[0]] * self._p_scaling
+            sol = self._multi_start(v0, max(runs, 1), param, lam0=lam0, pert_factor=kwargs.get('pert_factor', 0.1))
+            self._nlp_solution = sol
 
-                # NOTE: this returns the one step-ahead prediction.
-                #  To return the filtered prediction one need to access -2, but remember
-                #  that the time that enters the solution object must be one time step back!
-                x_opt = sol['x'][self._x_ind[-1]] * self._x_scaling
-                self._v0 = sol['x']
-            else:
-                pert_factor = kwargs.get('pert_factor', 0.1)
-                f_r_better = np.inf
-                v00 = v0
-                for r in range(runs):
-                    sol = self._solver(x0=v00, lbx=self._v_lb, ubx=self._v_ub, lbg=self._g_lb, ubg=self._g_ub, p=param)
-                    if sol['f'] < f_r_better:
-                        f_r_better = sol['f']
-                        self._nlp_solution = sol
-                        if self._model.n_p:
-                            p_opt = sol['x'][self._p_ind[0]] * self._p_scaling
-                        x_opt = sol['x'][self._x_ind[-1]] * self._x_scaling
-                        self._v0 = sol['x']
-                    v00 = v0 + v0 * (1 - 2 * np.random.rand(self._n_v)) * pert_factor
+            if self._model.n_p > 0:
+                p_opt = sol['x'][self._p_ind[0]] * self._p_scaling
+
+            # NOTE: this returns the one step-ahead prediction.
+            #  To return the filtered prediction one need to access -2, but remember
+            #  that the time that enters the solution object must be one time step back!
+            x_opt = sol['x'][self._x_ind[-1]] * self._x_scaling
+            if self._nlp_options['warm_start']:
+                self._update_warm_start(sol)
 
             # Get the status of the solver
             self._solver_status_wrapper()
@@ -650,6 +668,7 @@ class MovingHorizonEstimator(Estimator, DynamicOptimization):
 
                 for ii in range(self._prediction_horizon):
                     ip[ii, 0] = v[offset:offset + n_xik]
+                    self._x_col_ind.append([j for j in range(offset, offset + n_xik)])
                     v_guess[offset:offset + n_xik] = x_ik_guess
                     v_lb[offset:offset + n_xik] = x_ik_lb
                     v_ub[offset:offset + n_xik] = x_ik_ub
@@ -658,6 +677,7 @@ class MovingHorizonEstimator(Estimator, DynamicOptimization):
 
                     if model.n_z > 0:
                         zp[ii, 0] = v[offset:offset + n_zik]
+                        self._z_col_ind.append([j for j in range(offset, offset + n_zik)])
                         v_guess[offset:offset + n_zik] = z_ik_guess
                         v_lb[offset:offset + n_zik] = z_ik_lb
                         v_ub[offset:offset + n_zik] = z_ik_ub
@@ -700,7 +720,10 @@ class MovingHorizonEstimator(Estimator, DynamicOptimization):
             # Time at the beginning of the horizon (in the past)
             time = time_now - ca.sum1(_dt)
 
+            # Positions in the constraint list of the stage-wise constraints of every interval (used for shifting)
+            g_stage_items = []
             for ii in range(self._horizon):
+                n_items = len(g)
                 x_ii = x[ii, 0]
                 if self._state_noise_flag:
                     w_ii = w[ii, 0]
@@ -759,6 +782,12 @@ class MovingHorizonEstimator(Estimator, DynamicOptimization):
                 # update time in the horizon
                 time += dt_ii
 
+                g_stage_items.append(list(range(n_items, len(g))))
+
+            g_offsets = np.cumsum([0] + [item.size1() for item in g])
+            self._g_stage_ind = [[j for item in items for j in range(g_offsets[item], g_offsets[item + 1])] for items
+                                 in g_stage_items]
+
             if self._custom_constraints_flag:
                 raise NotImplementedError('Custom constraints are not yet implemented')
 
@@ -779,6 +808,10 @@ class MovingHorizonEstimator(Estimator, DynamicOptimization):
             self._n_v = n_v
             self._ext_parameters = ext_parameters
 
+            if self._nlp_options['warm_start'] == 'shift' and self._solver_name == 'ipopt':
+                # Let IPOPT use the shifted multipliers of the previous solution
+                self._nlp_opts.setdefault('ipopt.warm_start_init_point', 'yes')
+
             nlp_dict = {'f': self._J, 'x': self._v, 'p': self._param_npl_mhe, 'g': self._g}
             if self._solver_name == 'ipopt':
                 solver = ca.nlpsol("solver", 'ipopt', nlp_dict, self._nlp_opts)
@@ -805,6 +838,9 @@ class MovingHorizonEstimator(Estimator, DynamicOptimization):
         possible_choices['print_level'] = [0, 1]
 
         possible_choices['arrival_guess_update'] = ['filtering', 'smoothing']
+        possible_choices['warm_start'] = [True, False, 'shift']
+        possible_choices['n_jobs'] = None
+        possible_choices['multi_start_tol'] = None
 
         option_list = list(possible_choices.keys())
 
@@ -813,7 +849,10 @@ class MovingHorizonEstimator(Estimator, DynamicOptimization):
             'collocation_points': 'radau',
             'degree': 3,
             'print_level': 1,
-            'arrival_guess_update': 'smoothing'
+            'arrival_guess_update': 'smoothing',
+            'warm_start': True,
+            'n_jobs': 1,
+            'multi_start_tol': None
         }
 
         opts = {}
@@ -834,6 +873,8 @@ class MovingHorizonEstimator(Estimator, DynamicOptimization):
             else:
                 default_opts[key] = value
 
+        default_opts['n_jobs'] = self._check_n_jobs(default_opts['n_jobs'])
+
         if default_opts.get('integration_method') != 'discrete' and self._model.discrete is True:
             warnings.warn(
                 f"The integration method is set to {default_opts.get('integration_method')} but I notice that the model"
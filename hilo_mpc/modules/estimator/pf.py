@@ -21,16 +21,18 @@
 #   along with HILO-MPC. If not, see <http://www.gnu.org/licenses/>.
 #
 
+import os
 from typing import Callable, Optional
 import warnings
 
 import casadi as ca
 import numpy as np
+from scipy.special import logsumexp
 from scipy.stats import norm
 
 from .base import _Estimator
 from ..dynamic_model.dynamic_model import Model
-from ...util.util import convert
+from ...util.util import convert, vectorize_sx_function
 
 
 class ParticleFilter(_Estimator):
@@ -46,7 +48,14 @@ class ParticleFilter(_Estimator):
     :param variant:
     :param roughening:
     :param prior_editing:
-    :param kwargs:
+    :param resampling: Resampling scheme. Either 'multinomial' (default), 'systematic', 'stratified' or 'residual'.
+    :param resampling_threshold: Fraction of the sample size. If supplied, the particles are only resampled when their
+        effective sample size drops below this fraction of the sample size. Otherwise, their weights are carried over
+        to the next estimation. By default the particles are resampled at every estimation.
+    :param kwargs: Tuning parameter 'K' of roughening and prior editing (defaults to 0.2) and maximum number of
+        retries 'max_retries' of prior editing (defaults to 5). During prior editing, only the particles whose predicted
+        measurements deviate by more than 6 standard deviations from the measurement are roughened and propagated
+        again, until they are within this bound or the maximum number of retries is reached.
     """
     def __init__(
             self,
@@ -57,6 +66,8 @@ class ParticleFilter(_Estimator):
             variant: Optional[str] = None,
             roughening: bool = False,
             prior_editing: bool = False,
+            resampling: str = 'multinomial',
+            resampling_threshold: Optional[float] = None,
             **kwargs
     ):
         """Constructor method"""
@@ -74,8 +85,17 @@ class ParticleFilter(_Estimator):
             if K is None:
                 K = .2
             self._roughening_tuning_param = K
+        if self._prior_editing:
+            max_retries = kwargs.get('max_retries')
+            if max_retries is None:
+                max_retries = 5
+            self._prior_editing_retries = max_retries
 
-        self._setup_normpdf()
+        self.resampling = resampling
+        self.resampling_threshold = resampling_threshold
+        self._weights = None
+
+        self._parallelization = 'serial'
         self._sample_size = 15
         self._pdf = lhsnorm
         self._transpose_pdf = None
@@ -87,23 +107,12 @@ class ParticleFilter(_Estimator):
         """
         self._type = 'particle filter'
 
-    def _setup_normpdf(self):
-        """
-
-        :return:
-        """
-        x = ca.SX.sym('x')
-        mu = ca.SX.sym('mu')
-        sigma = ca.SX.sym('sigma')
-
-        y = ca.exp(-.5 * ((x - mu) / sigma) ** 2) / (ca.sqrt(2 * ca.pi) * sigma)
-
-        self._normpdf = ca.Function('normpdf', [x, mu, sigma], [y])
-
-    def _propagate_particles(self, n_samples):
+    def _propagate_particles(self, n_samples, parallelization='serial', n_threads=None):
         """
 
         :param n_samples:
+        :param parallelization:
+        :param n_threads:
         :return:
         """
         n_x = self._model.n_x
@@ -125,14 +134,53 @@ class ParticleFilter(_Estimator):
             'data_format': ca.DM
         })
 
-        sol = self._model(x0=X, p=up)
-        X_prop = sol['xf']
         if n_y == 0:
             warnings.warn(f"The model has no measurement equations, I am assuming measurements of all states "
                           f"{self._model.dynamical_state_names} are available.")
-            Y = X_prop
+
+        # Propagation of a single particle, which is also used to propagate individual particles again during prior
+        # editing
+        x = ca.MX.sym('x', n_x)
+        sol = self._model(x0=x, p=up)
+        x_prop = sol['xf']
+        propagation = ca.Function('propagation', [x, up], [x_prop, x_prop if n_y == 0 else sol['yf']],
+                                  ['x', 'p'], ['x_prop', 'y'])
+        self._propagation_function = propagation
+
+        if parallelization == 'serial':
+            sol = self._model(x0=X, p=up)
+            X_prop = sol['xf']
+            Y = X_prop if n_y == 0 else sol['yf']
         else:
-            Y = sol['yf']
+            if parallelization == 'numpy':
+                if not self._model.discrete:
+                    raise ValueError("The evaluation of the particle propagation with NumPy is only available for "
+                                     "discrete-time models")
+                propagation = vectorize_sx_function(propagation.expand())
+                self._propagation_function = propagation
+
+                def predict(X, p, w, v):
+                    """
+
+                    :param X:
+                    :param p:
+                    :param w:
+                    :param v:
+                    :return:
+                    """
+                    X_prop, Y = propagation(X, p)
+                    return {'X_prop': X_prop + w, 'Y': Y + v}
+
+                self._predict_function = predict
+                return
+
+            if parallelization == 'thread':
+                if n_threads is None:
+                    n_threads = os.cpu_count()
+                propagation = propagation.map(n_samples, parallelization, n_threads)
+            else:
+                propagation = propagation.map(n_samples, parallelization)
+            X_prop, Y = propagation(X, up)
 
         w = ca.MX.sym('w', n_x, n_samples)
         v = ca.MX.sym('v', n_y, n_samples)
@@ -148,22 +196,70 @@ class ParticleFilter(_Estimator):
                                              ['X_prop', 'Y'])
 
     def _evaluate_likelihood(self, n_samples):
-        """"""
+        """
+        Sets up the weights of the particles from the multivariate Gaussian likelihood of the measurement. The
+        likelihood is evaluated in the log domain via the Cholesky factor of the measurement noise covariance and the
+        weights are normalized with the log-sum-exp trick, such that they don't underflow for a large number of
+        measurements.
+
+        :param n_samples:
+        :return:
+        """
         n_y = self._model.n_y
 
-        y = ca.SX.sym('y', n_y)
-        Y = ca.SX.sym('Y', n_y, n_samples)
+        # Lower Cholesky factor of the measurement noise covariance (casadi.chol returns the upper factor)
         R = ca.SX.sym('R', (n_y, n_y))
+        factorization = ca.Function('factorization', [R], [ca.chol(R).T])
+
+        # Squared Mahalanobis distance of a single particle by forward substitution
+        y = ca.SX.sym('y', n_y)
+        y_k = ca.SX.sym('y_k', n_y)
+        L = ca.SX.sym('L', (n_y, n_y))
+        e = y_k - y
+        z = []
+        for i in range(n_y):
+            z_i = e[i]
+            for j in range(i):
+                z_i -= L[i, j] * z[j]
+            z.append(z_i / L[i, i])
+        distance = ca.Function('distance', [y, y_k, L], [ca.sumsqr(ca.vertcat(*z))])
+
+        y = ca.MX.sym('y', n_y)
+        Y = ca.MX.sym('Y', n_y, n_samples)
+        R = ca.MX.sym('R', (n_y, n_y))
+        L = factorization(R)
 
-        q = self._normpdf(Y, y, ca.sqrt(R))  # Since R is usually a diagonal matrix, we can use ca.sqrt() here. We need
-        # to change this, if we have non-diagonal matrices, i.e. covariance entries.
-        q /= ca.sum2(q)
+        # NOTE: The normalization constant of the Gaussian is the same for all particles and cancels out
+        log_q = -.5 * distance.map(n_samples)(y, Y, L)
+        log_q_max = ca.mmax(log_q)
+        log_q -= log_q_max + ca.log(ca.sum2(ca.exp(log_q - log_q_max)))
 
         self._update_function = ca.Function('likelihood',
                                             [y, Y, R],
-                                            [q],
+                                            [ca.exp(log_q), log_q],
                                             ['y', 'Y', 'R'],
-                                            ['q'])
+                                            ['q', 'log_q'])
+
+    def _evaluate_vectorized(self, X, y, w, v, R, p=None):
+        """
+        Evaluates the propagation of the particles with NumPy and their likelihood (see option 'parallelization' of
+        ParticleFilter.setup)
+
+        :param X:
+        :param y:
+        :param w:
+        :param v:
+        :param R:
+        :param p:
+        :return:
+        """
+        if p is None:
+            p = np.zeros((self._n_u + self._n_p, 1))
+        prediction = self._predict_function(X=X, p=p, w=w, v=v)
+        X_prop = ca.DM(prediction['X_prop'])
+        Y = ca.DM(prediction['Y'])
+        update = self._update_function(y=y, Y=Y, R=R)
+        return {'X_prop': X_prop, 'Y': Y, 'q': update['q'], 'log_q': update['log_q']}
 
     def _initial_sample(self) -> None:
         """
@@ -175,16 +271,17 @@ class ParticleFilter(_Estimator):
         if self._transpose_pdf:
             X = X.T
         elif self._transpose_pdf is None:
-            if X.shape != (2, self._sample_size):
+            if X.shape != (self._n_x, self._sample_size):
                 X = X.T
-                if X.shape != (2, self._sample_size):
-                    raise ValueError(f"Dimension mismatch. Expected dimension 2x{self._sample_size}, got "
+                if X.shape != (self._n_x, self._sample_size):
+                    raise ValueError(f"Dimension mismatch. Expected dimension {self._n_x}x{self._sample_size}, got "
                                      f"{X.shape[1]}x{X.shape[0]}.")
                 self._transpose_pdf = True
             else:
                 self._transpose_pdf = False
         X = convert(X, ca.DM)
-        self._solution.set('X', X[:])
+        self._solution.set('X', ca.vec(X))
+        self._weights = None
 
     @property
     def probability_density_function(self) -> Callable[[np.ndarray, np.ndarray, int], np.ndarray]:
@@ -260,6 +357,35 @@ class ParticleFilter(_Estimator):
     def variant(self, variant):
         self._variant = variant
 
+    @property
+    def resampling(self) -> str:
+        """
+
+        :return:
+        """
+        return self._resampling
+
+    @resampling.setter
+    def resampling(self, resampling: str) -> None:
+        if resampling not in RESAMPLING:
+            raise ValueError(f"Resampling scheme '{resampling}' not recognized. Choose one of 'multinomial', "
+                             f"'systematic', 'stratified' or 'residual'.")
+        self._resampling = resampling
+
+    @property
+    def resampling_threshold(self) -> Optional[float]:
+        """
+
+        :return:
+        """
+        return self._resampling_threshold
+
+    @resampling_threshold.setter
+    def resampling_threshold(self, threshold: Optional[float]) -> None:
+        if threshold is not None and not 0. <= threshold <= 1.:
+            raise ValueError("The resampling threshold needs to be a fraction of the sample size between 0 and 1")
+        self._resampling_threshold = threshold
+
     @property
     def sample_size(self):
         """
@@ -276,6 +402,13 @@ class ParticleFilter(_Estimator):
 
     def setup(self, **kwargs) -> None:
         """
+        Sets up the particle filter. The following keyword arguments are supported:
+
+        * n_samples: number of particles
+        * parallelization: evaluation of the propagation of the particles. Either 'serial' (default), 'openmp' or
+          'thread' (see casadi.Function.map) or 'numpy', which evaluates the propagation of all particles at once with
+          NumPy (only available for discrete-time models)
+        * n_threads: maximum number of threads if parallelization is 'thread' (defaults to the number of CPUs)
 
         :param kwargs:
         :return:
@@ -288,7 +421,15 @@ class ParticleFilter(_Estimator):
         else:
             self._sample_size = n_s
 
-        self._propagate_particles(n_s)
+        parallelization = kwargs.get('parallelization')
+        if parallelization is None:
+            parallelization = 'serial'
+        elif parallelization not in ['serial', 'openmp', 'thread', 'numpy']:
+            raise ValueError(f"Parallelization '{parallelization}' not recognized. Choose one of 'serial', 'openmp', "
+                             f"'thread' or 'numpy'.")
+        self._parallelization = parallelization
+
+        self._propagate_particles(n_s, parallelization=parallelization, n_threads=kwargs.get('n_threads'))
         self._evaluate_likelihood(n_s)
 
         n_x = self._model.n_x
@@ -316,16 +457,19 @@ class ParticleFilter(_Estimator):
         Q = ca.MX.sym('Q', (n_x, n_x))
         R = ca.MX.sym('R', (n_y, n_y))
 
-        prediction = self._predict_function(X=X, p=up, w=w, v=v)
-        X_prop = prediction['X_prop']
-        Y = prediction['Y']
-        update = self._update_function(y=y, Y=Y, R=R)
+        if parallelization == 'numpy':
+            self._function = self._evaluate_vectorized
+        else:
+            prediction = self._predict_function(X=X, p=up, w=w, v=v)
+            X_prop = prediction['X_prop']
+            Y = prediction['Y']
+            update = self._update_function(y=y, Y=Y, R=R)
 
-        self._function = ca.Function('function',
-                                     [X, y, up, w, v, R],
-                                     [X_prop, Y, update['q']],
-                                     ['X', 'y', 'p', 'w', 'v', 'R'],
-                                     ['X_prop', 'Y', 'q'])
+            self._function = ca.Function('function',
+                                         [X, y, up, w, v, R],
+                                         [X_prop, Y, update['q'], update['log_q']],
+                                         ['X', 'y', 'p', 'w', 'v', 'R'],
+                                         ['X_prop', 'Y', 'q', 'log_q'])
 
         self._n_x = n_x
         self._n_y = n_y
@@ -337,75 +481,78 @@ class ParticleFilter(_Estimator):
         self._process_noise_covariance = ca.DM.zeros(Q.shape)
         self._measurement_noise_covariance = ca.DM.zeros(R.shape)
 
-    def estimate(self, *args, **kwargs):
+    def _filter_step(self, args):
         """
+        Propagates the particles by one sampling interval, weights them according to the measurement and resamples
+        them if necessary
 
-        :param args:
-        :param kwargs:
-        :return:
+        :param args: particles 'X' and measurement 'y' as well as inputs and parameters 'p' of the sampling interval
+        :type args: dict
+        :return: propagated particles, estimated states, estimated measurements and error covariance
         """
-        # TODO: Adjust according to Model.simulate
-        self._check_setup()
-
-        kwargs['skip'] = ['x']
-
-        args = self._process_inputs(**kwargs)
-        tf = args.pop('t0')
-        steps = args.pop('steps')
-        if self._solution.get_by_id('X').is_empty():
-            self._initial_sample()
-        args['X'] = ca.reshape(self._solution.get_by_id('X:f'), self._n_x, self._sample_size)
-
-        if steps > 1:
-            raise NotImplementedError("Particle filter is not yet implemented with steps > 1.")
-        else:
-            R = self._measurement_noise_covariance
-            w = self._pdf(np.zeros(self._n_x), self._process_noise_covariance.full(), self._sample_size)
-            # v = self._pdf(np.zeros(self._n_y), self._measurement_noise_covariance.full(), self._sample_size)
-            v = ca.sqrt(R) @ np.random.randn(self._n_y, self._sample_size)  # Only possible since R is usually a
-            # diagonal matrix (see self._evaluate_likelihood)
-            if self._transpose_pdf:
-                w = w.T
-                # v = v.T
-            args['w'] = w
-            args['v'] = v
-            args['R'] = R
-
-            result = self._function(**args)
-            Y = result['Y']
-
-            # Prior editing
-            if self._prior_editing:
-                mag = args['y'] - Y
-                need_roughening = ca.fabs(mag) > 6 * ca.sqrt(R)
-                n_r = int(ca.sum2(need_roughening))
-                while n_r > 0:
-                    # TODO: Check out prior editing in more detail. Should we only use the X that are indexed by
-                    #  need_roughening for the calculation of dx? Do we roughen already roughened X, or do we just
-                    #  replace the ones that were improved by the roughening and keep the other ones at their original
-                    #  value?
-                    dx = np.max(args['X'], axis=1) - np.min(args['X'], axis=1)
-                    dx = self._pdf(np.zeros(self._n_x), self._roughening_tuning_param * np.diag(dx) *
-                                   n_r ** (-1 / self._n_x), n_r)
+        R = self._measurement_noise_covariance
+        w = self._pdf(np.zeros(self._n_x), self._process_noise_covariance.full(), self._sample_size)
+        # v = self._pdf(np.zeros(self._n_y), self._measurement_noise_covariance.full(), self._sample_size)
+        v = np.linalg.cholesky(R.full()) @ np.random.randn(self._n_y, self._sample_size)
+        if self._transpose_pdf:
+            w = w.T
+            # v = v.T
+        args['w'] = w
+        args['v'] = v
+        args['R'] = R
+
+        result = self._function(**args)
+
+        # NOTE: The particles are handled with NumPy, since indexing DM objects is slow for large sample sizes
+        X = np.asarray(result['X_prop'])
+        Y = np.asarray(result['Y'])
+        log_q = np.asarray(result['log_q']).flatten()
+
+        # Prior editing
+        if self._prior_editing:
+            X_prior = np.array(args['X'])
+            y_meas = np.asarray(args['y'])
+            threshold = 6. * np.sqrt(np.diag(R.full()))[:, None]
+            need_roughening = np.any(np.abs(y_meas - Y) > threshold, axis=0)
+            if need_roughening.any():
+                dx = np.max(X_prior, axis=1) - np.min(X_prior, axis=1)
+                p = args.get('p')
+                if p is None:
+                    p = np.zeros((self._n_u + self._n_p, 1))
+                retries = 0
+                while need_roughening.any() and retries < self._prior_editing_retries:
+                    # Only the particles whose predicted measurements are too far off are roughened and propagated
+                    # again
+                    ind = np.flatnonzero(need_roughening)
+                    n_r = ind.size
+                    dx_r = self._pdf(np.zeros(self._n_x), self._roughening_tuning_param * np.diag(dx) *
+                                     n_r ** (-1 / self._n_x), n_r)
                     if self._transpose_pdf:
-                        dx = dx.T
-                    mask = np.where(need_roughening == 1)[1]
-                    args['X'][:, mask] += dx
-
-                    result = self._function(**args)
-
-                    Y = result['Y']
-                    mag = args['y'] - Y
-                    need_roughening = ca.fabs(mag) > 6 * ca.sqrt(R)
-                    n_r = int(ca.sum2(need_roughening))
-
-            X = result['X_prop']
-            q = result['q']
-
+                        dx_r = dx_r.T
+                    X_prior[:, ind] += dx_r
+
+                    X_r, Y_r = self._propagation_function(X_prior[:, ind], p)
+                    X[:, ind] = np.asarray(X_r) + w[:, ind]
+                    Y[:, ind] = np.asarray(Y_r) + v[:, ind]
+                    need_roughening[ind] = np.any(np.abs(y_meas - Y[:, ind]) > threshold, axis=0)
+                    retries += 1
+
+                log_q = np.asarray(self._update_function(y=args['y'], Y=Y, R=R)['log_q']).flatten()
+
+        # Carry over the weights of the particles, if they were not resampled at the last estimation
+        if self._weights is not None:
+            with np.errstate(divide='ignore'):
+                log_q = log_q + np.log(self._weights)
+            log_q -= logsumexp(log_q)
+        q = np.exp(log_q)
+
+        n_eff = 1. / np.sum(q ** 2)
+        if self._resampling_threshold is None or n_eff < self._resampling_threshold * self._sample_size:
             # Resample (Survival of the fittest)
-            ind = np.random.choice(self._sample_size, size=self._sample_size, replace=True, p=q.full().flatten())
+            ind = RESAMPLING[self._resampling](q)
             X = X[:, ind]
             Y = Y[:, ind]
+            self._weights = None
 
             # Roughening
             if self._roughening:
@@ -416,10 +563,63 @@ class ParticleFilter(_Estimator):
                     dx = dx.T
                 X += dx
 
-            x = ca.sum2(X) / self._sample_size
-            y = ca.sum2(Y) / self._sample_size
-            P = convert(np.cov(X), ca.DM)
-        self._solution.update(t=tf, x=x, X=X[:], P=P[:], y=y)
+            x = np.mean(X, axis=1)
+            y = np.mean(Y, axis=1)
+            P = np.cov(X)
+        else:
+            self._weights = q
+            x = X @ q
+            y = Y @ q
+            P = np.cov(X, aweights=q)
+
+        return X, x, y, P
+
+    def estimate(self, *args, **kwargs):
+        """
+        Estimates the states from the supplied measurements. If more than one step is supplied, i.e. the measurements
+        are given as a block with one column per sampling interval, the whole block is filtered at once and the
+        estimates of all sampling intervals are added to the solution.
+
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        # TODO: Adjust according to Model.simulate
+        self._check_setup()
+
+        kwargs['skip'] = ['x']
+
+        args = self._process_inputs(**kwargs)
+        tf = args.pop('t0')
+        steps = args.pop('steps')
+        if self._solution.get_by_id('X').is_empty():
+            self._initial_sample()
+        X = ca.reshape(self._solution.get_by_id('X:f'), self._n_x, self._sample_size)
+
+        n_x = self._n_x
+        y_block = args['y']
+        p_block = args.get('p')
+
+        # Preallocate the estimates of the whole measurement block
+        x = np.empty((n_x, steps))
+        y = np.empty((self._n_y, steps))
+        P = np.empty((n_x * n_x, steps))
+        X_block = np.empty((n_x * self._sample_size, steps))
+        for k in range(steps):
+            args['X'] = X
+            args['y'] = y_block[:, k]
+            if p_block is not None:
+                args['p'] = p_block[:, k]
+            X, x[:, k], y[:, k], P_k = self._filter_step(args)
+            P[:, k] = np.reshape(P_k, (n_x, n_x)).flatten(order='F')
+            X_block[:, k] = X.flatten(order='F')
+            X = ca.DM(X)
+
+        x = ca.DM(x)
+        y = ca.DM(y)
+        X = ca.DM(X_block)
+        P = ca.DM(P)
+        self._solution.update(t=tf, x=x, X=X, P=P, y=y)
 
 
 def lhsnorm(mu, sigma, n):
@@ -447,6 +647,80 @@ def lhsnorm(mu, sigma, n):
     return x
 
 
+def multinomial_resampling(weights):
+    """
+    Draws the indices of the resampled particles independently from the distribution given by the weights
+
+    :param weights: normalized weights of the particles
+    :type weights: numpy.ndarray
+    :return: indices of the resampled particles
+    """
+    n = weights.size
+    return np.random.choice(n, size=n, replace=True, p=weights)
+
+
+def systematic_resampling(weights):
+    """
+    Resamples the particles at the equidistant positions (u + k)/n, k = 0, ..., n - 1, of the cumulative sum of the
+    weights, where u is drawn uniformly from [0, 1). Every particle is copied at least floor(n*w) and at most
+    ceil(n*w) times.
+
+    :param weights: normalized weights of the particles
+    :type weights: numpy.ndarray
+    :return: indices of the resampled particles
+    """
+    n = weights.size
+    cumsum = np.cumsum(weights)
+    cumsum[-1] = 1.
+    # Number of positions that lie below every entry of the cumulative sum
+    below = np.clip(np.ceil(n * cumsum - np.random.rand()), 0, n).astype(int)
+    return np.repeat(np.arange(n), np.diff(below, prepend=0))
+
+
+def stratified_resampling(weights):
+    """
+    Resamples the particles at the positions (u_k + k)/n, k = 0, ..., n - 1, of the cumulative sum of the weights,
+    where every u_k is drawn uniformly from [0, 1)
+
+    :param weights: normalized weights of the particles
+    :type weights: numpy.ndarray
+    :return: indices of the resampled particles
+    """
+    n = weights.size
+    cumsum = np.cumsum(weights)
+    cumsum[-1] = 1.
+    positions = (np.arange(n) + np.random.rand(n)) / n
+    return np.minimum(np.searchsorted(cumsum, positions, side='right'), n - 1)
+
+
+def residual_resampling(weights):
+    """
+    Copies every particle floor(n*w) times and draws the remaining particles from the residual weights
+
+    :param weights: normalized weights of the particles
+    :type weights: numpy.ndarray
+    :return: indices of the resampled particles
+    """
+    n = weights.size
+    counts = np.floor(n * weights).astype(int)
+    n_residual = n - np.sum(counts)
+    if n_residual > 0:
+        residual = n * weights - counts
+        cumsum = np.cumsum(residual / np.sum(residual))
+        cumsum[-1] = 1.
+        ind = np.minimum(np.searchsorted(cumsum, np.random.rand(n_residual), side='right'), n - 1)
+        counts += np.bincount(ind, minlength=n)
+    return np.repeat(np.arange(n), counts)
+
+
+RESAMPLING = {
+    'multinomial': multinomial_resampling,
+    'systematic': systematic_resampling,
+    'stratified': stratified_resampling,
+    'residual': residual_resampling
+}
+
+
 __all__ = [
     'ParticleFilter'
 ]
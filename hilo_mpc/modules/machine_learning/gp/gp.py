@@ -23,23 +23,29 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from functools import reduce
+import multiprocessing
+import time
 from typing import Dict, Optional, Sequence, Tuple, TypeVar, Union
 import warnings
 
 import casadi as ca
 import numpy as np
 from scipy import stats
+from scipy.linalg import cho_factor, cho_solve, lapack, solve_toeplitz, solve_triangular
+from scipy.optimize import minimize
 
-from .inference import Inference
+from .inference import Inference, ExactInference, SparseInference
 from .likelihood import Likelihood
 from .mean import Mean
-from .kernel import Kernel
+from .kernel import Kernel, StationaryKernel
 from ..base import LearningBase
 from ...base import Series, TimeSeries, Equations
 from ...optimizer import NonlinearProgram
 from ....util.machine_learning import Parameter, Hyperparameter, register_hyperparameters
-from ....util.util import convert, is_list_like
+from ....util.util import convert, is_list_like, vectorize_sx_function
 
 
 Numeric = Union[int, float]
@@ -81,8 +87,9 @@ class GaussianProcess(LearningBase):
     """
     Gaussian Process Regression
 
-    :Note: The Gaussian process regressor currently does not use the Cholesky factorization for training and
-        prediction. This will be implemented at a later time.
+    :Note: For exact inference with a Gaussian likelihood, predictions are made from the Cholesky factorization of the
+        covariance matrix of the training data, which is cached until the hyperparameters or the training data
+        change.
 
     :param features: names of the features
     :type features: list of strings
@@ -107,8 +114,41 @@ class GaussianProcess(LearningBase):
     :type solver: str, optional
     :param solver_options: Options to the solver, e.g. ipopt.
     :type solver_options: dict
-    :param kwargs:
+    :param kwargs: The following keyword arguments are supported
+        * backend: 'casadi' (default) or 'numpy'. With 'numpy' the log marginal likelihood and its gradient are
+          evaluated numerically with NumPy/SciPy (Cholesky factorization of the covariance matrix of the training
+          data), instead of differentiating through a symbolic expression containing all the training data. This is
+          considerably faster for larger training data sets, but only available for exact inference with a Gaussian
+          likelihood and the SciPy solvers, where 'L-BFGS-B' is the default solver.
+        * max_observations: maximum number of training observations that is kept when observations are added with
+          add_observation(). If it is exceeded, the oldest observation is removed (sliding window). Defaults to None,
+          i.e. no limit.
+        * novelty_threshold: observations supplied to add_observation() are only added, if the noise-free posterior
+          variance at the observation exceeds this threshold, i.e. if the observation is not already well explained by
+          the training data (budgeted dictionary). Defaults to None, i.e. every observation is added.
+        * structure: 'toeplitz' or 'kronecker' to exploit the structure of the covariance matrix of training data on
+          a grid instead of its Cholesky factorization. Only available for stationary kernels and the NumPy backend.
+          With 'toeplitz' the training data needs to have one feature with equidistant observations (e.g. a time
+          series). The covariance matrix is then a Toeplitz matrix, which is solved in O(n^2) time with O(n) memory
+          and predictions cost O(n*log(n)) per query point. With 'kronecker' the training data needs to contain
+          every combination of the unique values of the features exactly once (full-factorial design) and the kernel
+          needs to factorize over the features (e.g. the squared exponential kernel). The covariance matrix is then
+          a Kronecker product, whose factors are decomposed separately. The posterior variance at symbolic query points
+          (see predict and to_function) needs O(n^2) memory for the Toeplitz structure, whereas the mean needs O(n).
+          Defaults to None, i.e. no structure.
+        * n_random_features: number D of random Fourier features approximating the kernel (sparse spectrum GP). Only
+          available for the squared exponential, the Matérn and the rational quadratic kernels and the NumPy backend.
+          The GP is then trained and evaluated as Bayesian linear regression in the space of the features, i.e.
+          training costs O(n*D^2) instead of O(n^3) and predictions cost O(D) for the mean and O(D^2) for the
+          variance per query point. The frequencies and phases of the features are sampled once during setup and are
+          only scaled by the hyperparameters afterwards. Defaults to None, i.e. the exact kernel.
+        * seed: seed of the random number generator for the random Fourier features
     """
+    # Maximum number of pairs of observations for which the covariance function is evaluated at once by the NumPy
+    # backend
+    block_size = 2 ** 16
+    _multi_output = False
+
     def __init__(
             self,
             features: Union[str, list[str]],
@@ -130,7 +170,7 @@ class GaussianProcess(LearningBase):
             features = [features]
         if not is_list_like(labels):
             labels = [labels]
-        if len(labels) > 1:
+        if len(labels) > 1 and not self._multi_output:
             raise ValueError("Training a GP on multiple labels is not supported. Please use 'MultiOutputGP' to train "
                              "GPs on multiple labels.")
         super().__init__(features, labels, id=id, name=name)
@@ -165,6 +205,12 @@ class GaussianProcess(LearningBase):
                 inference = Inference.variational_bayes()
             elif name == 'kullback_leibler':
                 inference = Inference.kullback_leibler()
+            elif name in ['sor', 'subset_of_regressors']:
+                inference = Inference.subset_of_regressors()
+            elif name in ['fitc', 'fully_independent_training_conditional']:
+                inference = Inference.fully_independent_training_conditional()
+            elif name in ['vfe', 'variational_free_energy']:
+                inference = Inference.variational_free_energy()
             else:
                 raise ValueError(f"Inference '{inference}' not recognized")
         self.inference = inference
@@ -190,12 +236,13 @@ class GaussianProcess(LearningBase):
                 if variance_bounds == 'fixed':
                     hyper_kwargs['fixed'] = True
                 else:
-                    hyper_kwargs['bounds'] = bounds
+                    hyper_kwargs['bounds'] = variance_bounds
         self.noise_variance = Hyperparameter('GP.noise_variance', value=noise_variance, **hyper_kwargs)
 
         self._hyp_is_log = {'GP.noise_variance': True}
         self._hyp_is_log.update({parameter.name: False for parameter in self.mean.hyperparameters})
         self._hyp_is_log.update({parameter.name: True for parameter in self.kernel.hyperparameters})
+        self._hyp_is_log.update({parameter.name: False for parameter in self.inference.hyperparameters})
 
         register_hyperparameters(self, [parameter.id for parameter in self.hyperparameters])
 
@@ -204,8 +251,56 @@ class GaussianProcess(LearningBase):
         # unconstrained_op = all([not self.kernel.is_bounded(), unbounded_noise])
         unconstrained_op = True
 
+        backend = kwargs.get('backend')
+        if backend is None:
+            backend = 'casadi'
+        backend = backend.lower()
+        if backend == 'numpy':
+            if not isinstance(self.inference, (ExactInference, SparseInference)) or self.likelihood.name != 'Gaussian':
+                raise ValueError("The NumPy backend is only available for exact or sparse inference with Gaussian "
+                                 "likelihood")
+            if solver in ['ipopt', 'Newton-CG']:
+                raise ValueError(f"Solver '{solver}' is not supported by the NumPy backend. Choose one of 'L-BFGS-B', "
+                                 f"'BFGS', 'CG', 'Nelder-Mead' or 'Powell'.")
+        elif backend != 'casadi':
+            raise ValueError(f"Backend '{backend}' not recognized. Choose either 'casadi' or 'numpy'.")
+        self._gp_backend = backend
+
+        structure = kwargs.get('structure')
+        if structure is not None:
+            structure = structure.lower()
+            if structure not in ['toeplitz', 'kronecker']:
+                raise ValueError(f"Structure '{structure}' not recognized. Choose either 'toeplitz' or 'kronecker'.")
+            if backend != 'numpy':
+                raise ValueError("Structured inference is only available with the NumPy backend")
+            if not isinstance(self.kernel, StationaryKernel):
+                raise ValueError("Structured inference is only available for stationary kernels")
+            if not isinstance(self.inference, ExactInference):
+                raise ValueError("Structured inference is only available for exact inference")
+        self._structure = structure
+
+        n_random_features = kwargs.get('n_random_features')
+        if n_random_features is not None:
+            if backend != 'numpy':
+                raise ValueError("Random Fourier features are only available with the NumPy backend")
+            if structure is not None:
+                raise ValueError("Random Fourier features cannot be combined with structured inference")
+            if not isinstance(self.inference, ExactInference):
+                raise ValueError("Random Fourier features cannot be combined with sparse inference")
+            if not self.kernel.has_spectral_density:
+                raise ValueError("Random Fourier features are only available for the squared exponential, the Matérn "
+                                 "and the rational quadratic kernels")
+        self._n_random_features = n_random_features
+        self._seed = kwargs.get('seed')
+
         if solver is None:
-            if unconstrained_op:
+            if backend == 'numpy':
+                solver = 'L-BFGS-B'
+            elif isinstance(self.inference, SparseInference):
+                # NOTE: The log marginal likelihood of the sparse approximations is generally not convex w.r.t. the
+                #  locations of the inducing points, so that Newton-CG will regularly fail due to an indefinite Hessian
+                solver = 'L-BFGS-B'
+            elif unconstrained_op:
                 solver = 'Newton-CG'
             else:  # pragma: no cover
                 # TODO: Test GP for constrained hyperparameters
@@ -229,11 +324,19 @@ class GaussianProcess(LearningBase):
             epsilon = 1e-8
         self._epsilon = epsilon
 
+        self._max_observations = kwargs.get('max_observations')
+        self._novelty_threshold = kwargs.get('novelty_threshold')
+
         self._where_is_what = {}
         self._log_marginal_likelihood = None
         self._gp_solver = None
+        self._numeric_functions = None
+        self._posterior = None
+        self._grid = None
+        self._random_features = None
         self._gp_args = {}
         self._optimization_stats = {}
+        self._restart_stats = []
 
     def __str__(self) -> str:
         """String representation method"""
@@ -270,7 +373,10 @@ class GaussianProcess(LearningBase):
         :param bounds:
         :return:
         """
-        if self._gp_solver is not None:
+        if self.is_setup():
+            # The cached posterior depends on the values of the hyperparameters
+            self._posterior = None
+
             x_or_p, index = self._where_is_what[name]
             is_slice = isinstance(index, slice)
 
@@ -382,7 +488,7 @@ class GaussianProcess(LearningBase):
         :param y:
         :return:
         """
-        if self._function is not None:
+        if self.is_setup():
             warnings.warn("Gaussian process was already executed. Use the fit_model() method again to optimize with "
                           "respect to the newly set training data.")
 
@@ -395,15 +501,191 @@ class GaussianProcess(LearningBase):
         self.X_train = X
         self.y_train = y
 
-        if self._gp_solver is not None:
+        if self.is_setup():
+            self._posterior = None
             if old_X_shape == new_X_shape and old_y_shape == new_y_shape:
                 n = new_X_shape[1]
                 n *= self._n_features
                 self._gp_args['p'][:n] = X.flatten()
-                self._gp_args['p'][n:2 * n] = y.flatten()
+                self._gp_args['p'][n:n + y.size] = y.flatten()
+                if self._structure is not None:
+                    self._grid = self._get_grid()
             else:
                 warnings.warn("Dimensions of training data set changed. Please run setup() method again.")
 
+    @property
+    def max_observations(self) -> Optional[int]:
+        """
+        Maximum number of training observations that is kept when observations are added with add_observation()
+
+        :return:
+        """
+        return self._max_observations
+
+    @max_observations.setter
+    def max_observations(self, value: Optional[int]) -> None:
+        self._max_observations = value
+
+    @property
+    def novelty_threshold(self) -> Optional[float]:
+        """
+        Minimum noise-free posterior variance at an observation supplied to add_observation(), such that it is added to
+        the training data
+
+        :return:
+        """
+        return self._novelty_threshold
+
+    @novelty_threshold.setter
+    def novelty_threshold(self, value: Optional[float]) -> None:
+        self._novelty_threshold = value
+
+    @property
+    def restart_stats(self) -> list[dict]:
+        """
+        Initial values ('x0'), optimal values ('x'), negative log marginal likelihood ('objective'), success ('success')
+        and wall time ('time') of every optimization of the hyperparameters during the last call of fit_model()
+
+        :return:
+        """
+        return self._restart_stats
+
+    def _check_online_update(self) -> None:
+        """
+
+        :return:
+        """
+        if not self.is_setup():
+            raise RuntimeError("The GP has not been set up yet. Please run the setup() method before updating the "
+                               "training data.")
+        if self._numeric_functions is None or not isinstance(self.inference, ExactInference):
+            raise RuntimeError("Online updates of the training data are only available for exact inference with "
+                               "Gaussian likelihood")
+        if self._structure is not None:
+            raise RuntimeError("Online updates of the training data are not available for structured inference")
+        if self._n_random_features is not None:
+            raise RuntimeError("Online updates of the training data are not available for random Fourier features")
+
+    def _set_online_training_data(self, X: np.ndarray, y: np.ndarray, L: np.ndarray) -> None:
+        """
+        Sets the training data changed by online updates together with the updated Cholesky factor
+
+        :param X:
+        :param y:
+        :param L:
+        :return:
+        """
+        posterior = self._get_posterior()
+        w, p = posterior['x0'], posterior['p']
+
+        # The fixed hyperparameters are located after the training data in the parameter vector
+        shift = (self._n_features + self._n_labels) * (X.shape[1] - self._X_train.values.shape[1])
+        for name, (x_or_p, index) in self._where_is_what.items():
+            if x_or_p == 'p':
+                if isinstance(index, slice):
+                    self._where_is_what[name] = ('p', slice(index.start + shift, index.stop + shift))
+                else:
+                    self._where_is_what[name] = ('p', index + shift)
+
+        self.X_train = X
+        self.y_train = y
+        self._gp_args['p'] = np.concatenate([X.flatten(), y.flatten(), p])
+
+        alpha = cho_solve((L, True), self._get_residuals(X, y, w, p))
+        self._posterior = {
+            'x0': w,
+            'p': p,
+            'L': (L, True),
+            'alpha': alpha
+        }
+
+        if self._gp_backend == 'casadi':
+            # NOTE: The expressions of the CasADi backend depend on the number of training observations, so they are
+            #  discarded. Predictions are made from the cached posterior anyway.
+            self._gp_solver = None
+            self._log_marginal_likelihood = None
+            self._function = None
+
+    def add_observation(self, X: np.ndarray, y: np.ndarray) -> None:
+        """
+        Adds observations to the training data without repeating the Cholesky factorization of the covariance matrix
+
+        The cached Cholesky factor is extended by one row per observation, which costs O(n^2) for n training
+        observations. If the maximum number of observations (see max_observations) is exceeded, the oldest observation
+        is removed (see remove_oldest). Observations whose noise-free posterior variance doesn't exceed the novelty
+        threshold (see novelty_threshold) are discarded. The hyperparameters are not changed.
+
+        :param X: observations with shape (number of features, number of observations)
+        :param y: targets with shape (number of labels, number of observations)
+        :return:
+        """
+        self._check_online_update()
+
+        X_new = np.asarray(X, dtype=float)
+        if X_new.ndim < 2:
+            X_new = X_new.reshape(-1, 1)
+        y_new = np.asarray(y, dtype=float).reshape(self._n_labels, -1)
+        if X_new.shape[0] != self._n_features:
+            raise ValueError(f"Dimension mismatch. Supplied dimension for the features is {X_new.shape[0]}, but "
+                             f"required dimension is {self._n_features}.")
+        if X_new.shape[1] != y_new.shape[1]:
+            raise ValueError("Number of observations in training matrix and target vector do not match!")
+
+        posterior = self._get_posterior()
+        w, p = posterior['x0'], posterior['p']
+        noise_variance = float(self._numeric_functions['noise_variance'](w, p)[0])
+        L = np.tril(posterior['L'][0])
+        X_train = self._X_train.values
+        y_train = self._y_train.values
+
+        for k in range(X_new.shape[1]):
+            x = X_new[:, k:k + 1]
+            l = solve_triangular(L, self._numeric_functions['vectorized_covariance'](X_train, x, w, p)[0].flatten(),
+                                 lower=True)
+            # Schur complement of the extended covariance matrix, i.e. the posterior variance at x (including noise)
+            d = float(self._numeric_functions['vectorized_variance'](x, w, p)[0]) + noise_variance - l @ l
+            if self._novelty_threshold is not None and d - noise_variance <= self._novelty_threshold:
+                continue
+
+            n = L.shape[0]
+            L_extended = np.zeros((n + 1, n + 1))
+            L_extended[:n, :n] = L
+            L_extended[n, :n] = l
+            L_extended[n, n] = np.sqrt(d)
+            L = L_extended
+            X_train = np.append(X_train, x, axis=1)
+            y_train = np.append(y_train, y_new[:, k:k + 1], axis=1)
+
+            if self._max_observations is not None and X_train.shape[1] > self._max_observations:
+                L = _remove_from_cholesky_factor(L, 0)
+                X_train = X_train[:, 1:]
+                y_train = y_train[:, 1:]
+
+        self._set_online_training_data(X_train, y_train, L)
+
+    def remove_oldest(self, n_observations: int = 1) -> None:
+        """
+        Removes the oldest observations from the training data without repeating the Cholesky factorization of the
+        covariance matrix
+
+        Each observation is removed by a rank-one update of the cached Cholesky factor, which costs O(n^2) for n
+        training observations. The hyperparameters are not changed.
+
+        :param n_observations: number of observations to be removed
+        :return:
+        """
+        self._check_online_update()
+
+        if n_observations >= self._X_train.values.shape[1]:
+            raise ValueError("At least one training observation needs to remain")
+
+        L = np.tril(self._get_posterior()['L'][0])
+        for _ in range(n_observations):
+            L = _remove_from_cholesky_factor(L, 0)
+
+        self._set_online_training_data(self._X_train.values[:, n_observations:],
+                                       self._y_train.values[:, n_observations:], L)
+
     @property
     def hyperparameters(self) -> list[Param]:
         """
@@ -411,7 +693,8 @@ class GaussianProcess(LearningBase):
 
         :return:
         """
-        return [self.noise_variance] + self.mean.hyperparameters + self.kernel.hyperparameters
+        return [self.noise_variance] + self.mean.hyperparameters + self.kernel.hyperparameters + \
+            self.inference.hyperparameters
 
     @property
     def hyperparameter_names(self) -> list[str]:
@@ -419,7 +702,8 @@ class GaussianProcess(LearningBase):
 
         :return:
         """
-        return [self.noise_variance.name] + self.mean.hyperparameter_names + self.kernel.hyperparameter_names
+        return [self.noise_variance.name] + self.mean.hyperparameter_names + self.kernel.hyperparameter_names + \
+            self.inference.hyperparameter_names
 
     def get_hyperparameter_by_name(self, name: str) -> Param:
         """
@@ -539,16 +823,19 @@ class GaussianProcess(LearningBase):
         n, D = X_sym.shape
         X = ca.SX.sym('X', n)
 
-        posterior = self.inference(X_sym, y_sym, X, self.noise_variance.SX, self.likelihood, self.mean, self.kernel)
-        log_marginal_likelihood = posterior['log_marginal_likelihood']
-        mean = posterior['mean']
-        var = posterior['var']
+        if isinstance(self.inference, SparseInference) and not self.inference.hyperparameters:
+            # The locations of the inducing points are initialized from the training data and then treated like every
+            # other hyperparameter
+            self.inference.initialize_inducing_points(self._X_train.values)
+            self._hyp_is_log.update({parameter.name: False for parameter in self.inference.hyperparameters})
+            register_hyperparameters(self, [parameter.id for parameter in self.inference.hyperparameters])
 
         hyperparameters_to_optimize = [parameter for parameter in self.hyperparameters if not parameter.fixed]
         w = []
         w0 = []
         # lbw = []
         # ubw = []
+        log_hyperprior = ca.SX(0)
         k = 0
         for parameter in hyperparameters_to_optimize:
             name = parameter.name
@@ -556,7 +843,7 @@ class GaussianProcess(LearningBase):
 
             hyperprior = parameter.prior
             if hyperprior is not None:
-                log_marginal_likelihood += hyperprior(param, log=True)
+                log_hyperprior += hyperprior(param, log=True)
 
             w.append(param)
             n_p = param.numel()
@@ -580,7 +867,7 @@ class GaussianProcess(LearningBase):
         hyperparameters_fixed = [parameter for parameter in self.hyperparameters if parameter.fixed]
         p = []
         p0 = []
-        k = 2 * D
+        k = (n + self._n_labels) * D
         for parameter in hyperparameters_fixed:
             name = parameter.name
             p.append(parameter.SX)
@@ -602,9 +889,38 @@ class GaussianProcess(LearningBase):
         w0 = ca.vertcat(*w0)
         # lbw = ca.vertcat(*lbw)
         # ubw = ca.vertcat(*ubw)
-        p = ca.vertcat(X_sym.T[:], y_sym.T[:], *p)
         # TODO: Check if this is actually the same as what is done for the SX variables
-        p0 = np.concatenate([self.X_train.values.flatten(), self.y_train.values.flatten(), p0])
+        p0 = np.concatenate([self.X_train.values.flatten(), self.y_train.values.flatten()] +
+                            [ca.DM(value).full().flatten() for value in p0])
+
+        if self.likelihood.name == 'Gaussian' and (isinstance(self.inference, ExactInference) or
+                                                   self._gp_backend == 'numpy'):
+            # NOTE: The exact posterior is also needed numerically by the CasADi backend, since predictions are made
+            #  from its cached Cholesky factorization (see predict). The sparse approximations are only evaluated
+            #  numerically by the NumPy backend.
+            self._setup_numeric(w, ca.vertcat(ca.SX(), *p), log_hyperprior)
+        else:
+            self._numeric_functions = None
+        self._posterior = None
+
+        if self._gp_backend == 'numpy':
+            self._gp_args.update({
+                'x0': w0,
+                'p': p0
+            })
+            if self._structure is not None:
+                self._grid = self._get_grid()
+            if self._n_random_features is not None:
+                self._random_features = self._sample_random_features(self._n_random_features,
+                                                                     np.random.default_rng(self._seed))
+            return
+
+        p = ca.vertcat(X_sym.T[:], y_sym.T[:], *p)
+
+        posterior = self.inference(X_sym, y_sym, X, self.noise_variance.SX, self.likelihood, self.mean, self.kernel)
+        log_marginal_likelihood = posterior['log_marginal_likelihood'] + log_hyperprior
+        mean = posterior['mean']
+        var = posterior['var']
 
         self._initialize_solver()
 
@@ -627,6 +943,14 @@ class GaussianProcess(LearningBase):
             ['X', 'x0', 'p'],
             ['mean', 'variance']
         )
+        # NOTE: The training data and the hyperparameters are inputs of the prediction function, so the compiled library
+        #  can be reused for any training data with the same number of observations. The compiled function cannot be
+        #  called with SX queries. The solver of the hyperparameter optimization and the numeric functions of the exact
+        #  posterior are not compiled.
+        cache = kwargs.get('cache')
+        if kwargs.get('c_code', False) and cache is not None and cache is not False:
+            _, gen_name, gen_opts = self._generator(**kwargs)
+            self._setup_from_cache(self._function, cache, gen_name, gen_opts=gen_opts)
 
         self._gp_solver.setup()
 
@@ -640,12 +964,1209 @@ class GaussianProcess(LearningBase):
             # 'ubx': ubw
         })
 
+    def _setup_numeric(self, w: ca.SX, p: ca.SX, log_hyperprior: ca.SX) -> None:
+        """
+        Prepares the numerical evaluation of the exact posterior, which is used by the NumPy backend and for
+        predictions
+
+        Only the covariance function and the mean function for a single (pair of) observation(s) are represented by
+        CasADi expressions. They are evaluated for all observations at once with NumPy (see vectorize_sx_function), so
+        that the size of the expressions doesn't depend on the number of training observations.
+
+        :param w: hyperparameters to be optimized
+        :param p: fixed hyperparameters
+        :param log_hyperprior: sum of the log hyperpriors
+        :return:
+        """
+        n_x = self._n_features
+        x = ca.SX.sym('x', n_x)
+        x_bar = ca.SX.sym('x_bar', n_x)
+        if self.kernel.active_dims is None:
+            active_dims = np.arange(n_x, dtype=np.int_)
+        else:
+            active_dims = np.atleast_1d(np.asarray(self.kernel.active_dims, dtype=np.int_))
+
+        covariance_function = self.kernel.get_covariance_function(x, x_bar, active_dims)
+        hyperparameters = {parameter.name: parameter.SX for parameter in self.kernel.hyperparameters}
+        k = covariance_function(x=x, x_bar=x_bar, **hyperparameters)['covariance']
+        # NOTE: The difference x - x is simplified to 0, so that the derivatives of the prior variance are also
+        #  well-defined for kernels depending on the square root of the distance (e.g. the Matérn kernels)
+        k_diag = covariance_function(x=x, x_bar=x, **hyperparameters)['covariance']
+        mean = self.mean(x)
+        noise_variance = ca.exp(2 * self.noise_variance.SX)
+
+        self._numeric_functions = {
+            'covariance': ca.Function('covariance', [x, x_bar, w, p], [k]),
+            'variance': ca.Function('variance', [x, w, p], [k_diag]),
+            'mean': ca.Function('mean', [x, w, p], [mean]),
+            'noise_variance': ca.Function('noise_variance', [w, p], [noise_variance, ca.jacobian(noise_variance, w)]),
+            'hyperprior': ca.Function('hyperprior', [w, p], [log_hyperprior, ca.jacobian(log_hyperprior, w)]),
+            'vectorized_covariance': vectorize_sx_function(ca.Function('covariance', [x, x_bar, w, p], [k])),
+            'vectorized_variance': vectorize_sx_function(ca.Function('variance', [x, w, p], [k_diag])),
+            'vectorized_mean': vectorize_sx_function(ca.Function('mean', [x, w, p], [mean])),
+            'vectorized_covariance_gradient': vectorize_sx_function(
+                ca.Function('covariance', [x, x_bar, w, p], [k, ca.jacobian(k, w)])),
+            'vectorized_variance_gradient': vectorize_sx_function(
+                ca.Function('variance', [x, w, p], [k_diag, ca.jacobian(k_diag, w)])),
+            'vectorized_mean_gradient': vectorize_sx_function(
+                ca.Function('mean', [x, w, p], [mean, ca.jacobian(mean, w)]))
+        }
+        if isinstance(self.inference, SparseInference):
+            # The locations of the inducing points are not arguments of the covariance function, but enter as the
+            # observations x, so their derivatives are taken w.r.t. x (see _get_sparse_log_marginal_likelihood)
+            self._numeric_functions.update({
+                'vectorized_covariance_derivative': vectorize_sx_function(
+                    ca.Function('covariance', [x, x_bar, w, p], [ca.jacobian(k, x)])),
+                'vectorized_variance_derivative': vectorize_sx_function(
+                    ca.Function('variance', [x, w, p], [ca.jacobian(k_diag, x)]))
+            })
+
+    def _get_numeric_arguments(self) -> (np.ndarray, np.ndarray):
+        """
+
+        :return:
+        """
+        # NOTE: The training data at the beginning of the parameter vector is not needed by the NumPy backend
+        n_training_data = (self._n_features + self._n_labels) * self._X_train.values.shape[1]
+        w = ca.DM(self._gp_args['x0']).full().flatten()
+        p = np.asarray(self._gp_args['p'], dtype=float).flatten()[n_training_data:]
+        return w, p
+
+    def _evaluate_numeric_covariance(self, w: np.ndarray, p: np.ndarray, W: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Evaluates the covariance matrix of the training data with NumPy in blocks of rows
+
+        If W is supplied, the covariance matrix is not returned, but the sum of the element-wise product of W with the
+        derivatives of the covariance matrix w.r.t. the hyperparameters to be optimized, i.e. tr(W*dK/dw) for every
+        hyperparameter w. This way the derivatives never have to be stored for the whole covariance matrix.
+
+        :param w:
+        :param p:
+        :param W:
+        :return:
+        """
+        X = self._X_train.values
+        n = X.shape[1]
+        if W is None:
+            covariance = self._numeric_functions['vectorized_covariance']
+            variance = self._numeric_functions['vectorized_variance'](X, w, p)[0]
+            K = np.empty((n, n))
+        else:
+            covariance = self._numeric_functions['vectorized_covariance_gradient']
+            variance, d_variance = self._numeric_functions['vectorized_variance_gradient'](X, w, p)
+            K = np.zeros(w.size)
+
+        n_rows = max(self.block_size // n, 1)
+        for start in range(0, n, n_rows):
+            stop = min(start + n_rows, n)
+            # NOTE: The derivatives of the covariance of identical observations (in particular on the diagonal) are
+            #  taken from the prior variance, since they are not well-defined for some kernels (see _setup_numeric)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                k, *dk = covariance(np.repeat(X[:, start:stop], n, axis=1), np.tile(X, stop - start), w, p)
+            k = k.reshape(stop - start, n)
+            i, j = np.nonzero(np.all(X[:, start:stop, None] == X[:, None, :], axis=0))
+            k[i, j] = variance[0, start + i]
+
+            if W is None:
+                K[start:stop, :] = k
+            else:
+                dk = dk[0].reshape(w.size, stop - start, n)
+                dk[:, i, j] = d_variance[:, start + i]
+                K += np.einsum('kij,ij->k', dk, W[start:stop, :])
+
+        return K
+
+    def _get_residuals(self, X: np.ndarray, y: np.ndarray, w: np.ndarray, p: np.ndarray) -> np.ndarray:
+        """
+        Returns the difference between the targets and the prior mean at the training observations
+
+        :param X:
+        :param y:
+        :param w:
+        :param p:
+        :return:
+        """
+        mean = self._numeric_functions['vectorized_mean'](X, w, p)[0]
+        return y.flatten() - mean.flatten()
+
+    def _factorize_numeric(self, w: np.ndarray, p: np.ndarray) -> (tuple, np.ndarray, np.ndarray):
+        """
+        Evaluates the Cholesky factorization of the covariance matrix of the training data (including the noise
+        variance) and the vector alpha = (K + sigma^2*I)^-1*(y - m(X)) with NumPy
+
+        :param w:
+        :param p:
+        :return:
+        """
+        K = self._evaluate_numeric_covariance(w, p)
+        noise_variance, _ = self._numeric_functions['noise_variance'](w, p)
+        K[np.diag_indices_from(K)] += float(noise_variance)
+        if not np.isfinite(K).all():
+            raise np.linalg.LinAlgError("Covariance matrix of the training data contains non-finite values")
+        L = cho_factor(K, lower=True)
+
+        y_minus_prior = self._get_residuals(self._X_train.values, self._y_train.values, w, p)
+        alpha = cho_solve(L, y_minus_prior)
+
+        return L, y_minus_prior, alpha
+
+    def _get_numeric_log_marginal_likelihood(
+            self,
+            w: np.ndarray,
+            p: np.ndarray,
+            gradient: bool = False
+    ) -> Union[float, Tuple[float, np.ndarray]]:
+        """
+        Evaluates the log marginal likelihood and optionally its (analytic) gradient w.r.t. the hyperparameters to be
+        optimized with NumPy
+
+        :param w:
+        :param p:
+        :param gradient:
+        :return:
+        """
+        if self._structure is not None:
+            return self._get_structured_log_marginal_likelihood(w, p, gradient=gradient)
+        if self._random_features is not None:
+            return self._get_random_feature_log_marginal_likelihood(w, p, gradient=gradient)
+        if isinstance(self.inference, SparseInference):
+            return self._get_sparse_log_marginal_likelihood(w, p, gradient=gradient)
+
+        L, y_minus_prior, alpha = self._factorize_numeric(w, p)
+        # NOTE: Outputs sharing the covariance matrix (see MultiOutputGaussianProcess) are stored column-wise. Their
+        #  log marginal likelihoods are summed up.
+        n = L[0].shape[0]
+        y_minus_prior = y_minus_prior.reshape(n, -1)
+        alpha = alpha.reshape(n, -1)
+        n_outputs = alpha.shape[1]
+
+        log_hyperprior, d_log_hyperprior = self._numeric_functions['hyperprior'](w, p)
+        log_marginal_likelihood = -.5 * np.sum(y_minus_prior * alpha) - n_outputs * (
+                np.log(np.diag(L[0])).sum() + n / 2 * np.log(2 * np.pi)) + float(log_hyperprior)
+        if not gradient:
+            return log_marginal_likelihood
+
+        # dlog(p(y|X))/dw = 1/2*tr((alpha*alpha^T - K^-1)*dK/dw) + alpha^T*dm/dw (see Rasmussen p.114)
+        # NOTE: The inverse is obtained directly from the Cholesky factor (LAPACK's potri), which is cheaper than solving
+        #  for the identity matrix
+        K_inv, _ = lapack.dpotri(L[0], lower=True)
+        K_inv = np.tril(K_inv) + np.tril(K_inv, -1).T
+        W = alpha @ alpha.T - n_outputs * K_inv
+        _, d_noise_variance = self._numeric_functions['noise_variance'](w, p)
+        _, d_mean = self._numeric_functions['vectorized_mean_gradient'](self._X_train.values, w, p)
+        d_log_marginal_likelihood = .5 * self._evaluate_numeric_covariance(w, p, W=W) + .5 * np.trace(
+            W) * d_noise_variance.full().flatten() + d_mean @ alpha.sum(axis=1) + d_log_hyperprior.full().flatten()
+
+        return log_marginal_likelihood, d_log_marginal_likelihood
+
+    def _evaluate_pairwise_covariance(
+            self,
+            X: np.ndarray,
+            X_bar: np.ndarray,
+            w: np.ndarray,
+            p: np.ndarray,
+            gradient: bool = False
+    ) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Evaluates the covariance function and optionally its derivatives w.r.t. the hyperparameters to be optimized for
+        the pairs of observations in the columns of X and X_bar
+
+        :param X:
+        :param X_bar:
+        :param w:
+        :param p:
+        :param gradient:
+        :return:
+        """
+        if gradient:
+            covariance = self._numeric_functions['vectorized_covariance_gradient']
+            variance = self._numeric_functions['vectorized_variance_gradient']
+        else:
+            covariance = self._numeric_functions['vectorized_covariance']
+            variance = self._numeric_functions['vectorized_variance']
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k, *dk = covariance(X, X_bar, w, p)
+        # NOTE: Identical observations are evaluated by the prior variance (see _evaluate_numeric_covariance)
+        identical = np.all(X == X_bar, axis=0)
+        if identical.any():
+            k_diag, *dk_diag = variance(X[:, identical], w, p)
+            k[:, identical] = k_diag
+            if gradient:
+                dk[0][:, identical] = dk_diag[0]
+
+        if gradient:
+            return k.flatten(), dk[0]
+        return k.flatten()
+
+    def _get_kronecker_factors(
+            self,
+            w: np.ndarray,
+            p: np.ndarray,
+            gradient: bool = False
+    ) -> (float, np.ndarray, list[np.ndarray], list[np.ndarray]):
+        """
+        Returns the prior variance s and the factors G_d of the covariance matrix K = s*(G_1 x G_2 x ... x G_D) of
+        training data on a full grid, where x denotes the Kronecker product
+
+        The factors are obtained by evaluating the covariance function along the grid axes through the first grid
+        point, which requires the covariance function to factorize over the features.
+
+        :param w:
+        :param p:
+        :param gradient: whether the derivatives of the prior variance and the factors w.r.t. the hyperparameters to
+            be optimized are returned as well
+        :return:
+        """
+        axes = self._grid['axes']
+        origin = np.array([[axis[0]] for axis in axes])
+        s, ds = self._numeric_functions['vectorized_variance_gradient'](origin, w, p)
+        s = float(s)
+        ds = ds.flatten()
+
+        factors = []
+        d_factors = []
+        for d, axis in enumerate(axes):
+            m = axis.size
+            X = np.repeat(origin, m, axis=1)
+            X[d, :] = axis
+            if gradient:
+                k, dk = self._evaluate_pairwise_covariance(np.repeat(X, m, axis=1), np.tile(X, m), w, p,
+                                                           gradient=True)
+                dk = dk.reshape(-1, m, m)
+            else:
+                k = self._evaluate_pairwise_covariance(np.repeat(X, m, axis=1), np.tile(X, m), w, p)
+                dk = None
+            k = k.reshape(m, m)
+            factors.append(k / s)
+            if gradient:
+                d_factors.append((dk * s - k * ds[:, None, None]) / s ** 2)
+
+        return s, ds, factors, d_factors
+
+    def _get_grid(self) -> dict:
+        """
+        Checks whether the training data lies on a grid that is supported by the selected structure of the covariance
+        matrix and returns the order of the training observations on the grid
+
+        :return:
+        """
+        X = self._X_train.values
+        n_features, n = X.shape
+        if self._structure == 'toeplitz':
+            if n_features != 1:
+                raise ValueError("Toeplitz-structured inference requires training data with one feature")
+            steps = np.diff(X[0])
+            if n < 2 or steps[0] == 0. or not np.allclose(steps, steps[0], rtol=1e-8, atol=0.):
+                raise ValueError("Toeplitz-structured inference requires equidistant training observations")
+            return {'order': np.arange(n)}
+
+        axes, indices = zip(*[np.unique(x, return_inverse=True) for x in X])
+        shape = tuple(axis.size for axis in axes)
+        index = np.ravel_multi_index(indices, shape)
+        if np.prod(shape) != n or np.unique(index).size != n:
+            raise ValueError("Kronecker-structured inference requires training data containing every combination of "
+                             "the unique values of the features exactly once")
+        self._grid = {'order': np.argsort(index), 'axes': axes}
+
+        w, p = self._get_numeric_arguments()
+        s, _, factors, _ = self._get_kronecker_factors(w, p)
+        k = self._evaluate_pairwise_covariance(np.repeat(X[:, self._grid['order'][:1]], n, axis=1),
+                                               X[:, self._grid['order']], w, p)
+        k_kronecker = s * reduce(np.kron, [factor[0, :] for factor in factors])
+        if not np.allclose(k, k_kronecker, rtol=1e-8, atol=1e-12 * abs(s)):
+            self._grid = None
+            raise ValueError("Kronecker-structured inference requires a kernel that factorizes over the features, "
+                             "e.g. the squared exponential kernel")
+        return self._grid
+
+    def _factorize_structured(self, w: np.ndarray, p: np.ndarray) -> dict:
+        """
+        Factorizes the structured covariance matrix of the training data (including the noise variance) and evaluates
+        the vector alpha = (K + sigma^2*I)^-1*(y - m(X)) with NumPy
+
+        For the Toeplitz structure the first column of the inverse and the log-determinant are obtained by the
+        Levinson-Durbin recursion, while the Kronecker structure is decomposed into the eigendecompositions of its
+        factors.
+
+        :param w:
+        :param p:
+        :return:
+        """
+        X = self._X_train.values
+        n = X.shape[1]
+        y_minus_prior = self._get_residuals(X, self._y_train.values, w, p)
+        noise_variance = float(self._numeric_functions['noise_variance'](w, p)[0])
+        posterior = {
+            'x0': w,
+            'p': p,
+            'noise_variance': noise_variance,
+            'residuals': y_minus_prior
+        }
+
+        if self._structure == 'toeplitz':
+            column = self._evaluate_pairwise_covariance(np.repeat(X[:, :1], n, axis=1), X, w, p)
+            column[0] += noise_variance
+            if not np.isfinite(column).all():
+                raise np.linalg.LinAlgError("Covariance matrix of the training data contains non-finite values")
+            inverse_column, log_det = _levinson_durbin(column)
+            posterior['inverse_column'] = inverse_column
+            posterior['log_det'] = log_det
+            alpha = solve_toeplitz(column, y_minus_prior)
+        else:
+            s, _, factors, _ = self._get_kronecker_factors(w, p)
+            eigenvalues = []
+            eigenvectors = []
+            for factor in factors:
+                if not np.isfinite(factor).all():
+                    raise np.linalg.LinAlgError("Covariance matrix of the training data contains non-finite values")
+                eigenvalue, eigenvector = np.linalg.eigh(factor)
+                eigenvalues.append(np.maximum(eigenvalue, 0.))
+                eigenvectors.append(eigenvector)
+            eigenvalues = s * reduce(np.kron, eigenvalues)
+            if s <= 0. or np.any(eigenvalues + noise_variance <= 0.):
+                raise np.linalg.LinAlgError("Covariance matrix of the training data is not positive definite")
+            posterior['eigenvalues'] = eigenvalues
+            posterior['eigenvectors'] = eigenvectors
+            posterior['log_det'] = np.log(eigenvalues + noise_variance).sum()
+            alpha = self._solve_structured(posterior, y_minus_prior.reshape(n, -1)).reshape(y_minus_prior.shape)
+
+        posterior['alpha'] = alpha
+        return posterior
+
+    def _solve_structured(self, posterior: dict, B: np.ndarray) -> np.ndarray:
+        """
+        Returns (K + sigma^2*I)^-1*B for the factorized structured covariance matrix of the training data
+
+        :param posterior: factorization of the structured covariance matrix (see _factorize_structured)
+        :param B: matrix with one row per training observation
+        :return:
+        """
+        if self._structure == 'toeplitz':
+            return _toeplitz_inverse_matvec(posterior['inverse_column'], B)
+
+        order = self._grid['order']
+        eigenvectors = posterior['eigenvectors']
+        solution = _kronecker_matvec([eigenvector.T for eigenvector in eigenvectors], B[order])
+        solution /= (posterior['eigenvalues'] + posterior['noise_variance'])[:, None]
+        solution = _kronecker_matvec(eigenvectors, solution)
+        B_inv = np.empty_like(solution)
+        B_inv[order] = solution
+        return B_inv
+
+    def _get_structured_log_marginal_likelihood(
+            self,
+            w: np.ndarray,
+            p: np.ndarray,
+            gradient: bool = False
+    ) -> Union[float, Tuple[float, np.ndarray]]:
+        """
+        Evaluates the log marginal likelihood and optionally its (analytic) gradient w.r.t. the hyperparameters to be
+        optimized for structured inference
+
+        The traces tr(K^-1*dK/dw) of the gradient are evaluated without forming the inverse. For the Toeplitz structure
+        they follow from the sums of the diagonals of the inverse (Gohberg-Semencul formula), for the Kronecker
+        structure from the eigendecompositions of the factors.
+
+        :param w:
+        :param p:
+        :param gradient:
+        :return:
+        """
+        posterior = self._factorize_structured(w, p)
+        X = self._X_train.values
+        n = X.shape[1]
+        y_minus_prior = posterior['residuals'].reshape(n, -1)
+        alpha = posterior['alpha'].reshape(n, -1)
+        n_outputs = alpha.shape[1]
+
+        log_hyperprior, d_log_hyperprior = self._numeric_functions['hyperprior'](w, p)
+        log_marginal_likelihood = -.5 * np.sum(y_minus_prior * alpha) - n_outputs * (
+                posterior['log_det'] / 2 + n / 2 * np.log(2 * np.pi)) + float(log_hyperprior)
+        if not gradient:
+            return log_marginal_likelihood
+
+        _, d_noise_variance = self._numeric_functions['noise_variance'](w, p)
+        d_noise_variance = d_noise_variance.full().flatten()
+        if self._structure == 'toeplitz':
+            _, d_column = self._evaluate_pairwise_covariance(np.repeat(X[:, :1], n, axis=1), X, w, p,
+                                                             gradient=True)
+            d_column[:, 0] += d_noise_variance
+            quadratic = np.array([np.sum(alpha * _toeplitz_matvec(dc, alpha)) for dc in d_column])
+            diagonal_sums = _toeplitz_inverse_diagonal_sums(posterior['inverse_column'])
+            diagonal_sums[1:] *= 2
+            trace = d_column @ diagonal_sums
+        else:
+            s, ds, factors, d_factors = self._get_kronecker_factors(w, p, gradient=True)
+            eigenvectors = posterior['eigenvectors']
+            inverse_eigenvalues = 1 / (posterior['eigenvalues'] + posterior['noise_variance'])
+            # The quadratic forms and traces are evaluated in the eigenbasis of the factors
+            beta = _kronecker_matvec([eigenvector.T for eigenvector in eigenvectors], alpha[self._grid['order']])
+            diagonals = [np.diag(eigenvector.T @ factor @ eigenvector) for eigenvector, factor in
+                         zip(eigenvectors, factors)]
+            quadratic = (ds * np.sum(posterior['eigenvalues'] / s * np.sum(beta ** 2, axis=1)) +
+                         np.sum(alpha ** 2) * d_noise_variance)
+            trace = ds * np.sum(posterior['eigenvalues'] / s * inverse_eigenvalues) + np.sum(
+                inverse_eigenvalues) * d_noise_variance
+            for d, d_factor in enumerate(d_factors):
+                for k in range(w.size):
+                    factor = eigenvectors[d].T @ d_factor[k] @ eigenvectors[d]
+                    rotated = [np.diag(diagonal) for diagonal in diagonals]
+                    rotated[d] = factor
+                    quadratic[k] += s * np.sum(beta * _kronecker_matvec(rotated, beta))
+                    rotated = list(diagonals)
+                    rotated[d] = np.diag(factor)
+                    trace[k] += s * np.sum(reduce(np.kron, rotated) * inverse_eigenvalues)
+
+        _, d_mean = self._numeric_functions['vectorized_mean_gradient'](X, w, p)
+        d_log_marginal_likelihood = .5 * quadratic - .5 * n_outputs * trace + d_mean @ alpha.sum(
+            axis=1) + d_log_hyperprior.full().flatten()
+
+        return log_marginal_likelihood, d_log_marginal_likelihood
+
+    def _get_kernel_hyperparameters(self, w: np.ndarray, p: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Returns the values of the hyperparameters of the kernel by their names for the (log-transformed) arguments of
+        the numeric functions
+
+        :param w:
+        :param p:
+        :return:
+        """
+        hyperparameters = {}
+        for name in self.kernel.hyperparameter_names:
+            value = self._get_numeric_value(name, w, p)
+            if self._hyp_is_log[name]:
+                value = np.exp(2 * value) if 'variance' in name else np.exp(value)
+            hyperparameters[name] = value
+        return hyperparameters
+
+    def _get_numeric_value(self, name: str, w: np.ndarray, p: np.ndarray) -> np.ndarray:
+        """
+        Returns the (log-transformed) value of a hyperparameter from the arguments of the numeric functions
+
+        :param name: name of the hyperparameter
+        :param w:
+        :param p:
+        :return:
+        """
+        n_training_data = (self._n_features + self._n_labels) * self._X_train.values.shape[1]
+        x_or_p, index = self._where_is_what[name]
+        if x_or_p == 'x0':
+            return np.atleast_1d(w[index])
+        if isinstance(index, slice):
+            return p[index.start - n_training_data:index.stop - n_training_data]
+        return np.atleast_1d(p[index - n_training_data])
+
+    def _sample_random_features(self, n_random_features: int, rng: np.random.Generator) -> dict:
+        """
+        Samples the random Fourier features phi(x) = sqrt(2*sigma_f^2/D)*cos(W*x + b) approximating the kernel by
+        phi(x)^T*phi(x_bar) (see Rahimi and Recht, 2007)
+
+        The frequencies W = S*Z*diag(l)^-1 are sampled from the spectral density of the kernel (see
+        Kernel.get_spectral_scales). Only the quantiles of the scales S, the standard normal samples Z and the phases b
+        (uniformly distributed in [0, 2*pi]) are stored, so that the features depend smoothly on the hyperparameters.
+
+        :param n_random_features: number of random features D
+        :param rng: random number generator
+        :return:
+        """
+        n_dim = self.kernel._get_active_dims(self._n_features).size
+        return {
+            'quantiles': rng.uniform(size=n_random_features),
+            'samples': rng.standard_normal((n_random_features, n_dim)),
+            'phases': rng.uniform(0., 2 * np.pi, size=(n_random_features, 1))
+        }
+
+    def _get_random_frequencies(self, random_features: dict, hyperparameters: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Returns the frequencies of the random Fourier features for the supplied values of the hyperparameters of the
+        kernel
+
+        :param random_features: samples of the random Fourier features (see _sample_random_features)
+        :param hyperparameters:
+        :return:
+        """
+        scales = self.kernel.get_spectral_scales(random_features['quantiles'], hyperparameters=hyperparameters)
+        return random_features['samples'] * scales[:, None] / hyperparameters[self.kernel.length_scales.name]
+
+    def _factorize_random_features(self, w: np.ndarray, p: np.ndarray, random_features: dict) -> dict:
+        """
+        Evaluates the random Fourier features Phi of the training data and factorizes the matrix A = Phi*Phi^T +
+        sigma^2*I of Bayesian linear regression in the space of the features with NumPy
+
+        The vector alpha = (Phi^T*Phi + sigma^2*I)^-1*(y - m(X)) of the approximated covariance matrix follows from the
+        Woodbury identity as (y - m(X) - Phi^T*A^-1*Phi*(y - m(X)))/sigma^2, which costs O(n*D^2).
+
+        :param w:
+        :param p:
+        :param random_features: samples of the random Fourier features (see _sample_random_features)
+        :return:
+        """
+        X = self._X_train.values
+        n = X.shape[1]
+        n_random_features = random_features['phases'].shape[0]
+        hyperparameters = self._get_kernel_hyperparameters(w, p)
+        frequencies = self._get_random_frequencies(random_features, hyperparameters)
+        scale = np.sqrt(2 * float(hyperparameters[self.kernel.signal_variance.name]) / n_random_features)
+        active_dims = self.kernel._get_active_dims(self._n_features)
+        Phi = scale * np.cos(frequencies @ X[active_dims, :] + random_features['phases'])
+
+        noise_variance = float(self._numeric_functions['noise_variance'](w, p)[0])
+        A = Phi @ Phi.T
+        A[np.diag_indices_from(A)] += noise_variance
+        if not np.isfinite(A).all():
+            raise np.linalg.LinAlgError("Covariance matrix of the training data contains non-finite values")
+        L_A = cho_factor(A, lower=True)
+
+        y_minus_prior = self._get_residuals(X, self._y_train.values, w, p)
+        weights = cho_solve(L_A, Phi @ y_minus_prior.reshape(n, -1))
+        alpha = (y_minus_prior.reshape(n, -1) - Phi.T @ weights) / noise_variance
+
+        return {
+            'x0': w,
+            'p': p,
+            'noise_variance': noise_variance,
+            'residuals': y_minus_prior,
+            'alpha': alpha.reshape(y_minus_prior.shape),
+            'frequencies': frequencies,
+            'phases': random_features['phases'],
+            'scale': scale,
+            'features': Phi,
+            'L_A': L_A,
+            'weights': weights,
+            'log_det': (n - n_random_features) * np.log(noise_variance) + 2 * np.log(np.diag(L_A[0])).sum()
+        }
+
+    def _get_random_feature_log_marginal_likelihood(
+            self,
+            w: np.ndarray,
+            p: np.ndarray,
+            gradient: bool = False
+    ) -> Union[float, Tuple[float, np.ndarray]]:
+        """
+        Evaluates the log marginal likelihood and optionally its (analytic) gradient w.r.t. the hyperparameters to be
+        optimized for the kernel approximated by random Fourier features
+
+        With the approximated covariance matrix Phi^T*Phi + sigma^2*I the derivatives of the log marginal likelihood
+        w.r.t. the features are given by G = Phi*alpha*alpha^T - A^-1*Phi. They are propagated to the hyperparameters
+        of the kernel through the signal variance and the frequencies, where the derivatives of the frequencies w.r.t.
+        hyperparameters of the spectral density other than the length scales (e.g. alpha of the rational quadratic
+        kernel) are approximated by central differences.
+
+        :param w:
+        :param p:
+        :param gradient:
+        :return:
+        """
+        posterior = self._factorize_random_features(w, p, self._random_features)
+        X = self._X_train.values
+        n = X.shape[1]
+        y_minus_prior = posterior['residuals'].reshape(n, -1)
+        alpha = posterior['alpha'].reshape(n, -1)
+        n_outputs = alpha.shape[1]
+
+        log_hyperprior, d_log_hyperprior = self._numeric_functions['hyperprior'](w, p)
+        log_marginal_likelihood = -.5 * np.sum(y_minus_prior * alpha) - n_outputs * (
+                posterior['log_det'] / 2 + n / 2 * np.log(2 * np.pi)) + float(log_hyperprior)
+        if not gradient:
+            return log_marginal_likelihood
+
+        Phi = posterior['features']
+        L_A = posterior['L_A']
+        noise_variance = posterior['noise_variance']
+        frequencies = posterior['frequencies']
+        n_random_features = Phi.shape[0]
+        active_dims = self.kernel._get_active_dims(self._n_features)
+        hyperparameters = self._get_kernel_hyperparameters(w, p)
+
+        G = (Phi @ alpha) @ alpha.T - n_outputs * cho_solve(L_A, Phi)
+        # dlog(p(y|X))/dW = -(G.*S)*X^T with the derivatives S = -sqrt(2*sigma_f^2/D)*sin(W*x + b) of the features
+        d_frequencies = -(G * posterior['scale'] * np.sin(frequencies @ X[active_dims, :] + posterior['phases'])) @ X[
+            active_dims, :].T
+        d_hyperparameters = {}
+        for name in self.kernel.hyperparameter_names:
+            value = hyperparameters[name]
+            if name == self.kernel.signal_variance.name:
+                d_hyperparameters[name] = np.sum(G * Phi) / (2 * value)
+            elif name == self.kernel.length_scales.name:
+                d_length_scales = -d_frequencies * frequencies / value
+                if value.size == 1:
+                    d_hyperparameters[name] = np.atleast_1d(d_length_scales.sum())
+                else:
+                    d_hyperparameters[name] = d_length_scales.sum(axis=0)
+            else:
+                d_value = np.empty(value.size)
+                for k in range(value.size):
+                    step = 1e-6 * max(abs(value[k]), 1.)
+                    perturbed = dict(hyperparameters)
+                    perturbed[name] = value.copy()
+                    perturbed[name][k] = value[k] + step
+                    scales_plus = self.kernel.get_spectral_scales(self._random_features['quantiles'], perturbed)
+                    perturbed[name][k] = value[k] - step
+                    scales_minus = self.kernel.get_spectral_scales(self._random_features['quantiles'], perturbed)
+                    d_log_scales = (np.log(scales_plus) - np.log(scales_minus)) / (2 * step)
+                    d_value[k] = np.sum(d_log_scales * np.sum(d_frequencies * frequencies, axis=1))
+                d_hyperparameters[name] = d_value
+
+        d_log_marginal_likelihood = np.zeros(w.size)
+        for name, d_value in d_hyperparameters.items():
+            x_or_p, index = self._where_is_what[name]
+            if x_or_p != 'x0':
+                continue
+            if self._hyp_is_log[name]:
+                # Variances are parameterized by the logarithm of their square root
+                d_value = d_value * hyperparameters[name] * (2 if 'variance' in name else 1)
+            d_log_marginal_likelihood[index] += d_value if isinstance(index, slice) else float(d_value)
+
+        # tr((Phi^T*Phi + sigma^2*I)^-1) = (n - D)/sigma^2 + tr(A^-1)
+        trace = (n - n_random_features) / noise_variance + np.trace(cho_solve(L_A, np.eye(n_random_features)))
+        _, d_noise_variance = self._numeric_functions['noise_variance'](w, p)
+        _, d_mean = self._numeric_functions['vectorized_mean_gradient'](X, w, p)
+        d_log_marginal_likelihood += .5 * (np.sum(alpha ** 2) - n_outputs * trace) * d_noise_variance.full().flatten(
+            ) + d_mean @ alpha.sum(axis=1) + d_log_hyperprior.full().flatten()
+
+        return log_marginal_likelihood, d_log_marginal_likelihood
+
+    def _get_inducing_points(self, w: np.ndarray, p: np.ndarray) -> np.ndarray:
+        """
+        Returns the locations of the inducing points with shape (number of features, number of inducing points) for the
+        arguments of the numeric functions
+
+        :param w:
+        :param p:
+        :return:
+        """
+        value = self._get_numeric_value(self.inference.inducing_points.name, w, p)
+        return value.reshape(self._n_features, -1, order='F')
+
+    def _evaluate_pairwise_covariance_derivative(
+            self,
+            X: np.ndarray,
+            X_bar: np.ndarray,
+            w: np.ndarray,
+            p: np.ndarray
+    ) -> np.ndarray:
+        """
+        Evaluates the derivatives of the covariance function w.r.t. the observations in the columns of X for the pairs
+        of observations in the columns of X and X_bar
+
+        :param X:
+        :param X_bar:
+        :param w:
+        :param p:
+        :return: derivatives with shape (number of features, number of pairs)
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dk = self._numeric_functions['vectorized_covariance_derivative'](X, X_bar, w, p)[0]
+        # NOTE: The derivatives for identical observations are not well-defined for some kernels (see
+        #  _evaluate_numeric_covariance). Since the covariance function is symmetric, they are half of the derivatives
+        #  of the prior variance.
+        identical = np.all(X == X_bar, axis=0)
+        if identical.any():
+            dk[:, identical] = self._numeric_functions['vectorized_variance_derivative'](X[:, identical], w, p)[0] / 2
+        return dk
+
+    def _evaluate_inducing_point_covariance(
+            self,
+            Z: np.ndarray,
+            w: np.ndarray,
+            p: np.ndarray,
+            G: Optional[np.ndarray] = None
+    ) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Evaluates the covariance matrix K_uf between the inducing points Z and the training data with NumPy in blocks of
+        training observations
+
+        If G is supplied, K_uf is not returned, but the sums of the element-wise product of G with the derivatives of
+        K_uf w.r.t. the hyperparameters to be optimized and w.r.t. the locations of the inducing points (see
+        _evaluate_numeric_covariance).
+
+        :param Z: locations of the inducing points with shape (number of features, number of inducing points)
+        :param w:
+        :param p:
+        :param G:
+        :return:
+        """
+        X = self._X_train.values
+        n = X.shape[1]
+        m = Z.shape[1]
+        if G is None:
+            K_uf = np.empty((m, n))
+        else:
+            d_w = np.zeros(w.size)
+            d_Z = np.zeros(Z.shape)
+
+        n_columns = max(self.block_size // m, 1)
+        for start in range(0, n, n_columns):
+            stop = min(start + n_columns, n)
+            Z_block = np.repeat(Z, stop - start, axis=1)
+            X_block = np.tile(X[:, start:stop], m)
+            if G is None:
+                K_uf[:, start:stop] = self._evaluate_pairwise_covariance(Z_block, X_block, w, p).reshape(m,
+                                                                                                       stop - start)
+            else:
+                _, dk = self._evaluate_pairwise_covariance(Z_block, X_block, w, p, gradient=True)
+                d_w += dk @ G[:, start:stop].flatten()
+                dk = self._evaluate_pairwise_covariance_derivative(Z_block, X_block, w, p)
+                d_Z += np.einsum('kij,ij->ki', dk.reshape(-1, m, stop - start), G[:, start:stop])
+
+        if G is None:
+            return K_uf
+        return d_w, d_Z
+
+    def _factorize_sparse(self, w: np.ndarray, p: np.ndarray) -> dict:
+        """
+        Evaluates the sparse approximation Q_ff + diag(Lambda) of the covariance matrix of the training data with NumPy
+        and factorizes it like the symbolic posterior (see SparseInference.get_posterior)
+
+        With the Nyström approximation Q_ff = V^T*V, V = L_uu^-1*K_uf, the approximation is inverted by the Woodbury
+        identity with the Cholesky factor of A = I + V*diag(Lambda)^-1*V^T. Only the covariances K_uf between the M
+        inducing points and the training observations and the prior variances diag(K_ff) are evaluated, so that the
+        factorization costs O(n*M^2).
+
+        :param w:
+        :param p:
+        :return:
+        """
+        X = self._X_train.values
+        n = X.shape[1]
+        Z = self._get_inducing_points(w, p)
+        m = Z.shape[1]
+
+        noise_variance = float(self._numeric_functions['noise_variance'](w, p)[0])
+        K_uu = self._evaluate_pairwise_covariance(np.repeat(Z, m, axis=1), np.tile(Z, m), w, p).reshape(m, m)
+        K_uu[np.diag_indices_from(K_uu)] += self.inference.jitter
+        K_uf = self._evaluate_inducing_point_covariance(Z, w, p)
+        if not np.isfinite(K_uu).all() or not np.isfinite(K_uf).all():
+            raise np.linalg.LinAlgError("Covariance matrix of the inducing points contains non-finite values")
+        K_ff_diag = self._numeric_functions['vectorized_variance'](X, w, p)[0].flatten()
+
+        L_uu = np.linalg.cholesky(K_uu)
+        V = solve_triangular(L_uu, K_uf, lower=True)
+        Q_ff_diag = np.sum(V ** 2, axis=0)
+        Lambda = np.full(n, noise_variance)
+        if self.inference.corrects_diagonal:
+            Lambda += K_ff_diag - Q_ff_diag
+
+        V_Lambda = V / Lambda
+        A = V_Lambda @ V.T
+        A[np.diag_indices_from(A)] += 1.
+        L_A = np.linalg.cholesky(A)
+
+        y_minus_prior = self._get_residuals(X, self._y_train.values, w, p)
+        c = solve_triangular(L_A, V_Lambda @ y_minus_prior, lower=True)
+        # The mean is m(x) + k_u(x)^T*L_uu^-T*L_A^-T*c
+        weights = solve_triangular(L_uu.T, solve_triangular(L_A.T, c, lower=False), lower=False)
+
+        return {
+            'x0': w,
+            'p': p,
+            'inducing_points': Z,
+            'noise_variance': noise_variance,
+            'residuals': y_minus_prior,
+            'K_ff_diag': K_ff_diag,
+            'Q_ff_diag': Q_ff_diag,
+            'Lambda': Lambda,
+            'V': V,
+            'L_uu': L_uu,
+            'L_A': L_A,
+            'c': c,
+            'weights': weights
+        }
+
+    def _get_sparse_log_marginal_likelihood(
+            self,
+            w: np.ndarray,
+            p: np.ndarray,
+            gradient: bool = False
+    ) -> Union[float, Tuple[float, np.ndarray]]:
+        """
+        Evaluates the log marginal likelihood of the sparse approximation and optionally its (analytic) gradient w.r.t.
+        the hyperparameters to be optimized including the locations of the inducing points
+
+        The derivatives w.r.t. the approximated covariance matrix Sigma = Q_ff + diag(Lambda) are W = alpha*alpha^T -
+        Sigma^-1 like for the exact posterior. They are propagated to K_uu, K_uf and diag(K_ff) without forming W, since
+        K_uf*Sigma^-1 = L_uu*A^-1*V*diag(Lambda)^-1, which costs O(n*M^2). From there the derivatives follow from the
+        derivatives of the covariance function w.r.t. the hyperparameters and w.r.t. the observations, where the
+        inducing points enter.
+
+        :param w:
+        :param p:
+        :param gradient:
+        :return:
+        """
+        posterior = self._factorize_sparse(w, p)
+        X = self._X_train.values
+        n = X.shape[1]
+        noise_variance = posterior['noise_variance']
+        y_minus_prior = posterior['residuals']
+        Lambda = posterior['Lambda']
+        L_A = posterior['L_A']
+        c = posterior['c']
+
+        trace_term = 0.
+        if self.inference.has_trace_term:
+            trace_term = np.sum(posterior['K_ff_diag'] - posterior['Q_ff_diag']) / (2 * noise_variance)
+        log_hyperprior, d_log_hyperprior = self._numeric_functions['hyperprior'](w, p)
+        log_marginal_likelihood = -.5 * (np.sum(y_minus_prior ** 2 / Lambda) - np.sum(c ** 2)) - .5 * (
+                np.log(Lambda).sum() + 2 * np.log(np.diag(L_A)).sum()) - n / 2 * np.log(2 * np.pi) - trace_term + float(
+            log_hyperprior)
+        if not gradient:
+            return log_marginal_likelihood
+
+        Z = posterior['inducing_points']
+        m = Z.shape[1]
+        V = posterior['V']
+        L_uu_inv = solve_triangular(posterior['L_uu'], np.eye(m), lower=True)
+        A_inv = cho_solve((L_A, True), np.eye(m))
+
+        # alpha = Sigma^-1*(y - m(X)) and diag(Sigma^-1) by the Woodbury identity with B = L_A^-1*V*diag(Lambda)^-1
+        B = solve_triangular(L_A, V / Lambda, lower=True)
+        alpha = (y_minus_prior - V.T @ solve_triangular(L_A.T, c, lower=False)) / Lambda
+        d_Lambda = .5 * (alpha ** 2 - 1 / Lambda + np.sum(B ** 2, axis=0))
+
+        # dlog(p(y|X))/dK_uf = K_uu^-1*K_uf*W and dlog(p(y|X))/dK_uu = -1/2*K_uu^-1*K_uf*W*K_fu*K_uu^-1
+        V_alpha = V @ alpha
+        P = L_uu_inv.T @ V
+        G_uf = L_uu_inv.T @ (np.outer(V_alpha, alpha) - solve_triangular(L_A.T, B, lower=False))
+        G_uu = -.5 * L_uu_inv.T @ (np.outer(V_alpha, V_alpha) + A_inv - np.eye(m)) @ L_uu_inv
+
+        # The diagonal correction of FITC and the trace term of VFE also depend on diag(Q_ff) and diag(K_ff)
+        d_noise_variance = d_Lambda.sum()
+        if self.inference.corrects_diagonal:
+            d_Q_ff_diag = -d_Lambda
+            d_K_ff_diag = d_Lambda
+        elif self.inference.has_trace_term:
+            d_Q_ff_diag = np.full(n, 1 / (2 * noise_variance))
+            d_K_ff_diag = -d_Q_ff_diag
+            d_noise_variance += trace_term / noise_variance
+        else:
+            d_Q_ff_diag = None
+            d_K_ff_diag = None
+        if d_Q_ff_diag is not None:
+            G_uf += 2 * P * d_Q_ff_diag
+            G_uu -= (P * d_Q_ff_diag) @ P.T
+
+        d_log_marginal_likelihood, d_inducing_points = self._evaluate_inducing_point_covariance(Z, w, p, G=G_uf)
+        Z_pairs = (np.repeat(Z, m, axis=1), np.tile(Z, m))
+        _, dk = self._evaluate_pairwise_covariance(*Z_pairs, w, p, gradient=True)
+        d_log_marginal_likelihood += dk @ G_uu.flatten()
+        # NOTE: Every inducing point enters K_uu as both observations, which is accounted for by the symmetry of the
+        #  covariance function
+        dk = self._evaluate_pairwise_covariance_derivative(*Z_pairs, w, p)
+        d_inducing_points += np.einsum('kij,ij->ki', dk.reshape(-1, m, m), G_uu + G_uu.T)
+        if d_K_ff_diag is not None:
+            _, d_variance = self._numeric_functions['vectorized_variance_gradient'](X, w, p)
+            d_log_marginal_likelihood += d_variance @ d_K_ff_diag
+
+        x_or_p, index = self._where_is_what[self.inference.inducing_points.name]
+        if x_or_p == 'x0':
+            d_inducing_points = d_inducing_points.flatten(order='F')
+            d_log_marginal_likelihood[index] += d_inducing_points if isinstance(index, slice) else float(
+                d_inducing_points)
+
+        _, d_noise_variance_w = self._numeric_functions['noise_variance'](w, p)
+        _, d_mean = self._numeric_functions['vectorized_mean_gradient'](X, w, p)
+        d_log_marginal_likelihood += d_noise_variance * d_noise_variance_w.full().flatten() + d_mean @ alpha + \
+            d_log_hyperprior.full().flatten()
+
+        return log_marginal_likelihood, d_log_marginal_likelihood
+
+    def _get_posterior(self) -> dict:
+        """
+        Returns the Cholesky factor L of the covariance matrix of the training data and the vector alpha for the
+        current values of the hyperparameters
+
+        Both are cached until the hyperparameters or the training data change, so that the O(n^3) factorization is not
+        repeated for every prediction. For structured inference the factorization of the structured covariance matrix
+        is cached instead of the Cholesky factor (see _factorize_structured), for random Fourier features the
+        factorization in the space of the features (see _factorize_random_features) and for sparse inference the
+        factorization of the sparse approximation (see _factorize_sparse).
+
+        :return:
+        """
+        if self._posterior is None:
+            w, p = self._get_numeric_arguments()
+            if self._structure is not None:
+                self._posterior = self._factorize_structured(w, p)
+            elif self._random_features is not None:
+                self._posterior = self._factorize_random_features(w, p, self._random_features)
+            elif isinstance(self.inference, SparseInference):
+                self._posterior = self._factorize_sparse(w, p)
+            else:
+                L, _, alpha = self._factorize_numeric(w, p)
+                self._posterior = {
+                    'x0': w,
+                    'p': p,
+                    'L': L,
+                    'alpha': alpha
+                }
+        return self._posterior
+
+    def _predict_numeric(self, X_query: np.ndarray) -> (np.ndarray, np.ndarray):
+        """
+        Evaluates the noise-free posterior at numeric query points with NumPy in blocks of query points
+
+        The mean costs O(n) and the variance O(n^2) per query point, where n is the number of training observations.
+
+        :param X_query:
+        :return:
+        """
+        posterior = self._get_posterior()
+        if self._random_features is not None:
+            return self._predict_random_features(posterior, X_query)
+        if isinstance(self.inference, SparseInference):
+            return self._predict_sparse(posterior, X_query)
+        w, p, alpha = posterior['x0'], posterior['p'], posterior['alpha']
+
+        X = self._X_train.values
+        n = X.shape[1]
+        m = X_query.shape[1]
+        alpha = alpha.reshape(n, -1)
+
+        covariance = self._numeric_functions['vectorized_covariance']
+        mean = np.repeat(self._numeric_functions['vectorized_mean'](X_query, w, p)[0], alpha.shape[1], axis=0)
+        var = self._numeric_functions['vectorized_variance'](X_query, w, p)[0]
+
+        n_columns = max(self.block_size // n, 1)
+        for start in range(0, m, n_columns):
+            stop = min(start + n_columns, m)
+            k = covariance(np.tile(X, stop - start), np.repeat(X_query[:, start:stop], n, axis=1), w, p)[0]
+            k = k.reshape(stop - start, n).T
+            mean[:, start:stop] += alpha.T @ k
+            if self._structure is not None:
+                var[0, start:stop] -= np.sum(k * self._solve_structured(posterior, k), axis=0)
+            else:
+                var[0, start:stop] -= np.sum(solve_triangular(posterior['L'][0], k, lower=True) ** 2, axis=0)
+
+        return mean, var
+
+    def _predict_random_features(self, posterior: dict, X_query: np.ndarray) -> (np.ndarray, np.ndarray):
+        """
+        Evaluates the noise-free posterior of Bayesian linear regression in the space of the random Fourier features at
+        numeric query points, which costs O(D) for the mean and O(D^2) for the variance per query point
+
+        :param posterior: factorization in the space of the features (see _factorize_random_features)
+        :param X_query:
+        :return:
+        """
+        w, p, weights = posterior['x0'], posterior['p'], posterior['weights']
+        active_dims = self.kernel._get_active_dims(self._n_features)
+        phi = posterior['scale'] * np.cos(posterior['frequencies'] @ X_query[active_dims, :] + posterior['phases'])
+        mean = np.repeat(self._numeric_functions['vectorized_mean'](X_query, w, p)[0], weights.shape[1], axis=0)
+        mean += weights.T @ phi
+        var = posterior['noise_variance'] * np.sum(phi * cho_solve(posterior['L_A'], phi), axis=0, keepdims=True)
+        return mean, var
+
+    def _predict_sparse(self, posterior: dict, X_query: np.ndarray) -> (np.ndarray, np.ndarray):
+        """
+        Evaluates the noise-free posterior of the sparse approximation at numeric query points in blocks of query
+        points, which costs O(M) for the mean and O(M^2) for the variance per query point
+
+        :param posterior: factorization of the sparse approximation (see _factorize_sparse)
+        :param X_query:
+        :return:
+        """
+        w, p, Z = posterior['x0'], posterior['p'], posterior['inducing_points']
+        m = Z.shape[1]
+        n_queries = X_query.shape[1]
+        mean = self._numeric_functions['vectorized_mean'](X_query, w, p)[0]
+        var = self._numeric_functions['vectorized_variance'](X_query, w, p)[0]
+
+        n_columns = max(self.block_size // m, 1)
+        for start in range(0, n_queries, n_columns):
+            stop = min(start + n_columns, n_queries)
+            Z_block = np.repeat(Z, stop - start, axis=1)
+            k = self._evaluate_pairwise_covariance(Z_block, np.tile(X_query[:, start:stop], m), w, p).reshape(
+                m, stop - start)
+            mean[0, start:stop] += posterior['weights'] @ k
+            V_test = solve_triangular(posterior['L_uu'], k, lower=True)
+            W_test = solve_triangular(posterior['L_A'], V_test, lower=True)
+            if self.inference.has_degenerate_variance:
+                var[0, start:stop] = np.sum(W_test ** 2, axis=0)
+            else:
+                var[0, start:stop] += np.sum(W_test ** 2, axis=0) - np.sum(V_test ** 2, axis=0)
+
+        return mean, var
+
+    def _get_prediction_function(self) -> ca.Function:
+        """
+        Returns a CasADi function of the noise-free posterior for symbolic query points, where the Cholesky factor and
+        alpha enter as constants
+
+        :return:
+        """
+        posterior = self._get_posterior()
+        if 'function' not in posterior:
+            X = ca.MX.sym('X', self._n_features)
+            mean, var = self._get_posterior_expressions(X)
+            posterior['function'] = ca.Function('prediction', [X], [mean, var], ['X'], ['mean', 'variance'])
+        return posterior['function']
+
+    def _get_posterior_expressions(self, X: ca.MX, include_variance: bool = True) -> (ca.MX, Optional[ca.MX]):
+        """
+        Returns the expressions of the noise-free posterior mean and variance at the symbolic query point X, where the
+        Cholesky factor and alpha enter as constants
+
+        For structured inference the mean only needs alpha. The variance of the Kronecker structure is evaluated from
+        the eigendecompositions of the factors, so the expressions stay O(n) in size. For the Toeplitz structure the
+        variance needs the dense inverse of the covariance matrix of the training data, i.e. O(n^2) memory, which is
+        only formed if the variance is requested and then cached with the posterior.
+
+        :param X:
+        :param include_variance:
+        :return:
+        """
+        posterior = self._get_posterior()
+        if self._random_features is not None:
+            return self._get_random_feature_expressions(X, posterior, include_variance=include_variance)
+        if isinstance(self.inference, SparseInference):
+            return self._get_sparse_expressions(X, posterior, include_variance=include_variance)
+
+        w, p, alpha = posterior['x0'], posterior['p'], posterior['alpha']
+        n = self._X_train.values.shape[1]
+
+        k = self._numeric_functions['covariance'](self._X_train.values, X, w, p)
+        mean = self._numeric_functions['mean'](X, w, p) + ca.mtimes(alpha.reshape(n, -1).T, k.T)
+        if not include_variance:
+            return mean, None
+        if self._structure == 'kronecker':
+            # NOTE: With the eigendecomposition Q*Lambda*Q^T of the covariance matrix, k^T*(K + sigma^2*I)^-1*k is the
+            #  sum of the squares of Q^T*k scaled by 1/sqrt(lambda + sigma^2)
+            eigenvectors = [eigenvector.T for eigenvector in posterior['eigenvectors']]
+            v = _kronecker_matvec_symbolic(eigenvectors, k.T[self._grid['order'].tolist()])
+            scale = 1. / np.sqrt(posterior['eigenvalues'] + posterior['noise_variance'])
+            var = self._numeric_functions['variance'](X, w, p) - ca.sumsqr(scale * v)
+        elif self._structure == 'toeplitz':
+            if 'inverse' not in posterior:
+                posterior['inverse'] = self._solve_structured(posterior, np.eye(n))
+            var = self._numeric_functions['variance'](X, w, p) - ca.mtimes(k, ca.mtimes(posterior['inverse'], k.T))
+        else:
+            L_inv = solve_triangular(posterior['L'][0], np.eye(n), lower=True)
+            var = self._numeric_functions['variance'](X, w, p) - ca.sumsqr(ca.mtimes(L_inv, k.T))
+        return mean, var
+
+    def _get_inducing_point_expressions(
+            self,
+            X: ca.MX,
+            inducing_points: np.ndarray,
+            include_variance: bool = True
+    ) -> (ca.MX, Optional[ca.MX]):
+        """
+        Returns the expressions of the noise-free posterior mean and variance at the symbolic query point X of the
+        deterministic training conditional (DTC) approximation with the supplied inducing points
+
+        With the covariance matrices K_uu of the inducing points and K_uf between the inducing points and the training
+        observations and A = sigma^2*K_uu + K_uf*K_uf^T, the mean is m(x) + k_u(x)^T*A^-1*K_uf*(y - m(X)) and the
+        variance is k(x, x) - k_u(x)^T*(K_uu^-1 - sigma^2*A^-1)*k_u(x) (see Quiñonero-Candela and Rasmussen, 2005). Both
+        only depend on the inducing points, while the training data enters through the precomputed constants.
+
+        :param X:
+        :param inducing_points: locations of the inducing points with shape (number of features, number of inducing
+            points)
+        :param include_variance:
+        :return:
+        """
+        posterior = self._get_posterior()
+        w, p = posterior['x0'], posterior['p']
+        X_train = self._X_train.values
+        n = X_train.shape[1]
+        m = inducing_points.shape[1]
+
+        noise_variance = float(self._numeric_functions['noise_variance'](w, p)[0])
+        K_uu = self._evaluate_pairwise_covariance(np.repeat(inducing_points, m, axis=1), np.tile(inducing_points, m),
+                                                  w, p).reshape(m, m)
+        # The jitter is scaled with the signal variance, since the training data is usually not normalized
+        K_uu[np.diag_indices_from(K_uu)] += SparseInference.jitter * np.diag(K_uu).mean()
+        K_uf = self._evaluate_pairwise_covariance(np.repeat(inducing_points, n, axis=1), np.tile(X_train, m), w,
+                                                  p).reshape(m, n)
+        y_minus_prior = self._get_residuals(X_train, self._y_train.values, w, p).reshape(n, -1)
+
+        # A = L_uu*(sigma^2*I + V*V^T)*L_uu^T with V = L_uu^-1*K_uf is factorized in this form, since sigma^2*K_uu +
+        # K_uf*K_uf^T is too ill-conditioned, if inducing points are close to each other
+        L_uu = np.linalg.cholesky(K_uu)
+        L_uu_inv = solve_triangular(L_uu, np.eye(m), lower=True)
+        V = L_uu_inv @ K_uf
+        A = V @ V.T
+        A[np.diag_indices_from(A)] += noise_variance
+        L_A = cho_factor(A, lower=True)
+        alpha = L_uu_inv.T @ cho_solve(L_A, V @ y_minus_prior)
+
+        k = self._numeric_functions['covariance'](inducing_points, X, w, p)
+        mean = self._numeric_functions['mean'](X, w, p) + ca.mtimes(alpha.T, k.T)
+        if not include_variance:
+            return mean, None
+        B = L_uu_inv.T @ (np.eye(m) - noise_variance * cho_solve(L_A, np.eye(m))) @ L_uu_inv
+        var = self._numeric_functions['variance'](X, w, p) - ca.mtimes(k, ca.mtimes((B + B.T) / 2, k.T))
+        return mean, var
+
+    def _get_random_feature_expressions(
+            self,
+            X: ca.MX,
+            posterior: dict,
+            include_variance: bool = True
+    ) -> (ca.MX, Optional[ca.MX]):
+        """
+        Returns the expressions of the noise-free posterior mean and variance at the symbolic query point X of Bayesian
+        linear regression in the space of the random Fourier features
+
+        The mean is m(x) + phi(x)^T*A^-1*Phi*(y - m(X)) and the variance is sigma^2*phi(x)^T*A^-1*phi(x) with
+        A = Phi*Phi^T + sigma^2*I, so that the expressions only depend on the number of features D.
+
+        :param X:
+        :param posterior: factorization in the space of the features (see _factorize_random_features)
+        :param include_variance:
+        :return:
+        """
+        w, p = posterior['x0'], posterior['p']
+        active_dims = self.kernel._get_active_dims(self._n_features)
+        phi = posterior['scale'] * ca.cos(ca.mtimes(posterior['frequencies'], X[active_dims.tolist()]) +
+                                          posterior['phases'])
+        mean = self._numeric_functions['mean'](X, w, p) + ca.mtimes(posterior['weights'].T, phi)
+        if not include_variance:
+            return mean, None
+        A_inv = cho_solve(posterior['L_A'], np.eye(posterior['weights'].shape[0]))
+        var = posterior['noise_variance'] * ca.mtimes(phi.T, ca.mtimes((A_inv + A_inv.T) / 2, phi))
+        return mean, var
+
+    def _get_sparse_expressions(
+            self,
+            X: ca.MX,
+            posterior: dict,
+            include_variance: bool = True
+    ) -> (ca.MX, Optional[ca.MX]):
+        """
+        Returns the expressions of the noise-free posterior mean and variance at the symbolic query point X of the
+        sparse approximation, which only depend on the covariances k_u(x) between the query point and the inducing
+        points (see _predict_sparse)
+
+        :param X:
+        :param posterior: factorization of the sparse approximation (see _factorize_sparse)
+        :param include_variance:
+        :return:
+        """
+        w, p, Z = posterior['x0'], posterior['p'], posterior['inducing_points']
+        m = Z.shape[1]
+        k = self._numeric_functions['covariance'](Z, X, w, p)
+        mean = self._numeric_functions['mean'](X, w, p) + ca.mtimes(k, posterior['weights'])
+        if not include_variance:
+            return mean, None
+        L_uu_inv = solve_triangular(posterior['L_uu'], np.eye(m), lower=True)
+        W = solve_triangular(posterior['L_A'], L_uu_inv, lower=True)
+        B = W.T @ W
+        if self.inference.has_degenerate_variance:
+            return mean, ca.mtimes(k, ca.mtimes((B + B.T) / 2, k.T))
+        B = L_uu_inv.T @ L_uu_inv - B
+        var = self._numeric_functions['variance'](X, w, p) - ca.mtimes(k, ca.mtimes((B + B.T) / 2, k.T))
+        return mean, var
+
     def is_setup(self) -> bool:
         """
 
         :return:
         """
-        if self._gp_solver is not None:
+        if self._gp_solver is not None or self._numeric_functions is not None:
             return True
         else:
             return False
@@ -655,9 +2176,120 @@ class GaussianProcess(LearningBase):
 
         :return:
         """
+        if self._log_marginal_likelihood is None:
+            return float(self._get_numeric_log_marginal_likelihood(*self._get_numeric_arguments()))
         return float(self._log_marginal_likelihood(x0=self._gp_args['x0'], p=self._gp_args['p'])['log_marg_lik'])
 
-    def fit_model(self) -> None:
+    def _sample_initial_hyperparameters(self, n_samples: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        Samples initial values of the hyperparameters to be optimized for the multi-start optimization
+
+        The samples are drawn in the space of the optimization variables, i.e. the logarithm for positive
+        hyperparameters. Hyperparameters with a prior are sampled from the prior, hyperparameters with finite bounds
+        uniformly between their bounds and all other hyperparameters from a normal distribution with unit variance
+        around their current value. Hyperparameters whose prior cannot be sampled, e.g. a delta prior, are treated as if
+        they had no prior.
+
+        :param n_samples: number of samples
+        :param rng: random number generator
+        :return: samples with shape (number of samples, number of hyperparameters to be optimized)
+        """
+        w0 = ca.DM(self._gp_args['x0']).full().flatten()
+        samples = np.empty((n_samples, w0.size))
+        for parameter in self.hyperparameters:
+            if parameter.fixed:
+                continue
+
+            name = parameter.name
+            _, index = self._where_is_what[name]
+            n_p = parameter.SX.numel()
+            if self._hyp_is_log[name]:
+                scale = .5 if 'variance' in name else 1.
+                bounds = [scale * float(bound) for bound in parameter.log_bounds]
+            else:
+                bounds = [float(bound) for bound in parameter.bounds]
+
+            sample = None
+            if parameter.prior is not None:
+                try:
+                    sample = parameter.prior.sample(size=(n_samples, n_p), rng=rng)
+                except NotImplementedError:
+                    pass
+            if sample is None:
+                if np.isfinite(bounds).all():
+                    sample = rng.uniform(*bounds, size=(n_samples, n_p))
+                else:
+                    sample = np.reshape(w0[index], (1, -1)) + rng.standard_normal((n_samples, n_p))
+            samples[:, index] = np.clip(sample, *bounds).reshape(samples[:, index].shape)
+
+        return samples
+
+    def _optimize_hyperparameters(self, w0: np.ndarray) -> dict:
+        """
+        Minimizes the negative log marginal likelihood starting from the supplied values of the hyperparameters to be
+        optimized
+
+        :param w0: initial values of the hyperparameters to be optimized
+        :return: optimal values, objective value and statistics of the solver including the wall time
+        """
+        start = time.perf_counter()
+        if self._gp_backend == 'numpy':
+            _, p = self._get_numeric_arguments()
+            # NOTE: If the covariance matrix is not positive definite for some hyperparameters (e.g. vanishing noise
+            #  variance with duplicate observations), the objective is set to infinity, so that the solver backtracks
+            if self._solver in ['Nelder-Mead', 'Powell']:
+                def objective(w):
+                    """
+
+                    :param w:
+                    :return:
+                    """
+                    try:
+                        with np.errstate(over='ignore'):
+                            return -self._get_numeric_log_marginal_likelihood(w, p)
+                    except np.linalg.LinAlgError:
+                        return np.inf
+            else:
+                def objective(w):
+                    """
+
+                    :param w:
+                    :return:
+                    """
+                    try:
+                        with np.errstate(over='ignore'):
+                            log_marginal_likelihood, d_log_marginal_likelihood = \
+                                self._get_numeric_log_marginal_likelihood(w, p, gradient=True)
+                    except np.linalg.LinAlgError:
+                        return np.inf, np.zeros_like(w)
+                    return -log_marginal_likelihood, -d_log_marginal_likelihood
+
+            solution = minimize(objective, w0, method=self._solver, jac=self._solver not in ['Nelder-Mead', 'Powell'],
+                                **self._solver_options)
+            values = solution.x
+            value = float(solution.fun)
+            stats = {
+                'status': solution.status,
+                'success': solution.success,
+                'message': solution.message
+            }
+        else:
+            self._gp_solver.set_initial_guess(w0)
+            self._gp_solver.solve()
+            values = self._gp_solver.solution.get_by_id('x:f').full().flatten()
+            value = -float(self._log_marginal_likelihood(x0=values, p=self._gp_args['p'])['log_marg_lik'])
+            stats = self._gp_solver.stats()
+
+        return {
+            'x0': np.asarray(w0, dtype=float),
+            'x': values,
+            'objective': value,
+            'success': bool(stats['success']),
+            'time': time.perf_counter() - start,
+            'stats': stats
+        }
+
+    def fit_model(self, n_restarts: int = 0, n_jobs: int = 1, seed: Optional[int] = None) -> None:
         """
         Optimizes the hyperparameters by minimizing the negative log marginal likelihood.
 
@@ -665,21 +2297,54 @@ class GaussianProcess(LearningBase):
         their targets) and suitable start values and bounds for the hyperparameters, the hyperparameters will be
         adapted by minimizing the negative log marginal likelihood.
 
+        Since the log marginal likelihood is usually multimodal, the optimization can be restarted from random initial
+        values of the hyperparameters, which are sampled from their priors or bounds (see
+        _sample_initial_hyperparameters). The first optimization always starts from the current values of the
+        hyperparameters and the result with the lowest negative log marginal likelihood is kept. The initial values,
+        the results, the success and the wall time of every optimization are stored in the attribute restart_stats.
+
         :Note: Instead of boundary values the string 'fixed' can be passed which flags the hyperparameter, keeping it
             constant during the optimization routine.
 
+        :param n_restarts: number of additional optimizations from random initial values of the hyperparameters
+        :param n_jobs: number of worker processes the optimizations are distributed over. Requires the 'fork' start
+            method of the multiprocessing module, otherwise the optimizations are run one after another.
+        :param seed: seed of the random number generator for the initial values of the hyperparameters
         :return:
         """
-        if self._gp_solver is None:
+        if not self.is_setup():
             raise RuntimeError("The GP has not been set up yet. Please run the setup() method before fitting.")
-
-        self._gp_solver.solve()
-        solution = self._gp_solver.solution
+        if self._gp_backend == 'casadi' and self._gp_solver is None:
+            raise RuntimeError("The number of training observations changed. Please run the setup() method again "
+                               "before fitting.")
 
         names = [parameter.name for parameter in self.hyperparameters if not parameter.fixed]
-        values = solution.get_by_id('x:f').full().flatten()
-        self.update_hyperparameters(names, values=values)
-        self._optimization_stats = self._gp_solver.stats()
+        w0 = ca.DM(self._gp_args['x0']).full().flatten()
+        if n_restarts > 0:
+            w0 = np.vstack([w0, self._sample_initial_hyperparameters(n_restarts, np.random.default_rng(seed))])
+        else:
+            w0 = w0.reshape(1, -1)
+
+        if n_jobs > 1 and n_restarts > 0:
+            if 'fork' in multiprocessing.get_all_start_methods():
+                # NOTE: The worker processes are forked, so that the GP doesn't need to be pickled (CasADi and SciPy
+                #  objects cannot be pickled in general). Only the initial values and the results are transferred.
+                with ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context('fork'),
+                                         initializer=_initialize_fit_worker, initargs=(self,)) as pool:
+                    results = list(pool.map(_fit_in_worker, w0))
+            else:  # pragma: no cover
+                warnings.warn("Parallel restarts of the hyperparameter optimization require the 'fork' start method. "
+                              "Running the restarts sequentially.")
+                results = [self._optimize_hyperparameters(w) for w in w0]
+        else:
+            results = [self._optimize_hyperparameters(w) for w in w0]
+
+        objective = [result['objective'] if np.isfinite(result['objective']) else np.inf for result in results]
+        best = results[int(np.argmin(objective))]
+        self._restart_stats = [{key: value for key, value in result.items() if key != 'stats'} for result in results]
+        self._optimization_stats = best['stats']
+
+        self.update_hyperparameters(names, values=best['x'].copy())
         if not self._optimization_stats['success']:  # pragma: no cover
             if self._solver == 'ipopt':
                 return_status = self._optimization_stats['return_status']
@@ -703,15 +2368,33 @@ class GaussianProcess(LearningBase):
         :param noise_free:
         :return:
         """
-        if self._function is None:
+        if not self.is_setup():
             raise RuntimeError("The GP has not been set up yet. Please run the setup() method before predicting.")
 
-        prediction = self._function(X=X_query, x0=self._gp_args['x0'], p=self._gp_args['p'])
-        mean, var = prediction['mean'], prediction['variance']
+        if self._numeric_functions is not None:
+            # NOTE: The exact posterior is evaluated from the cached Cholesky factorization of the covariance matrix of
+            #  the training data
+            if isinstance(X_query, (ca.SX, ca.MX)):
+                prediction = self._get_prediction_function()(X=X_query)
+                mean, var = prediction['mean'], prediction['variance']
+            else:
+                X = X_query.full() if isinstance(X_query, ca.DM) else np.asarray(X_query, dtype=float)
+                if X.ndim < 2:
+                    X = X.reshape(-1, 1)
+                mean, var = self._predict_numeric(X)
+                if not isinstance(X_query, np.ndarray):
+                    mean = ca.DM(mean)
+                    var = ca.DM(var)
+        else:
+            prediction = self._function(X=X_query, x0=self._gp_args['x0'], p=self._gp_args['p'])
+            mean, var = prediction['mean'], prediction['variance']
         if not noise_free:
-            var += self.noise_variance.value
+            if isinstance(var, np.ndarray):
+                var = var + float(self.noise_variance.value)
+            else:
+                var += self.noise_variance.value
 
-        if isinstance(X_query, np.ndarray):
+        if isinstance(X_query, np.ndarray) and isinstance(mean, ca.DM):
             mean = mean.full()
             var = var.full()
 
@@ -745,6 +2428,86 @@ class GaussianProcess(LearningBase):
 
         return predictive_quantiles[0], predictive_quantiles[1]
 
+    def to_function(
+            self,
+            name: Optional[str] = None,
+            approximation: Optional[str] = None,
+            n_inducing_points: Optional[int] = None,
+            inducing_points: Optional[np.ndarray] = None,
+            n_random_features: Optional[int] = None,
+            include_variance: bool = True,
+            seed: Optional[int] = None
+    ) -> ca.Function:
+        """
+        Exports the noise-free posterior of the trained GP as a compact CasADi function
+
+        All quantities that only depend on the training data and the hyperparameters (e.g. alpha) are precomputed, so
+        that the function only contains the covariances between the query point and the training observations (or the
+        basis of an approximation). The function has one scalar input per feature, which is named after the feature,
+        and the outputs 'mean' and optionally 'variance'. Without the variance it can be added to a model as a learned
+        term like any other CasADi function (see Model.__add__), e.g. for an NMPC, where the size of the NLP and the
+        evaluation time then scale with the size of the approximation instead of the number of training observations.
+
+        :param name: name of the function, defaults to 'gp'
+        :param approximation: None (exact posterior), 'inducing_points' (deterministic training conditional with
+            inducing points) or 'random_features' (random Fourier features, only available for the squared
+            exponential, the Matérn and the rational quadratic kernels)
+        :param n_inducing_points: number of inducing points, which are placed at evenly spaced observations of the
+            training data. Defaults to 20. Ignored if the locations of the inducing points are supplied.
+        :param inducing_points: locations of the inducing points with shape (number of features, number of inducing
+            points)
+        :param n_random_features: number of random Fourier features. Defaults to 100.
+        :param include_variance: whether the posterior variance is returned as well. The exact variance of a GP with
+            Toeplitz structure contains the dense inverse of the covariance matrix of the training data.
+        :param seed: seed of the random number generator for the random Fourier features
+        :return:
+        """
+        if not self.is_setup():
+            raise RuntimeError("The GP has not been set up yet. Please run the setup() method before exporting.")
+        if self._numeric_functions is None:
+            raise RuntimeError("The export of the GP is only available for Gaussian likelihood and exact inference or "
+                               "the NumPy backend")
+        if name is None:
+            name = 'gp'
+
+        x = [ca.MX.sym(feature) for feature in self._features]
+        X = ca.vertcat(*x)
+        if approximation is None:
+            mean, var = self._get_posterior_expressions(X, include_variance=include_variance)
+        elif approximation == 'inducing_points':
+            if inducing_points is None:
+                X_train = self._X_train.values
+                if n_inducing_points is None:
+                    n_inducing_points = 20
+                n_inducing_points = min(n_inducing_points, X_train.shape[1])
+                index = np.round(np.linspace(0, X_train.shape[1] - 1, n_inducing_points)).astype(int)
+                inducing_points = X_train[:, index]
+            else:
+                inducing_points = np.atleast_2d(np.asarray(inducing_points, dtype=float))
+                if inducing_points.shape[0] != self._n_features:
+                    raise ValueError(f"Dimension mismatch. Supplied dimension for the inducing points is "
+                                     f"{inducing_points.shape[0]}, but required dimension is {self._n_features}.")
+            mean, var = self._get_inducing_point_expressions(X, inducing_points, include_variance=include_variance)
+        elif approximation == 'random_features':
+            if not self.kernel.has_spectral_density:
+                raise ValueError("Random Fourier features are only available for the squared exponential, the Matérn "
+                                 "and the rational quadratic kernels")
+            if n_random_features is None:
+                n_random_features = 100
+            w, p = self._get_numeric_arguments()
+            random_features = self._sample_random_features(n_random_features, np.random.default_rng(seed))
+            posterior = self._factorize_random_features(w, p, random_features)
+            mean, var = self._get_random_feature_expressions(X, posterior, include_variance=include_variance)
+        else:
+            raise ValueError(f"Approximation '{approximation}' not recognized. Choose either 'inducing_points' or "
+                             f"'random_features'.")
+
+        if not include_variance:
+            return ca.Function(name, x, [mean], self._features, ['mean'])
+        # All outputs share the posterior variance (see MultiOutputGaussianProcess)
+        var = ca.repmat(var, self._n_labels, 1)
+        return ca.Function(name, x, [mean, var], self._features, ['mean', 'variance'])
+
     def plot(self, X_query: Array, backend: Optional[str] = None, **kwargs) -> None:
         """
 
@@ -971,6 +2734,263 @@ class GaussianProcess(LearningBase):
         solution.plot(('t', 'error'), ('t', 'post_std'), **plot_kwargs)
 
 
+_worker_gp = None
+
+
+def _initialize_fit_worker(gp: GaussianProcess) -> None:
+    """
+    Stores the GP in the worker process of the multi-start optimization of the hyperparameters
+
+    :param gp:
+    :return:
+    """
+    global _worker_gp
+    _worker_gp = gp
+
+
+def _fit_in_worker(w0: np.ndarray) -> dict:
+    """
+    Optimizes the hyperparameters of the GP in the worker process
+
+    :param w0: initial values of the hyperparameters to be optimized
+    :return:
+    """
+    return _worker_gp._optimize_hyperparameters(w0)
+
+
+def _cholesky_update(L: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """
+    Returns the lower Cholesky factor of L*L^T + x*x^T in O(n^2)
+
+    :param L: lower Cholesky factor
+    :param x: vector of the rank-one update
+    :return:
+    """
+    L = L.copy()
+    x = x.copy()
+    for k in range(x.size):
+        r = np.hypot(L[k, k], x[k])
+        c = r / L[k, k]
+        s = x[k] / L[k, k]
+        L[k, k] = r
+        L[k + 1:, k] = (L[k + 1:, k] + s * x[k + 1:]) / c
+        x[k + 1:] = c * x[k + 1:] - s * L[k + 1:, k]
+    return L
+
+
+def _remove_from_cholesky_factor(L: np.ndarray, index: int) -> np.ndarray:
+    """
+    Returns the lower Cholesky factor of the matrix L*L^T without the row and column at index
+
+    The rows and columns in front of the index are not affected. The trailing block is corrected by a rank-one update
+    with the column of L below the removed diagonal element.
+
+    :param L: lower Cholesky factor
+    :param index: index of the row and column to be removed
+    :return:
+    """
+    L_reduced = np.delete(np.delete(L, index, axis=0), index, axis=1)
+    L_reduced[index:, index:] = _cholesky_update(L_reduced[index:, index:], L[index + 1:, index])
+    return L_reduced
+
+
+def _levinson_durbin(column: np.ndarray) -> (np.ndarray, float):
+    """
+    Returns the first column of the inverse and the log-determinant of a symmetric positive definite Toeplitz matrix in
+    O(n^2) time and O(n) memory
+
+    :param column: first column of the Toeplitz matrix
+    :return:
+    """
+    n = column.size
+    a = np.zeros(n)
+    v = column[0]
+    if v <= 0.:
+        raise np.linalg.LinAlgError("Toeplitz matrix is not positive definite")
+    log_det = np.log(v)
+    for k in range(1, n):
+        # Reflection coefficient of the k-th order linear predictor
+        kappa = (column[k] - a[1:k] @ column[k - 1:0:-1]) / v
+        a[1:k] = a[1:k] - kappa * a[k - 1:0:-1]
+        a[k] = kappa
+        v *= 1. - kappa ** 2
+        if v <= 0.:
+            raise np.linalg.LinAlgError("Toeplitz matrix is not positive definite")
+        log_det += np.log(v)
+    a[0] = -1.
+    return -a / v, log_det
+
+
+def _lower_toeplitz_matvec(column: np.ndarray, B: np.ndarray) -> np.ndarray:
+    """
+    Returns the product of the lower triangular Toeplitz matrix with the supplied first column and the matrix B using
+    the FFT
+
+    :param column:
+    :param B:
+    :return:
+    """
+    n = column.size
+    n_fft = 2 * n
+    return np.fft.irfft(np.fft.rfft(column, n_fft)[:, None] * np.fft.rfft(B, n_fft, axis=0), n_fft, axis=0)[:n]
+
+
+def _toeplitz_matvec(column: np.ndarray, B: np.ndarray) -> np.ndarray:
+    """
+    Returns the product of the symmetric Toeplitz matrix with the supplied first column and the matrix B in
+    O(n*log(n)) per column of B, by embedding the Toeplitz matrix into a circulant matrix
+
+    :param column:
+    :param B:
+    :return:
+    """
+    n = column.size
+    n_fft = 2 * n
+    circulant = np.concatenate([column, [0.], column[:0:-1]])
+    return np.fft.irfft(np.fft.rfft(circulant)[:, None] * np.fft.rfft(B, n_fft, axis=0), n_fft, axis=0)[:n]
+
+
+def _toeplitz_inverse_matvec(inverse_column: np.ndarray, B: np.ndarray) -> np.ndarray:
+    """
+    Returns the product of the inverse of a symmetric Toeplitz matrix with the matrix B in O(n*log(n)) per column of B
+
+    The inverse is represented by its first column x using the Gohberg-Semencul formula
+    T^-1 = (L_x*L_x^T - L_y*L_y^T)/x_0, where L_x and L_y are lower triangular Toeplitz matrices with the first columns
+    x and y = (0, x_(n-1), ..., x_1).
+
+    :param inverse_column: first column of the inverse
+    :param B:
+    :return:
+    """
+    shifted = np.concatenate([[0.], inverse_column[:0:-1]])
+    # NOTE: The transpose of a lower triangular Toeplitz matrix is obtained by reversing the order of the rows and
+    #  columns
+    B_inv = _lower_toeplitz_matvec(inverse_column, _lower_toeplitz_matvec(inverse_column, B[::-1])[::-1])
+    B_inv -= _lower_toeplitz_matvec(shifted, _lower_toeplitz_matvec(shifted, B[::-1])[::-1])
+    return B_inv / inverse_column[0]
+
+
+def _toeplitz_inverse_diagonal_sums(inverse_column: np.ndarray) -> np.ndarray:
+    """
+    Returns the sums of the main diagonal and the upper diagonals of the inverse of a symmetric Toeplitz matrix in
+    O(n*log(n)) using the Gohberg-Semencul formula (see _toeplitz_inverse_matvec)
+
+    :param inverse_column: first column of the inverse
+    :return:
+    """
+    n = inverse_column.size
+    n_fft = 2 * n
+    index = np.arange(n)
+
+    def diagonal_sums(column):
+        """Sums of the diagonals of L*L^T for the lower triangular Toeplitz matrix L with the supplied first column"""
+        spectrum = np.fft.rfft(column, n_fft)
+        correlation = np.fft.irfft(np.abs(spectrum) ** 2, n_fft)[:n]
+        weighted_correlation = np.fft.irfft(np.conj(np.fft.rfft(index * column, n_fft)) * spectrum, n_fft)[:n]
+        return (n - index) * correlation - weighted_correlation
+
+    shifted = np.concatenate([[0.], inverse_column[:0:-1]])
+    return (diagonal_sums(inverse_column) - diagonal_sums(shifted)) / inverse_column[0]
+
+
+def _kronecker_matvec(factors: Sequence[np.ndarray], B: np.ndarray) -> np.ndarray:
+    """
+    Returns the product of the Kronecker product of the factors with the matrix B without forming the Kronecker product
+
+    :param factors:
+    :param B:
+    :return:
+    """
+    n_columns = B.shape[1]
+    B = B.T.reshape(n_columns, *[factor.shape[1] for factor in factors])
+    for d, factor in enumerate(factors):
+        B = np.moveaxis(np.tensordot(factor, B, axes=([1], [d + 1])), 0, d + 1)
+    return B.reshape(n_columns, -1).T
+
+
+def _kronecker_matvec_symbolic(factors: Sequence[np.ndarray], b: ca.MX) -> ca.MX:
+    """
+    Returns the product of the Kronecker product of the factors with the symbolic column vector b without forming the
+    Kronecker product (see _kronecker_matvec)
+
+    Every step multiplies the factor along the leading dimension of b and moves this dimension to the end, so that
+    after all factors the dimensions are in their original order again.
+
+    :param factors:
+    :param b:
+    :return:
+    """
+    n = b.numel()
+    for factor in factors:
+        n_d = factor.shape[1]
+        b = ca.vec(ca.mtimes(ca.reshape(b, n // n_d, n_d), factor.T).T)
+    return b
+
+
+class MultiOutputGaussianProcess(GaussianProcess):
+    """
+    Gaussian Process Regression for multiple labels with independent outputs sharing the kernel
+
+    All outputs share the mean function, the kernel and the noise variance, and therefore the covariance matrix of the
+    training data. It is factorized only once for all outputs, i.e. the log marginal likelihood (the sum of the log
+    marginal likelihoods of the outputs) and the predictions cost about as much as for a single GP, whereas a
+    :class:`GPArray` factorizes one covariance matrix per output. Since the posterior variance doesn't depend on the
+    targets, it is the same for all outputs.
+
+    :Note: Only exact inference with a Gaussian likelihood and the NumPy backend are supported.
+
+    :param features: names of the features
+    :type features: list of strings
+    :param labels: names of the labels
+    :type labels: list of strings
+    :param kwargs: The keyword arguments of :class:`GaussianProcess` are supported, except for the backend, which is
+        always 'numpy'
+    """
+    _multi_output = True
+
+    def __init__(self, features: Union[str, list[str]], labels: Union[str, list[str]], **kwargs) -> None:
+        """Constructor method"""
+        backend = kwargs.get('backend')
+        if backend is not None and backend.lower() != 'numpy':
+            raise ValueError("The multi-output GP is only available with the NumPy backend")
+        kwargs['backend'] = 'numpy'
+        super().__init__(features, labels, **kwargs)
+        if not isinstance(self.inference, ExactInference):
+            raise ValueError("The multi-output GP is only available for exact inference")
+
+    def __str__(self) -> str:
+        """String representation method"""
+        return super().__str__().replace("Gaussian process", "Multi-output Gaussian process", 1)
+
+    def _get_residuals(self, X: np.ndarray, y: np.ndarray, w: np.ndarray, p: np.ndarray) -> np.ndarray:
+        """
+        Returns the difference between the targets and the prior mean at the training observations with one column
+        per output
+
+        :param X:
+        :param y:
+        :param w:
+        :param p:
+        :return:
+        """
+        mean = self._numeric_functions['vectorized_mean'](X, w, p)[0]
+        return (y - mean).T
+
+    def predict(self, X_query: Array, noise_free: bool = False) -> (Array, Array):
+        """
+
+        :param X_query:
+        :param noise_free:
+        :return:
+        """
+        mean, var = super().predict(X_query, noise_free=noise_free)
+        if isinstance(var, np.ndarray):
+            var = np.repeat(var, self._n_labels, axis=0)
+        else:
+            var = ca.repmat(var, self._n_labels, 1)
+        return mean, var
+
+
 class GPArray:
     """"""
     def __init__(self, n_gps: int) -> None:
@@ -1037,5 +3057,6 @@ class GPArray:
 
 __all__ = [
     'GaussianProcess',
+    'MultiOutputGaussianProcess',
     'GPArray'
 ]
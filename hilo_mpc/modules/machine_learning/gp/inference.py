@@ -22,7 +22,7 @@
 #
 
 from abc import ABCMeta, abstractmethod
-from typing import Dict, Optional, TypeVar, Union
+from typing import Dict, List, Optional, TypeVar, Union
 import warnings
 
 import casadi as ca
@@ -31,6 +31,7 @@ import numpy as np
 from .likelihood import Likelihood
 from .mean import Mean
 from .kernel import Kernel
+from ....util.machine_learning import Parameter, Hyperparameter
 
 
 Numeric = Union[int, float]
@@ -39,6 +40,7 @@ Array = TypeVar('Array', ca.SX, ca.MX, np.ndarray)
 Lik = TypeVar('Lik', bound=Likelihood)
 Mu = TypeVar('Mu', bound=Mean)
 Cov = TypeVar('Cov', bound=Kernel)
+Param = TypeVar('Param', bound=Parameter)
 
 
 class Inference(metaclass=ABCMeta):
@@ -102,6 +104,24 @@ class Inference(metaclass=ABCMeta):
         """
         return self._posterior
 
+    @property
+    def hyperparameters(self) -> List[Param]:
+        """
+        List of all hyperparameters of the inference method, which are optimized together with the hyperparameters of
+        the mean function and the kernel
+
+        :return:
+        """
+        return []
+
+    @property
+    def hyperparameter_names(self) -> List[str]:
+        """
+
+        :return:
+        """
+        return [parameter.name for parameter in self.hyperparameters]
+
     @abstractmethod
     def get_posterior(
             self,
@@ -134,6 +154,53 @@ class Inference(metaclass=ABCMeta):
         """
         return ExactInference()
 
+    @staticmethod
+    def subset_of_regressors(
+            n_inducing_points: Optional[int] = None,
+            inducing_points: Optional[np.ndarray] = None,
+            fixed: bool = False
+    ):
+        """
+
+        :param n_inducing_points:
+        :param inducing_points:
+        :param fixed:
+        :return:
+        """
+        return SubsetOfRegressors(n_inducing_points=n_inducing_points, inducing_points=inducing_points, fixed=fixed)
+
+    @staticmethod
+    def fully_independent_training_conditional(
+            n_inducing_points: Optional[int] = None,
+            inducing_points: Optional[np.ndarray] = None,
+            fixed: bool = False
+    ):
+        """
+
+        :param n_inducing_points:
+        :param inducing_points:
+        :param fixed:
+        :return:
+        """
+        return FullyIndependentTrainingConditional(n_inducing_points=n_inducing_points,
+                                                   inducing_points=inducing_points, fixed=fixed)
+
+    @staticmethod
+    def variational_free_energy(
+            n_inducing_points: Optional[int] = None,
+            inducing_points: Optional[np.ndarray] = None,
+            fixed: bool = False
+    ):
+        """
+
+        :param n_inducing_points:
+        :param inducing_points:
+        :param fixed:
+        :return:
+        """
+        return VariationalFreeEnergy(n_inducing_points=n_inducing_points, inducing_points=inducing_points,
+                                     fixed=fixed)
+
     @staticmethod
     def laplace():
         """
@@ -221,6 +288,290 @@ class ExactInference(Inference):
         self._posterior['log_marginal_likelihood'] = log_marginal_likelihood
 
 
+class SparseInference(Inference, metaclass=ABCMeta):
+    """
+    Base for sparse approximations of the exact inference with inducing points
+
+    The training observations only enter the posterior through their covariance with M inducing points, such that
+    training and prediction scale with O(n*M^2) instead of O(n^3) for n training observations. The approximations
+    differ in the diagonal correction of the approximate covariance matrix of the training observations
+    (see Quiñonero-Candela and Rasmussen, 2005 and Titsias, 2009). The locations of the inducing points are
+    hyperparameters, which are optimized together with the other hyperparameters of the GP, unless they are fixed.
+
+    :param n_inducing_points: Number of inducing points. If no locations of the inducing points are supplied, they are
+        initialized at evenly spaced observations of the training data. Defaults to 20. Ignored if the locations of
+        the inducing points are supplied.
+    :type n_inducing_points: int, optional
+    :param inducing_points: Initial locations of the inducing points with shape (number of features, number of inducing
+        points)
+    :type inducing_points: numpy.ndarray, optional
+    :param fixed: Whether the locations of the inducing points should be kept constant during training
+    :type fixed: bool
+    """
+    # Jitter that is added to the diagonal of the covariance matrix of the inducing points
+    jitter = 1e-6
+    # Properties of the approximation for its numerical evaluation by the NumPy backend, which mirror the diagonal
+    # correction, the trace term and the predictive variance of the symbolic posterior
+    corrects_diagonal = False
+    has_trace_term = False
+    has_degenerate_variance = False
+
+    def __init__(
+            self,
+            n_inducing_points: Optional[int] = None,
+            inducing_points: Optional[np.ndarray] = None,
+            fixed: bool = False
+    ) -> None:
+        """Constructor method"""
+        super().__init__()
+
+        if n_inducing_points is None:
+            n_inducing_points = 20
+        self._n_inducing_points = n_inducing_points
+        self._n_features = None
+        self._fixed = fixed
+
+        self.inducing_points = None
+        if inducing_points is not None:
+            self.set_inducing_points(inducing_points)
+
+    @property
+    def hyperparameters(self) -> List[Param]:
+        """
+
+        :return:
+        """
+        if self.inducing_points is None:
+            return []
+        return [self.inducing_points]
+
+    @property
+    def n_inducing_points(self) -> int:
+        """
+
+        :return:
+        """
+        return self._n_inducing_points
+
+    def set_inducing_points(self, inducing_points: np.ndarray) -> None:
+        """
+        Sets the locations of the inducing points
+
+        :param inducing_points: locations of the inducing points with shape (number of features, number of inducing
+            points)
+        :return:
+        """
+        inducing_points = np.atleast_2d(inducing_points)
+        self._n_features, self._n_inducing_points = inducing_points.shape
+        self.inducing_points = Hyperparameter('Inference.inducing_points',
+                                              value=inducing_points.flatten(order='F'), positive=False,
+                                              fixed=self._fixed)
+
+    def initialize_inducing_points(self, X: np.ndarray) -> None:
+        """
+        Initializes the locations of the inducing points at evenly spaced observations of the training data, if they
+        were not supplied
+
+        :param X: training data with shape (number of features, number of observations)
+        :return:
+        """
+        if self.inducing_points is not None:
+            return
+        n_observations = X.shape[1]
+        n_inducing_points = min(self._n_inducing_points, n_observations)
+        index = np.round(np.linspace(0, n_observations - 1, n_inducing_points)).astype(int)
+        self.set_inducing_points(X[:, index])
+
+    def get_posterior(
+            self,
+            X: Array,
+            y: Array,
+            x_test: Array,
+            noise_variance: Union[Symbolic, Numeric],
+            likelihood: Lik,
+            mean: Mu,
+            kernel: Cov
+    ) -> None:
+        """
+
+        :param X:
+        :param y:
+        :param x_test:
+        :param noise_variance:
+        :param likelihood:
+        :param mean:
+        :param kernel:
+        :return:
+        """
+        if likelihood.name != "Gaussian":
+            raise ValueError(f"{self.__class__.__name__} inference is only applicable with Gaussian likelihood. Choose a "
+                             f"different inference method in order to use other likelihoods.")
+        if self.inducing_points is None:
+            raise RuntimeError("The inducing points have not been initialized. Please supply the training data to "
+                               "SparseInference.initialize_inducing_points() first.")
+
+        n_observations = X.shape[1]
+        M = self._n_inducing_points
+
+        noise_variance = ca.exp(2 * noise_variance)
+        Z = ca.reshape(self.inducing_points.SX, self._n_features, M)
+
+        # NOTE: CasADi's Cholesky decomposition returns an upper triangular matrix, so we transpose it to get the lower
+        #  triangular matrix L_uu with K_uu = L_uu*L_uu^T
+        K_uu = kernel(Z, Z) + self.jitter * ca.SX.eye(M)
+        L_uu = ca.chol(K_uu).T
+        V = self._forward_substitution(L_uu, kernel(Z, X))  # Q_ff = V^T*V
+        K_ff_diag = kernel.diag(X)
+        Q_ff_diag = ca.sum1(V ** 2)
+
+        Lambda = self._get_diagonal_correction(noise_variance, K_ff_diag, Q_ff_diag)
+
+        # Woodbury identity for (Q_ff + diag(Lambda))^-1 with A = I + V*diag(Lambda)^-1*V^T
+        V_Lambda = V / ca.repmat(Lambda, M, 1)
+        L_A = ca.chol(ca.SX.eye(M) + V_Lambda @ V.T).T
+        y_minus_prior = y - mean(X)
+        c = self._forward_substitution(L_A, V_Lambda @ y_minus_prior.T)
+
+        quadratic_term = ca.sum2(y_minus_prior ** 2 / Lambda) - ca.sumsqr(c)
+        log_determinant = ca.sum2(ca.log(Lambda)) + 2 * ca.sum1(ca.log(ca.diag(L_A)))
+        log_marginal_likelihood = -.5 * quadratic_term - .5 * log_determinant - n_observations / 2 * ca.log(2 * ca.pi)
+        log_marginal_likelihood -= self._get_trace_term(noise_variance, K_ff_diag, Q_ff_diag)
+
+        V_test = self._forward_substitution(L_uu, kernel(Z, x_test))
+        W_test = self._forward_substitution(L_A, V_test)
+        mu = mean(x_test) + W_test.T @ c
+        var = self._get_predictive_variance(kernel.diag(x_test), V_test, W_test)
+
+        self._posterior['mean'] = mu
+        self._posterior['var'] = var
+        self._posterior['log_marginal_likelihood'] = log_marginal_likelihood
+
+    @staticmethod
+    def _forward_substitution(L: Symbolic, B: Symbolic) -> Symbolic:
+        """
+        Solves L*X = B for a lower triangular matrix L
+
+        :param L:
+        :param B:
+        :return:
+        """
+        # NOTE: ca.solve would expand a symbolic QR decomposition of L, whose expression graph is considerably larger
+        #  than that of the forward substitution, since it doesn't exploit the triangular structure of L
+        rows = []
+        for i in range(L.shape[0]):
+            row = B[i, :]
+            if i > 0:
+                row -= L[i, :i] @ ca.vertcat(*rows)
+            rows.append(row / L[i, i])
+        return ca.vertcat(*rows)
+
+    @abstractmethod
+    def _get_diagonal_correction(self, noise_variance: Symbolic, K_ff_diag: Symbolic, Q_ff_diag: Symbolic) -> Symbolic:
+        """
+
+        :param noise_variance:
+        :param K_ff_diag:
+        :param Q_ff_diag:
+        :return:
+        """
+        pass
+
+    def _get_trace_term(self, noise_variance: Symbolic, K_ff_diag: Symbolic, Q_ff_diag: Symbolic) -> Symbolic:
+        """
+
+        :param noise_variance:
+        :param K_ff_diag:
+        :param Q_ff_diag:
+        :return:
+        """
+        return ca.SX(0)
+
+    def _get_predictive_variance(self, K_test_diag: Symbolic, V_test: Symbolic, W_test: Symbolic) -> Symbolic:
+        """
+
+        :param K_test_diag:
+        :param V_test:
+        :param W_test:
+        :return:
+        """
+        return K_test_diag - ca.sum1(V_test ** 2) + ca.sum1(W_test ** 2)
+
+
+class SubsetOfRegressors(SparseInference):
+    """
+    Subset of regressors (SoR) approximation, where the covariance of the training observations is replaced by the
+    Nyström approximation Q_ff = K_fu*K_uu^-1*K_uf. The predictive variance is degenerate, i.e. it vanishes far away
+    from the inducing points.
+    """
+    has_degenerate_variance = True
+
+    def _get_diagonal_correction(self, noise_variance: Symbolic, K_ff_diag: Symbolic, Q_ff_diag: Symbolic) -> Symbolic:
+        """
+
+        :param noise_variance:
+        :param K_ff_diag:
+        :param Q_ff_diag:
+        :return:
+        """
+        return noise_variance * ca.SX.ones(Q_ff_diag.shape)
+
+    def _get_predictive_variance(self, K_test_diag: Symbolic, V_test: Symbolic, W_test: Symbolic) -> Symbolic:
+        """
+
+        :param K_test_diag:
+        :param V_test:
+        :param W_test:
+        :return:
+        """
+        return ca.sum1(W_test ** 2)
+
+
+class FullyIndependentTrainingConditional(SparseInference):
+    """
+    Fully independent training conditional (FITC) approximation, where the diagonal of the Nyström approximation of the
+    covariance of the training observations is corrected to the exact prior variances
+    """
+    corrects_diagonal = True
+
+    def _get_diagonal_correction(self, noise_variance: Symbolic, K_ff_diag: Symbolic, Q_ff_diag: Symbolic) -> Symbolic:
+        """
+
+        :param noise_variance:
+        :param K_ff_diag:
+        :param Q_ff_diag:
+        :return:
+        """
+        return noise_variance + K_ff_diag - Q_ff_diag
+
+
+class VariationalFreeEnergy(SparseInference):
+    """
+    Variational free energy (VFE) approximation (Titsias, 2009), which maximizes a lower bound of the log marginal
+    likelihood. The bound is tightened by moving the inducing points such that the trace of K_ff - Q_ff is minimized.
+    """
+    has_trace_term = True
+
+    def _get_diagonal_correction(self, noise_variance: Symbolic, K_ff_diag: Symbolic, Q_ff_diag: Symbolic) -> Symbolic:
+        """
+
+        :param noise_variance:
+        :param K_ff_diag:
+        :param Q_ff_diag:
+        :return:
+        """
+        return noise_variance * ca.SX.ones(Q_ff_diag.shape)
+
+    def _get_trace_term(self, noise_variance: Symbolic, K_ff_diag: Symbolic, Q_ff_diag: Symbolic) -> Symbolic:
+        """
+
+        :param noise_variance:
+        :param K_ff_diag:
+        :param Q_ff_diag:
+        :return:
+        """
+        return ca.sum2(K_ff_diag - Q_ff_diag) / (2 * noise_variance)
+
+
 class Laplace(Inference):
     """"""
     def __init__(self):
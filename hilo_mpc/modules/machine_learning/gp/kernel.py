@@ -25,12 +25,12 @@ from __future__ import annotations
 
 from abc import ABCMeta, abstractmethod
 import copy
-from itertools import product
 from typing import Dict, List, Optional, Sequence, Tuple, TypeVar, Union
 import warnings
 
 import casadi as ca
 import numpy as np
+from scipy import stats
 from scipy.special import factorial, gamma as gamma_fun
 
 from ....util.machine_learning import Parameter, Hyperparameter
@@ -63,6 +63,13 @@ class Kernel(metaclass=ABCMeta):
     :param active_dims:
     :type active_dims: int, list of int, optional
     """
+    # Maximum number of entries of the intermediate arrays (e.g. the pairwise differences of all active dimensions)
+    # during the evaluation of covariance matrices with NumPy
+    block_size = 2 ** 16
+    # Whether the spectral density can be sampled (see get_spectral_scales), i.e. whether the kernel can be approximated
+    # by random Fourier features
+    has_spectral_density = False
+
     def __init__(self, active_dims: Optional[IntArray] = None):
         """Constructor method"""
         self.active_dims = active_dims
@@ -110,13 +117,14 @@ class Kernel(metaclass=ABCMeta):
                 if isinstance(X_bar, (ca.SX, ca.MX)):
                     raise ValueError("X and X_bar need to have the same type")
 
+            K = self.get_numeric_covariance_matrix(X, X_bar)
+            if K is not None:
+                return K
+
         X, X_bar, X_is_X_bar = _clean_input_matrices(X, X_bar)
 
         dimension_input_space = X.rows()
-        if self.active_dims is None:
-            active_dims = np.arange(dimension_input_space, dtype=np.int_)
-        else:
-            active_dims = np.atleast_1d(np.asarray(self.active_dims, dtype=np.int_))
+        active_dims = self._get_active_dims(dimension_input_space)
         x = ca.SX.sym('x', dimension_input_space, 1)
         x_bar = ca.SX.sym('x_bar', dimension_input_space, 1)
 
@@ -139,6 +147,38 @@ class Kernel(metaclass=ABCMeta):
         else:
             return K.full()
 
+    def diag(self, X: Array) -> Array:
+        """
+        Evaluates only the diagonal of the covariance matrix of X, i.e. the prior variances at the observations in X,
+        without forming the full covariance matrix
+
+        :param X:
+        :return:
+        """
+        is_symbolic = isinstance(X, (ca.SX, ca.MX))
+        if not is_symbolic:
+            X = np.atleast_2d(X)
+
+        dimension_input_space = X.shape[0]
+        active_dims = self._get_active_dims(dimension_input_space)
+        x = ca.SX.sym('x', dimension_input_space, 1)
+        x_bar = ca.SX.sym('x_bar', dimension_input_space, 1)
+
+        covariance_function = self.get_covariance_function(x, x_bar, active_dims)
+
+        if is_symbolic:
+            hyperparameters = {parameter.name: parameter.SX for parameter in self.hyperparameters}
+        else:
+            hyperparameters = {parameter.name: parameter.log / 2. if 'variance' in parameter.name else parameter.log for
+                               parameter in self.hyperparameters}
+
+        K = covariance_function(x=X, x_bar=X, **hyperparameters)['covariance']
+
+        if is_symbolic:
+            return K
+        else:
+            return K.full()
+
     @property
     def hyperparameters(self) -> List[Param]:
         """
@@ -165,6 +205,38 @@ class Kernel(metaclass=ABCMeta):
                 names.append(attribute.name)
         return names
 
+    def _get_active_dims(self, dimension_input_space: int) -> np.ndarray:
+        """
+
+        :param dimension_input_space:
+        :return:
+        """
+        if self.active_dims is None:
+            return np.arange(dimension_input_space, dtype=np.int_)
+        return np.atleast_1d(np.asarray(self.active_dims, dtype=np.int_))
+
+    def _evaluate_numeric(
+            self,
+            X: np.ndarray,
+            X_bar: np.ndarray,
+            hyperparameters: Dict[str, np.ndarray],
+            cache: dict
+    ) -> Optional[np.ndarray]:
+        """
+        Evaluates the covariance matrix of the observations in X and X_bar with NumPy
+
+        Kernels without a NumPy implementation return None and are evaluated with CasADi instead. The cache is shared by
+        all kernels of a composite kernel, so that the pairwise differences, distances and dot products of the
+        observations are only computed once (see _get_differences).
+
+        :param X:
+        :param X_bar:
+        :param hyperparameters: values of the hyperparameters by their names
+        :param cache:
+        :return:
+        """
+        return None
+
     @abstractmethod
     def get_covariance_function(self, x: ca.SX, x_bar: ca.SX, active_dims: np.ndarray) -> ca.Function:
         """
@@ -176,6 +248,91 @@ class Kernel(metaclass=ABCMeta):
         """
         pass
 
+    def get_numeric_covariance_matrix(
+            self,
+            X: Union[np.ndarray, ca.DM],
+            X_bar: Optional[Union[np.ndarray, ca.DM]] = None,
+            hyperparameters: Optional[Dict[str, NumArray]] = None
+    ) -> Optional[np.ndarray]:
+        """
+        Evaluates the covariance matrix of numeric observations with NumPy
+
+        The covariance matrix is evaluated in blocks of rows, such that the intermediate arrays never exceed the block
+        size (see block_size). If the kernel (or one of the kernels of a composite kernel) doesn't support the
+        evaluation with NumPy, None is returned.
+
+        :param X: observations with shape (dimension of the input space, number of observations)
+        :param X_bar: observations with shape (dimension of the input space, number of observations). Defaults to X.
+        :param hyperparameters: values of the hyperparameters by their names. Defaults to the current values of the
+            hyperparameters.
+        :return:
+        """
+        X = np.atleast_2d(X.full() if isinstance(X, ca.DM) else np.asarray(X, dtype=float))
+        if X_bar is None:
+            X_bar = X
+        else:
+            X_bar = np.atleast_2d(X_bar.full() if isinstance(X_bar, ca.DM) else np.asarray(X_bar, dtype=float))
+        if X.shape[0] != X_bar.shape[0]:
+            raise ValueError("X and X_bar do not have the same input space dimensions")
+        if hyperparameters is None:
+            hyperparameters = {parameter.name: parameter.value for parameter in self.hyperparameters}
+        hyperparameters = {name: np.asarray(value, dtype=float).flatten() for name, value in hyperparameters.items()}
+
+        n, m = X.shape[1], X_bar.shape[1]
+        K = np.empty((n, m))
+        n_rows = max(self.block_size // max(m * X.shape[0], 1), 1)
+        for start in range(0, n, n_rows):
+            stop = min(start + n_rows, n)
+            K_block = self._evaluate_numeric(X[:, start:stop], X_bar, hyperparameters, {})
+            if K_block is None:
+                return None
+            K[start:stop, :] = K_block
+
+        return K
+
+    def sample_spectral_density(
+            self,
+            n_samples: int,
+            dimension_input_space: int,
+            rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """
+        Samples frequencies from the spectral density of the kernel with unit length scales and unit signal variance
+
+        By Bochner's theorem the stationary kernel k(x - x_bar) is the expectation of cos(w^T*(x - x_bar)) over the
+        frequencies w, such that it can be approximated by random Fourier features. The frequencies for the actual
+        length scales are obtained by dividing the samples by the length scales.
+
+        :param n_samples: number of frequencies
+        :param dimension_input_space: dimension of the input space
+        :param rng: random number generator
+        :return: frequencies with shape (number of frequencies, number of active dimensions)
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        scales = self.get_spectral_scales(rng.uniform(size=n_samples))
+        return rng.standard_normal((n_samples, self._get_active_dims(dimension_input_space).size)) * scales[:, None]
+
+    def get_spectral_scales(
+            self,
+            quantiles: np.ndarray,
+            hyperparameters: Optional[Dict[str, np.ndarray]] = None
+    ) -> np.ndarray:
+        """
+        Returns the scales of the frequencies of the spectral density at the supplied quantiles
+
+        The spectral densities of the supported kernels (with unit length scales and unit signal variance) are scale
+        mixtures of the standard normal distribution, i.e. the frequencies are given by s*z with z ~ N(0, I). The
+        scales s are obtained from the quantiles of their distribution, so that frequencies with fixed quantiles and
+        fixed z depend smoothly on the hyperparameters of the kernel (see GaussianProcess).
+
+        :param quantiles: quantiles of the distribution of the scales in [0, 1)
+        :param hyperparameters: values of the hyperparameters by their names. Defaults to the current values of the
+            hyperparameters.
+        :return:
+        """
+        raise TypeError(f"Random Fourier features are not available for the kernel {type(self).__name__}")
+
     def get_covariance_matrix(self, covariance_function: ca.Function, X: ca.SX, X_bar: ca.SX) -> ca.Function:
         """
 
@@ -190,9 +347,14 @@ class Kernel(metaclass=ABCMeta):
         hyperparameter_symbols = {hyperparameter.name: hyperparameter.SX for hyperparameter in self.hyperparameters}
         hyperparameter_names = [hyperparameter.name for hyperparameter in self.hyperparameters]
 
-        # TODO: Could maybe be faster with map?
-        for i, j in product(range(observations_in_X), range(observations_in_X_bar)):
-            K[i, j] = covariance_function(x=X[:, i], x_bar=X_bar[:, j], **hyperparameter_symbols)['covariance']
+        # NOTE: The covariance function is evaluated for all observations in X_bar at once (CasADi maps the function
+        #  over the columns of X_bar), so only one call per row of the covariance matrix is necessary
+        if observations_in_X <= observations_in_X_bar:
+            for i in range(observations_in_X):
+                K[i, :] = covariance_function(x=X[:, i], x_bar=X_bar, **hyperparameter_symbols)['covariance']
+        else:
+            for j in range(observations_in_X_bar):
+                K[:, j] = covariance_function(x=X, x_bar=X_bar[:, j], **hyperparameter_symbols)['covariance'].T
 
         covariance_matrix = ca.Function(
             'K',
@@ -462,6 +624,24 @@ class ConstantKernel(Kernel):
                     hyper_kwargs['bounds'] = bias_bounds
         self.bias = Hyperparameter(f'{self.acronym}.bias', value=bias, **hyper_kwargs)
 
+    def _evaluate_numeric(
+            self,
+            X: np.ndarray,
+            X_bar: np.ndarray,
+            hyperparameters: Dict[str, np.ndarray],
+            cache: dict
+    ) -> Optional[np.ndarray]:
+        """
+
+        :param X:
+        :param X_bar:
+        :param hyperparameters:
+        :param cache:
+        :return:
+        """
+        bias = float(hyperparameters[self.bias.name])
+        return np.full((X.shape[1], X_bar.shape[1]), bias ** 2)
+
     def get_covariance_function(self, x: ca.SX, x_bar: ca.SX, active_dims: np.ndarray) -> ca.Function:
         """
         Covariance function of constant as follows:
@@ -554,6 +734,31 @@ class StationaryKernel(Kernel, metaclass=ABCMeta):
             raise ValueError("Length scales vector dimension does not equal input space dimension.")
         return M
 
+    def get_numeric_distance_squared(
+            self,
+            X: np.ndarray,
+            X_bar: np.ndarray,
+            hyperparameters: Dict[str, np.ndarray],
+            cache: dict
+    ) -> np.ndarray:
+        """
+        Evaluates the squared distances of the observations in X and X_bar scaled by the length scales with NumPy
+
+        :param X:
+        :param X_bar:
+        :param hyperparameters:
+        :param cache:
+        :return:
+        """
+        active_dims = self._get_active_dims(X.shape[0])
+        length_scales = hyperparameters[self.length_scales.name]
+        if length_scales.size == 1:
+            return _get_squared_distances(X, X_bar, active_dims, cache) / length_scales[0] ** 2
+        elif length_scales.size == active_dims.size:
+            return np.tensordot(length_scales ** -2, _get_squared_differences(X, X_bar, active_dims, cache), axes=1)
+        else:
+            raise ValueError("Length scales vector dimension does not equal input space dimension.")
+
     def is_isotropic(self) -> bool:
         """
 
@@ -647,6 +852,40 @@ class GammaExponentialKernel(StationaryKernel):
         else:
             self.alpha = 1.
 
+    def _evaluate_numeric(
+            self,
+            X: np.ndarray,
+            X_bar: np.ndarray,
+            hyperparameters: Dict[str, np.ndarray],
+            cache: dict
+    ) -> Optional[np.ndarray]:
+        """
+
+        :param X:
+        :param X_bar:
+        :param hyperparameters:
+        :param cache:
+        :return:
+        """
+        variance = float(hyperparameters[self.signal_variance.name])
+
+        # NOTE: The exponent is computed in float64 like in the CasADi covariance function, i.e. gamma = 1 results in
+        #  an infinite exponent instead of a ZeroDivisionError
+        gamma = self.gamma
+        with np.errstate(divide='ignore'):
+            if isinstance(gamma, Parameter):
+                gamma = np.float64(float(hyperparameters[gamma.name]))
+            else:
+                gamma = np.float64(gamma) / (2 - gamma)
+            p = 2 / (1 - 1 / gamma)
+
+        alpha = self.alpha
+        if isinstance(alpha, Parameter):
+            alpha = float(hyperparameters[alpha.name])
+
+        d2 = self.get_numeric_distance_squared(X, X_bar, hyperparameters, cache)
+        return variance * np.exp(-alpha * d2 ** (p / 2))
+
     def get_covariance_function(self, x: ca.SX, x_bar: ca.SX, active_dims: np.ndarray) -> ca.Function:
         """
         Covariance function of gamma exponential as follows:
@@ -717,6 +956,7 @@ class SquaredExponentialKernel(GammaExponentialKernel):
     :type bounds:
     """
     acronym = "SE"
+    has_spectral_density = True
 
     def __init__(
             self,
@@ -733,6 +973,21 @@ class SquaredExponentialKernel(GammaExponentialKernel):
         self.gamma = 2.
         self.alpha = .5
 
+    def get_spectral_scales(
+            self,
+            quantiles: np.ndarray,
+            hyperparameters: Optional[Dict[str, np.ndarray]] = None
+    ) -> np.ndarray:
+        """
+        Returns the scales of the frequencies of the spectral density at the supplied quantiles, which are all 1, since
+        the spectral density is the standard normal distribution
+
+        :param quantiles: quantiles of the distribution of the scales in [0, 1)
+        :param hyperparameters: values of the hyperparameters by their names
+        :return:
+        """
+        return np.ones(np.shape(quantiles))
+
 
 class MaternKernel(StationaryKernel):
     """
@@ -752,6 +1007,7 @@ class MaternKernel(StationaryKernel):
     :type bounds:
     """
     acronym = "Matern"
+    has_spectral_density = True
 
     def __init__(
             self,
@@ -780,22 +1036,15 @@ class MaternKernel(StationaryKernel):
 
         self._p = p
 
-    def get_covariance_function(self, x: ca.SX, x_bar: ca.SX, active_dims: np.ndarray) -> ca.Function:
+    def _get_polynomial(self, d2: Union[ca.SX, np.ndarray]) -> (Union[ca.SX, np.ndarray], Union[ca.SX, np.ndarray]):
         """
+        Returns the scaled distance d and the polynomial f(d) of the Matérn covariance function sigma^2*exp(-d)*f(d)
 
-        :param x:
-        :param x_bar:
-        :param active_dims:
+        :param d2: squared distance scaled by the length scales
         :return:
         """
         nu = self._p + .5
 
-        log_std = self.signal_variance.SX
-        log_length_scales = self.length_scales.SX
-
-        M = self.get_parameterized_length_scales(active_dims.size, log_length_scales)
-        d2 = _mahalanobis_distance_squared(x[active_dims], x_bar[active_dims], M(log_length_scales))
-
         if self._p > 1:
             gamma_p_plus_1 = gamma_fun(self._p + 1)
             gamma_2p_plus_1 = gamma_fun(2 * self._p + 1)
@@ -810,11 +1059,66 @@ class MaternKernel(StationaryKernel):
         for k in range(len(poly1d) - 1, 0, -1):
             poly1d[k - 1] /= poly1d[k]
 
-        d = ca.sqrt(2 * nu * d2)
+        d = ca.sqrt(2 * nu * d2) if isinstance(d2, ca.SX) else np.sqrt(2 * nu * d2)
         f = 1. + d * poly1d[0]
         for k in range(1, len(poly1d)):
             f = 1. + d * poly1d[k] * f
 
+        return d, f
+
+    def _evaluate_numeric(
+            self,
+            X: np.ndarray,
+            X_bar: np.ndarray,
+            hyperparameters: Dict[str, np.ndarray],
+            cache: dict
+    ) -> Optional[np.ndarray]:
+        """
+
+        :param X:
+        :param X_bar:
+        :param hyperparameters:
+        :param cache:
+        :return:
+        """
+        variance = float(hyperparameters[self.signal_variance.name])
+        d, f = self._get_polynomial(self.get_numeric_distance_squared(X, X_bar, hyperparameters, cache))
+        return variance * np.exp(-d) * f
+
+    def get_spectral_scales(
+            self,
+            quantiles: np.ndarray,
+            hyperparameters: Optional[Dict[str, np.ndarray]] = None
+    ) -> np.ndarray:
+        """
+        Returns the scales of the frequencies of the spectral density at the supplied quantiles
+
+        The spectral density is the multivariate Student's t-distribution with 2*nu degrees of freedom, whose scales
+        are given by sqrt(2*nu/c) with c following a chi-squared distribution with 2*nu degrees of freedom.
+
+        :param quantiles: quantiles of the distribution of the scales in [0, 1)
+        :param hyperparameters: values of the hyperparameters by their names
+        :return:
+        """
+        degrees_of_freedom = 2 * self._p + 1
+        # The upper quantiles of c correspond to the lower quantiles of the scales
+        return np.sqrt(degrees_of_freedom / stats.chi2.isf(quantiles, degrees_of_freedom))
+
+    def get_covariance_function(self, x: ca.SX, x_bar: ca.SX, active_dims: np.ndarray) -> ca.Function:
+        """
+
+        :param x:
+        :param x_bar:
+        :param active_dims:
+        :return:
+        """
+        log_std = self.signal_variance.SX
+        log_length_scales = self.length_scales.SX
+
+        M = self.get_parameterized_length_scales(active_dims.size, log_length_scales)
+        d2 = _mahalanobis_distance_squared(x[active_dims], x_bar[active_dims], M(log_length_scales))
+        d, f = self._get_polynomial(d2)
+
         covariance_function = ca.Function(
             'covariance',
             [x, x_bar, log_std, log_length_scales],
@@ -934,6 +1238,7 @@ class RationalQuadraticKernel(StationaryKernel):
     :type bounds:
     """
     acronym = "RQ"
+    has_spectral_density = True
 
     def __init__(
             self,
@@ -969,6 +1274,49 @@ class RationalQuadraticKernel(StationaryKernel):
                 hyper_kwargs['bounds'] = alpha_bounds
         self.alpha = Hyperparameter(f'{self.acronym}.alpha', value=alpha, **hyper_kwargs)
 
+    def _evaluate_numeric(
+            self,
+            X: np.ndarray,
+            X_bar: np.ndarray,
+            hyperparameters: Dict[str, np.ndarray],
+            cache: dict
+    ) -> Optional[np.ndarray]:
+        """
+
+        :param X:
+        :param X_bar:
+        :param hyperparameters:
+        :param cache:
+        :return:
+        """
+        variance = float(hyperparameters[self.signal_variance.name])
+        alpha = float(hyperparameters[self.alpha.name])
+        d2 = self.get_numeric_distance_squared(X, X_bar, hyperparameters, cache)
+        return variance * (1 + .5 * d2 / alpha) ** -alpha
+
+    def get_spectral_scales(
+            self,
+            quantiles: np.ndarray,
+            hyperparameters: Optional[Dict[str, np.ndarray]] = None
+    ) -> np.ndarray:
+        """
+        Returns the scales of the frequencies of the spectral density at the supplied quantiles
+
+        The rational quadratic kernel is a scale mixture of squared exponential kernels, whose inverse squared length
+        scales follow a gamma distribution with shape alpha and rate alpha. The frequencies are therefore normally
+        distributed with variances following this gamma distribution.
+
+        :param quantiles: quantiles of the distribution of the scales in [0, 1)
+        :param hyperparameters: values of the hyperparameters by their names. Defaults to the current values of the
+            hyperparameters.
+        :return:
+        """
+        if hyperparameters is None:
+            alpha = float(self.alpha.value)
+        else:
+            alpha = float(hyperparameters[self.alpha.name])
+        return np.sqrt(stats.gamma.ppf(quantiles, alpha, scale=1 / alpha))
+
     def get_covariance_function(self, x: ca.SX, x_bar: ca.SX, active_dims: np.ndarray) -> ca.Function:
         """
         Covariance function of rational quadratic as follows:
@@ -1066,23 +1414,22 @@ class PiecewisePolynomialKernel(StationaryKernel):
             raise ValueError("The property 'degree' has to be one of the following integers: 0, 1, 2, 3")
         self._q = value
 
-    def get_covariance_function(self, x: ca.SX, x_bar: ca.SX, active_dims: np.ndarray) -> ca.Function:
+    def _get_polynomial(
+            self,
+            d2: Union[ca.SX, np.ndarray],
+            dimension: int
+    ) -> (Union[ca.SX, np.ndarray], Union[ca.SX, np.ndarray], float):
         """
+        Returns the scaled distance d, the polynomial f(d) and the exponent j of the piecewise polynomial covariance
+        function
 
-        :param x:
-        :param x_bar:
-        :param active_dims:
+        :param d2: squared distance scaled by the length scales
+        :param dimension: number of active dimensions
         :return:
         """
         q = self._q
-        j = ca.floor(active_dims.size / 2) + q + 1
-
-        log_std = self.signal_variance.SX
-        log_length_scales = self.length_scales.SX
-
-        M = self.get_parameterized_length_scales(active_dims.size, log_length_scales)
-        d2 = _mahalanobis_distance_squared(x[active_dims], x_bar[active_dims], M(log_length_scales))
-        d = ca.sqrt(d2)
+        j = np.floor(dimension / 2) + q + 1
+        d = ca.sqrt(d2) if isinstance(d2, ca.SX) else np.sqrt(d2)
 
         if q == 0:
             f = 1.
@@ -1096,7 +1443,44 @@ class PiecewisePolynomialKernel(StationaryKernel):
         else:
             raise RuntimeError("The parameter 'q' has to be one of the following integers: 0, 1, 2, 3")
 
-        compact_support = (d < 1.) * ca.fmax(1. - d, 0.) ** (j + q)
+        return d, f, j
+
+    def _evaluate_numeric(
+            self,
+            X: np.ndarray,
+            X_bar: np.ndarray,
+            hyperparameters: Dict[str, np.ndarray],
+            cache: dict
+    ) -> Optional[np.ndarray]:
+        """
+
+        :param X:
+        :param X_bar:
+        :param hyperparameters:
+        :param cache:
+        :return:
+        """
+        variance = float(hyperparameters[self.signal_variance.name])
+        d2 = self.get_numeric_distance_squared(X, X_bar, hyperparameters, cache)
+        d, f, j = self._get_polynomial(d2, self._get_active_dims(X.shape[0]).size)
+        return variance * np.maximum(1. - d, 0.) ** (j + self._q) * f
+
+    def get_covariance_function(self, x: ca.SX, x_bar: ca.SX, active_dims: np.ndarray) -> ca.Function:
+        """
+
+        :param x:
+        :param x_bar:
+        :param active_dims:
+        :return:
+        """
+        log_std = self.signal_variance.SX
+        log_length_scales = self.length_scales.SX
+
+        M = self.get_parameterized_length_scales(active_dims.size, log_length_scales)
+        d2 = _mahalanobis_distance_squared(x[active_dims], x_bar[active_dims], M(log_length_scales))
+        d, f, j = self._get_polynomial(d2, active_dims.size)
+
+        compact_support = (d < 1.) * ca.fmax(1. - d, 0.) ** (j + self._q)
 
         covariance_function = ca.Function(
             'covariance',
@@ -1199,6 +1583,30 @@ class PolynomialKernel(DotProductKernel):
     def degree(self, value: int) -> None:
         self._p = value
 
+    def _evaluate_numeric(
+            self,
+            X: np.ndarray,
+            X_bar: np.ndarray,
+            hyperparameters: Dict[str, np.ndarray],
+            cache: dict
+    ) -> Optional[np.ndarray]:
+        """
+
+        :param X:
+        :param X_bar:
+        :param hyperparameters:
+        :param cache:
+        :return:
+        """
+        variance = float(hyperparameters[self.signal_variance.name])
+
+        offset = self.offset
+        if isinstance(offset, Parameter):
+            offset = float(hyperparameters[offset.name])
+
+        dot_products = _get_dot_products(X, X_bar, self._get_active_dims(X.shape[0]), cache)
+        return variance * (dot_products + offset) ** self._p
+
     def get_covariance_function(self, x: ca.SX, x_bar: ca.SX, active_dims: np.ndarray) -> ca.Function:
         """
         Covariance function of polynomial as follows:
@@ -1306,6 +1714,30 @@ class NeuralNetworkKernel(Kernel):
                 hyper_kwargs['bounds'] = weight_variance_bounds
         self.weight_variance = Hyperparameter(f'{self.acronym}.weight_variance', value=weight_variance, **hyper_kwargs)
 
+    def _evaluate_numeric(
+            self,
+            X: np.ndarray,
+            X_bar: np.ndarray,
+            hyperparameters: Dict[str, np.ndarray],
+            cache: dict
+    ) -> Optional[np.ndarray]:
+        """
+
+        :param X:
+        :param X_bar:
+        :param hyperparameters:
+        :param cache:
+        :return:
+        """
+        variance = float(hyperparameters[self.signal_variance.name])
+        weight = float(hyperparameters[self.weight_variance.name])
+
+        active_dims = self._get_active_dims(X.shape[0])
+        dot_products = _get_dot_products(X, X_bar, active_dims, cache)
+        den1 = np.sqrt(weight + 1. + np.sum(X[active_dims] ** 2, axis=0))
+        den2 = np.sqrt(weight + 1. + np.sum(X_bar[active_dims] ** 2, axis=0))
+        return variance * np.arcsin((1. + dot_products) / np.outer(den1, den2))
+
     def get_covariance_function(self, x: ca.SX, x_bar: ca.SX, active_dims: np.ndarray) -> ca.Function:
         """
 
@@ -1391,6 +1823,29 @@ class PeriodicKernel(Kernel):
                 hyper_kwargs['bounds'] = period_bounds
         self.period = Hyperparameter(f'{self.acronym}.period', value=period, **hyper_kwargs)
 
+    def _evaluate_numeric(
+            self,
+            X: np.ndarray,
+            X_bar: np.ndarray,
+            hyperparameters: Dict[str, np.ndarray],
+            cache: dict
+    ) -> Optional[np.ndarray]:
+        """
+
+        :param X:
+        :param X_bar:
+        :param hyperparameters:
+        :param cache:
+        :return:
+        """
+        variance = float(hyperparameters[self.signal_variance.name])
+        length_scales = hyperparameters[self.length_scales.name].reshape(-1, 1, 1)
+        period = float(hyperparameters[self.period.name])
+
+        differences = _get_differences(X, X_bar, self._get_active_dims(X.shape[0]), cache)
+        arg = np.sin(np.pi * differences / period) / length_scales
+        return variance * np.exp(-2 * np.sum(arg ** 2, axis=0))
+
     def get_covariance_function(self, x: ca.SX, x_bar: ca.SX, active_dims: np.ndarray) -> ca.Function:
         """
         Covariance function of exponential sine as follows:
@@ -1568,6 +2023,27 @@ class Sum(KernelOperator):
     :param kernel_2:
     :type kernel_2:
     """
+    def _evaluate_numeric(
+            self,
+            X: np.ndarray,
+            X_bar: np.ndarray,
+            hyperparameters: Dict[str, np.ndarray],
+            cache: dict
+    ) -> Optional[np.ndarray]:
+        """
+
+        :param X:
+        :param X_bar:
+        :param hyperparameters:
+        :param cache:
+        :return:
+        """
+        K_1 = self.kernel_1._evaluate_numeric(X, X_bar, hyperparameters, cache)
+        K_2 = self.kernel_2._evaluate_numeric(X, X_bar, hyperparameters, cache)
+        if K_1 is None or K_2 is None:
+            return None
+        return K_1 + K_2
+
     def get_covariance_function(self, x: ca.SX, x_bar: ca.SX, active_dims: np.ndarray) -> ca.Function:
         """
 
@@ -1602,6 +2078,27 @@ class Product(KernelOperator):
     :param kernel_2:
     :type kernel_2:
     """
+    def _evaluate_numeric(
+            self,
+            X: np.ndarray,
+            X_bar: np.ndarray,
+            hyperparameters: Dict[str, np.ndarray],
+            cache: dict
+    ) -> Optional[np.ndarray]:
+        """
+
+        :param X:
+        :param X_bar:
+        :param hyperparameters:
+        :param cache:
+        :return:
+        """
+        K_1 = self.kernel_1._evaluate_numeric(X, X_bar, hyperparameters, cache)
+        K_2 = self.kernel_2._evaluate_numeric(X, X_bar, hyperparameters, cache)
+        if K_1 is None or K_2 is None:
+            return None
+        return K_1 * K_2
+
     def get_covariance_function(self, x: ca.SX, x_bar: ca.SX, active_dims: np.ndarray) -> ca.Function:
         """
 
@@ -1641,6 +2138,26 @@ class Power(KernelOperator):
 
         self.power = power
 
+    def _evaluate_numeric(
+            self,
+            X: np.ndarray,
+            X_bar: np.ndarray,
+            hyperparameters: Dict[str, np.ndarray],
+            cache: dict
+    ) -> Optional[np.ndarray]:
+        """
+
+        :param X:
+        :param X_bar:
+        :param hyperparameters:
+        :param cache:
+        :return:
+        """
+        K = self.kernel_1._evaluate_numeric(X, X_bar, hyperparameters, cache)
+        if K is None:
+            return None
+        return K ** self.power
+
     def get_covariance_function(self, x: ca.SX, x_bar: ca.SX, active_dims: np.ndarray) -> ca.Function:
         """
 
@@ -1649,7 +2166,7 @@ class Power(KernelOperator):
         :param active_dims:
         :return:
         """
-        K = self.kernel_1(x)
+        K = self.kernel_1(x, x_bar)
         power = self.power
 
         hyperparameters = [parameter.SX for parameter in self.hyperparameters]
@@ -1697,6 +2214,77 @@ def _clean_input_matrices(X: Array, X_bar: Optional[Array] = None) -> (ca.SX, ca
     return X, X_bar, X_is_X_bar
 
 
+def _get_differences(X: np.ndarray, X_bar: np.ndarray, active_dims: np.ndarray, cache: dict) -> np.ndarray:
+    """
+    Returns the pairwise differences of the observations in X and X_bar for the active dimensions with shape (number of
+    active dimensions, number of observations in X, number of observations in X_bar)
+
+    The pairwise quantities are stored in the cache, so that they are only computed once for all kernels of a composite
+    kernel that share the same active dimensions.
+
+    :param X:
+    :param X_bar:
+    :param active_dims:
+    :param cache:
+    :return:
+    """
+    key = ('differences', tuple(active_dims))
+    if key not in cache:
+        cache[key] = X[active_dims, :, None] - X_bar[active_dims, None, :]
+    return cache[key]
+
+
+def _get_squared_differences(X: np.ndarray, X_bar: np.ndarray, active_dims: np.ndarray, cache: dict) -> np.ndarray:
+    """
+    Returns the pairwise squared differences of the observations in X and X_bar for the active dimensions (see
+    _get_differences)
+
+    :param X:
+    :param X_bar:
+    :param active_dims:
+    :param cache:
+    :return:
+    """
+    key = ('squared_differences', tuple(active_dims))
+    if key not in cache:
+        cache[key] = _get_differences(X, X_bar, active_dims, cache) ** 2
+    return cache[key]
+
+
+def _get_squared_distances(X: np.ndarray, X_bar: np.ndarray, active_dims: np.ndarray, cache: dict) -> np.ndarray:
+    """
+    Returns the pairwise squared Euclidean distances of the observations in X and X_bar for the active dimensions (see
+    _get_differences)
+
+    :param X:
+    :param X_bar:
+    :param active_dims:
+    :param cache:
+    :return:
+    """
+    key = ('squared_distances', tuple(active_dims))
+    if key not in cache:
+        cache[key] = np.sum(_get_squared_differences(X, X_bar, active_dims, cache), axis=0)
+    return cache[key]
+
+
+def _get_dot_products(X: np.ndarray, X_bar: np.ndarray, active_dims: np.ndarray, cache: dict) -> np.ndarray:
+    """
+    Returns the pairwise dot products of the observations in X and X_bar for the active dimensions (see
+    _get_differences)
+
+    :param X:
+    :param X_bar:
+    :param active_dims:
+    :param cache:
+    :return:
+    """
+    key = ('dot_products', tuple(active_dims))
+    if key not in cache:
+        cache[key] = X[active_dims].T @ X_bar[active_dims]
+    return cache[key]
+
+
 def _mahalanobis_distance_squared(x, y, S):
     """
 
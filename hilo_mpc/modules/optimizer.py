@@ -24,9 +24,11 @@
 from __future__ import annotations
 
 from abc import ABCMeta, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from copy import deepcopy
 from typing import Optional, Sequence, TypeVar, Union
 import warnings
+import weakref
 
 import casadi as ca
 import numpy as np
@@ -336,7 +338,7 @@ class Optimizer(Base, metaclass=ABCMeta):
 
         :return:
         """
-        if 'x' not in self._solution or self._solution.get_by_id('x').is_empty():
+        if 'x' not in self._solution or self._solution.is_empty('x'):
             return None
         return self._solution.get_by_id('x:0')
 
@@ -601,9 +603,12 @@ class Optimizer(Base, metaclass=ABCMeta):
         solver = self._problem.to_solver('solver', interface, options=options)
 
         use_c_code = kwargs.get('c_code', False)
+        cache = kwargs.get('cache')
         if use_c_code:
             gen_path, gen_name, gen_opts = self._generator(**kwargs)
-            if gen_path is not None:
+            if cache is not None and cache is not False:
+                self._setup_from_cache(solver, cache, gen_name, gen_opts=gen_opts)
+            elif gen_path is not None:
                 self._c_name = generate_c_code(solver, gen_path, gen_name, opts=gen_opts)
                 if self._compiler_opts['method'] in JIT and self._compiler_opts['compiler'] == 'shell':
                     self._compiler_opts['path'] = gen_path
@@ -663,7 +668,7 @@ class Optimizer(Base, metaclass=ABCMeta):
                 if x0.is_empty():
                     self.set_initial_guess(x0=0.)
         else:
-            if self._solution.get_by_id('x').is_empty():
+            if self._solution.is_empty('x'):
                 warnings.warn(f"No initial guess supplied. Using 0 as initial guess. Execute "
                               f"{self.__class__.__name__}.set_initial_guess(x0) to set a different initial guess.")
                 self.set_initial_guess(self._n_x * [0.])
@@ -671,7 +676,7 @@ class Optimizer(Base, metaclass=ABCMeta):
         p = kwargs.get('p')
         if p is not None:
             self._solution.add('p', p)
-        elif self._solution.get_by_id('p').is_empty():
+        elif self._solution.is_empty('p'):
             warnings.warn(f"No parameter values supplied. Setting them to 0. Execute "
                           f"{self.__class__.__name__}.set_parameter_values(p) or supply them as a keyword argument to "
                           f"{self.__class__.__name__}.solve(...) to set different parameter values.")
@@ -843,6 +848,49 @@ class NonlinearProgram(Optimizer):
             super().setup(interface=scisol, **kwargs)
 
 
+_worker_solver = None
+
+
+def _initialize_worker(solver):
+    """
+    Stores the solver in the worker process, so that it only needs to be transferred once per worker
+
+    :param solver: solver of the nonlinear program
+    :type solver: casadi.Function
+    :return:
+    """
+    global _worker_solver
+    _worker_solver = solver
+
+
+def _solve_in_worker(args):
+    """
+    Solves the nonlinear program in the worker process
+
+    :param args: arguments of the solver
+    :type args: dict
+    :return: solution and statistics of the solver
+    """
+    sol = _worker_solver(**args)
+    return sol, _worker_solver.stats()
+
+
+def _shutdown_pool(pool):
+    """
+    Shuts down the process pool of the multi-start optimization without waiting for runs that were already started
+
+    :param pool: process pool
+    :type pool: concurrent.futures.ProcessPoolExecutor
+    :return:
+    """
+    # NOTE: ProcessPoolExecutor.shutdown() lets the worker processes finish the tasks they already started, even if it
+    #  doesn't wait for them. Since a running solver cannot be interrupted, the worker processes are terminated.
+    processes = list((getattr(pool, '_processes', None) or {}).values())
+    pool.shutdown(wait=False)
+    for process in processes:
+        process.terminate()
+
+
 class DynamicOptimization(Base):
     """Base class for all MPC and MHE"""
     def __init__(self, model, id=None, name=None, plot_backend=None, stats=False, use_sx=True):
@@ -884,6 +932,12 @@ class DynamicOptimization(Base):
         self.collocation_polynomials_fin_elements = []
         self._nlp_opts = {}
         self._nlp_solution = None
+        self._solver_stats = None
+
+        # Process pool for the multi-start optimization
+        self._multi_start_pool = None
+        self._multi_start_pool_key = None
+        self._multi_start_pool_finalizer = None
 
         # Time varying parameters settings
         self._n_tvp = 0
@@ -926,6 +980,134 @@ class DynamicOptimization(Base):
 
         return p
 
+    @staticmethod
+    def _shift_horizon(vector, blocks):
+        """
+        Shifts the entries of a vector one interval ahead in the horizon. Every block is a list with the indices of
+        one variable for all the intervals of the horizon. The entries of the last interval are kept, i.e. the shifted
+        vector is extrapolated with constant values.
+
+        :param vector: vector to be shifted, e.g. the optimal solution or the multipliers of the last optimization
+        :type vector: casadi.DM
+        :param blocks: list of blocks of indices
+        :type blocks: list
+        :return: shifted vector
+        """
+        shifted = ca.DM(vector)
+        for block in blocks:
+            for k in range(len(block) - 1):
+                shifted[block[k]] = vector[block[k + 1]]
+        return shifted
+
+    @staticmethod
+    def _check_n_jobs(n_jobs):
+        """
+        Checks the value of the option 'n_jobs'. None is treated as 1, i.e. the multi-start optimization runs in the
+        current process.
+
+        :param n_jobs: number of worker processes
+        :type n_jobs: int, optional
+        :return: number of worker processes
+        """
+        if n_jobs is None:
+            return 1
+        if isinstance(n_jobs, bool) or not isinstance(n_jobs, (int, np.integer)):
+            raise TypeError(f"The option n_jobs needs to be a positive integer or None, not {type(n_jobs).__name__}.")
+        if n_jobs < 1:
+            raise ValueError(f"The option n_jobs needs to be a positive integer or None, got {n_jobs}.")
+        return int(n_jobs)
+
+    def _get_multi_start_pool(self, n_jobs):
+        """
+        Returns the process pool for the multi-start optimization. The pool is kept alive between calls, since starting
+        the worker processes and transferring the solver to them is expensive. A new pool is created whenever the solver
+        changed, e.g. after running the setup again, or runs were still running after an early exit of the multi-start
+        optimization (see _multi_start). The pool is shut down by the method close(), or at the latest when this object
+        is garbage collected or the interpreter exits.
+
+        :param n_jobs: number of worker processes
+        :type n_jobs: int
+        :return: process pool
+        """
+        key = (id(self._solver), n_jobs)
+        if self._multi_start_pool is None or self._multi_start_pool_key != key:
+            self.close()
+            pool = ProcessPoolExecutor(max_workers=n_jobs, initializer=_initialize_worker, initargs=(self._solver,))
+            self._multi_start_pool = pool
+            self._multi_start_pool_key = key
+            self._multi_start_pool_finalizer = weakref.finalize(self, _shutdown_pool, pool)
+        return self._multi_start_pool
+
+    def close(self):
+        """
+        Shuts down the worker processes of the multi-start optimization. A new pool of worker processes is started by
+        the next multi-start optimization with the option 'n_jobs' greater than 1.
+
+        :return:
+        """
+        if self._multi_start_pool_finalizer is not None:
+            self._multi_start_pool_finalizer()
+        self._multi_start_pool = None
+        self._multi_start_pool_key = None
+        self._multi_start_pool_finalizer = None
+
+    def _multi_start(self, v0, runs, param, lam0=None, pert_factor=0.1):
+        """
+        Solves the nonlinear program multiple times and returns the solution with the lowest objective value. The first
+        run starts from the initial guess v0, every other run from a random perturbation of it. If the option 'n_jobs'
+        is greater than 1, the runs are distributed over a pool of worker processes. If the option 'multi_start_tol' is
+        set, the remaining runs are skipped as soon as a solution with an objective value below this tolerance was
+        found. Runs that were already started by the worker processes are aborted by replacing the pool, so that they
+        don't delay the next call.
+
+        :param v0: initial guess of the optimal vector
+        :type v0: casadi.DM
+        :param runs: number of optimizations to run
+        :type runs: int
+        :param param: values of the parameters of the nonlinear program
+        :type param: casadi.DM
+        :param lam0: initial guess of the multipliers for the first run
+        :type lam0: dict, optional
+        :param pert_factor: relative magnitude of the random perturbation of the initial guess
+        :type pert_factor: float
+        :return: solution with the lowest objective value
+        """
+        n_jobs = self._nlp_options['n_jobs']
+        tol = self._nlp_options['multi_start_tol']
+
+        args = []
+        for r in range(runs):
+            if r == 0:
+                arg = {'x0': v0}
+                if lam0 is not None:
+                    arg.update(lam0)
+            else:
+                arg = {'x0': v0 + v0 * (1 - 2 * np.random.rand(self._n_v)) * pert_factor}
+            arg.update({'lbx': self._v_lb, 'ubx': self._v_ub, 'lbg': self._g_lb, 'ubg': self._g_ub, 'p': param})
+            args.append(arg)
+
+        best = None
+        if n_jobs > 1 and runs > 1:
+            pool = self._get_multi_start_pool(n_jobs)
+            futures = [pool.submit(_solve_in_worker, arg) for arg in args]
+            results = (future.result() for future in as_completed(futures))
+        else:
+            futures = []
+            results = ((self._solver(**arg), self._solver.stats()) for arg in args)
+
+        for sol, stats in results:
+            if best is None or sol['f'] < best[0]['f']:
+                best = sol, stats
+            if tol is not None and best[0]['f'] <= tol:
+                break
+
+        # NOTE: All pending runs are cancelled, before it is checked whether any of them was already started
+        if not all([future.cancel() or future.done() for future in futures]):
+            self.close()
+
+        sol, self._solver_stats = best
+        return sol
+
     def _print_message(self):
         """
 
@@ -1061,7 +1243,8 @@ class DynamicOptimization(Base):
         """
         # TODO: consider other outputs
         if self._solver_name == 'ipopt':
-            self._solver_status = self._solver.stats()['return_status'].lower()
+            stats = self._solver_stats if self._solver_stats is not None else self._solver.stats()
+            self._solver_status = stats['return_status'].lower()
             if self._solver_status == 'solve_succeeded':
                 self._solver_status_code = 1
             elif self._solver_status == 'solved_to_acceptable_level':
@@ -1371,10 +1554,15 @@ class DynamicOptimization(Base):
         possible_choices['solver'] = self._solver_name_list_nlp
         possible_choices['collocation_points'] = ['radau', 'legendre']
         possible_choices['objective_function'] = ['discrete', 'continuous']
-        possible_choices['warm_start'] = [True, False]
+        possible_choices['warm_start'] = [True, False, 'shift']
         possible_choices['degree'] = None
         possible_choices['print_level'] = [0, 1]
         possible_choices['ipopt_debugger'] = [True, False]
+        possible_choices['parametric_cost'] = [True, False]
+        possible_choices['map_horizon'] = [True, False, 'serial', 'openmp', 'thread']
+        possible_choices['real_time_iteration'] = [True, False]
+        possible_choices['n_jobs'] = None
+        possible_choices['multi_start_tol'] = None
 
         option_list = list(possible_choices.keys())
 
@@ -1385,7 +1573,12 @@ class DynamicOptimization(Base):
             'print_level': 1,
             'warm_start': True,
             'solver': 'ipopt',
-            'ipopt_debugger': False
+            'ipopt_debugger': False,
+            'parametric_cost': False,
+            'map_horizon': False,
+            'real_time_iteration': False,
+            'n_jobs': 1,
+            'multi_start_tol': None
         }
 
         if self._model.discrete:
@@ -1434,6 +1627,8 @@ class DynamicOptimization(Base):
             default_opts['method'] = 'collocation'
             default_opts['category'] = 'runge-kutta'
 
+        default_opts['n_jobs'] = self._check_n_jobs(default_opts['n_jobs'])
+
         if not self._nlp_solver_is_set:
             self.set_nlp_solver(default_opts['solver'])
 
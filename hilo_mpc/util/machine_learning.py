@@ -205,6 +205,11 @@ class Parameter(Object):
         self._value = convert(value, ca.DM)
         self._shape = self._value.shape
 
+        bounds = kwargs.get('bounds')
+        if bounds is None:
+            bounds = (-ca.inf, ca.inf)
+        self._bounds = tuple(bounds)
+
         if prior is not None:
             if not is_list_like(prior):
                 prior = [prior]
@@ -468,6 +473,7 @@ class PositiveParameter(Parameter):
             raise ValueError("Hyperparameters can only take positive values")
 
         self._log = ca.log(self._value)
+        self._log_bounds = (ca.log(self._bounds[0]), ca.log(self._bounds[1]))
 
     def _set_properties(self, value, bounds):
         """
@@ -121,6 +121,30 @@ class QuadraticCost(GenericCost):
         # Store the name of all the varying trajectories for which the trajectory has not yet been provided
         self._open_varying_trajectories_names = []
 
+        # Placeholders for the weight matrices. If the cost is parametric, these will be kept as parameters of the
+        # nonlinear program, otherwise they will be substituted with their values during setup.
+        self._weights_list = []
+        self._is_parametric = False
+        self._is_setup = False
+
+    @property
+    def cost(self):
+        """
+        Cost expression. Unless the cost was set up as parametric, the placeholders of the weight matrices are replaced
+        by their values, so that the cost can also be used outside the MPC (e.g. as quadrature function of a model).
+
+        :return:
+        """
+        cost = self._cost
+        if not self._is_parametric:
+            for weight in self._weights_list:
+                cost = ca.substitute(cost, weight['placeholder'], ca.DM(weight['value']))
+        return cost
+
+    @cost.setter
+    def cost(self, arg):
+        GenericCost.cost.fset(self, arg)
+
     @staticmethod
     def _check_dimensions(var_list, var_weight, var_ref, type):
         """
@@ -228,6 +252,13 @@ class QuadraticCost(GenericCost):
 
         self._check_dimensions(names, W, ref, type)
 
+        if self._use_sx:
+            W_p = ca.SX.sym('_'.join(names) + '_W', *W.shape)
+        else:
+            W_p = ca.MX.sym('_'.join(names) + '_W', *W.shape)
+        self._weights_list.append({'value': W, 'names': names, 'placeholder': W_p, 'type': type})
+        W = W_p
+
         if ref is None and not trajectory_tracking:
             if type == 'inputs_change':
                 if self._use_sx:
@@ -278,7 +309,8 @@ class QuadraticCost(GenericCost):
 
         self._is_set = True
 
-    def _setup(self, x_scale=None, u_scale=None, y_scale=None, path_variables=None, time_variable=None):
+    def _setup(self, x_scale=None, u_scale=None, y_scale=None, path_variables=None, time_variable=None,
+               parametric=False):
         """
 
         :param x_scale:
@@ -286,8 +318,17 @@ class QuadraticCost(GenericCost):
         :param y_scale:
         :param path_variables:
         :param time_variable:
+        :param parametric: If True, weights and references are kept as symbolic parameters that can be updated after
+            the setup, otherwise they are substituted with their values
         :return:
         """
+        self._is_parametric = parametric
+        self._is_setup = True
+
+        for weight in self._weights_list:
+            if not parametric:
+                self._cost = ca.substitute(self._cost, weight['placeholder'], ca.DM(weight['value']))
+
         for i, ref in enumerate(self._references_list):
             # This is for the reference tracking problem. Scale and substitute the real value of the reference.
             ind = ref['ind']
@@ -301,7 +342,10 @@ class QuadraticCost(GenericCost):
             else:
                 raise TypeError(f"Type {type} no available.")
 
-            self._cost = ca.substitute(self._cost, ref['placeholder'], ref['ref'] / ca.DM(scale)[ind])
+            if parametric:
+                self._cost = ca.substitute(self._cost, ref['placeholder'], ref['placeholder'] / ca.DM(scale)[ind])
+            else:
+                self._cost = ca.substitute(self._cost, ref['placeholder'], ref['ref'] / ca.DM(scale)[ind])
 
         for i, traj in enumerate(self._trajectories_list):
             # This is for the trajectory tracking problem. Just scale, the reference will be substituted later.
@@ -336,6 +380,20 @@ class QuadraticCost(GenericCost):
                 if indx not in self._input_change_list:
                     self._ind_input_changes.append(indx)
 
+    def _get_term(self, names, terms, input_change=False):
+        """
+
+        :param names:
+        :param terms:
+        :param input_change:
+        :return:
+        """
+        names = check_and_wrap_to_list(names)
+        for term in terms:
+            if term['names'] == names and (term['type'] == 'inputs_change') == input_change:
+                return term
+        raise ValueError(f"No quadratic cost term was added for the variable(s) {names}")
+
     @staticmethod
     def _transform_reference(ref):
         """
@@ -443,6 +501,79 @@ class QuadraticCost(GenericCost):
         u = self._model._u[ind_u]
         self._add_cost_term(u, names, weights, ref, path_following, trajectory_tracking, ind_u, 'inputs_change')
 
+    def update_weights(self, names, weights, input_change=False):
+        """
+        Updates the weights of a cost term that was previously added. If the cost is already set up, this is only
+        possible if the option 'parametric_cost' was passed to the setup of the MPC.
+
+        :param names: names of the variables of the cost term, in the same order as they were added
+        :param weights: new weights
+        :param input_change: if True, the weights of the input change term of the given inputs are updated
+        :return:
+        """
+        if self._is_setup and not self._is_parametric:
+            raise RuntimeError("The weights were already substituted in the cost function. Pass "
+                               "options={'parametric_cost': True} to the setup of the MPC to update them afterwards.")
+        term = self._get_term(names, self._weights_list, input_change=input_change)
+        W = self._create_weight_matrix(weights, 'weights')
+        if W.shape != term['value'].shape:
+            raise ValueError(f"Dimension mismatch. Expected weights of shape {term['value'].shape}, got {W.shape}.")
+        term['value'] = W
+
+    def update_reference(self, names, ref):
+        """
+        Updates the reference of a set-point tracking cost term that was previously added. If the cost is already set
+        up, this is only possible if the option 'parametric_cost' was passed to the setup of the MPC.
+
+        :param names: names of the variables of the cost term, in the same order as they were added
+        :param ref: new reference values
+        :return:
+        """
+        if self._is_setup and not self._is_parametric:
+            raise RuntimeError("The references were already substituted in the cost function. Pass "
+                               "options={'parametric_cost': True} to the setup of the MPC to update them afterwards.")
+        term = self._get_term(names, self._references_list)
+        ref, _ = self._transform_reference(ref)
+        ref = check_and_wrap_to_list(ref)
+        if len(ref) != len(term['names']):
+            raise ValueError(f"Dimension mismatch. Expected {len(term['names'])} reference values, got {len(ref)}.")
+        term['ref'] = ref
+
+    @property
+    def parameter_placeholder(self):
+        """
+        Placeholders of the weights and references that are parameters of the nonlinear program. Empty if the cost is
+        not parametric.
+
+        :return:
+        """
+        if self._use_sx:
+            placeholder = ca.SX.sym('foo', 0)
+        else:
+            placeholder = ca.MX.sym('foo', 0)
+        if self._is_parametric:
+            for weight in self._weights_list:
+                placeholder = ca.vertcat(placeholder, ca.vec(weight['placeholder']))
+            for ref in self._references_list:
+                placeholder = ca.vertcat(placeholder, ref['placeholder'])
+        return placeholder
+
+    @property
+    def parameter_values(self):
+        """
+        Current values of the weights and references that are parameters of the nonlinear program. Same ordering as
+        :attr:`parameter_placeholder`.
+
+        :return:
+        """
+        values = ca.DM.zeros(0, 1)
+        if self._is_parametric:
+            for weight in self._weights_list:
+                values = ca.vertcat(values, ca.vec(ca.DM(weight['value'])))
+            for ref in self._references_list:
+                values = ca.vertcat(values, ca.DM(ref['ref']))
+        return values
+
     @property
     def n_of_paths(self):
         """
@@ -167,6 +167,20 @@ class Prior(metaclass=ABCMeta):
         """
         return self._name
 
+    def sample(
+            self,
+            size: Optional[Union[int, Sequence[int]]] = None,
+            rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """
+        Draws random samples from the prior
+
+        :param size: shape of the samples
+        :param rng: random number generator. Defaults to a new generator without fixed seed.
+        :return:
+        """
+        raise NotImplementedError(f"Sampling from the {self._name} prior is not supported")
+
     @staticmethod
     def gaussian(
             mean: Optional[Union[Numeric, Sequence[Numeric]]] = None,
@@ -275,6 +289,22 @@ class GaussianPrior(_MeanVariancePrior):
 
         self._pdf = Gaussian()
 
+    def sample(
+            self,
+            size: Optional[Union[int, Sequence[int]]] = None,
+            rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """
+        Draws random samples from the prior
+
+        :param size: shape of the samples
+        :param rng: random number generator. Defaults to a new generator without fixed seed.
+        :return:
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        return rng.normal(self._mean, np.sqrt(self._variance), size=size)
+
 
 class LaplacePrior(_MeanVariancePrior):
     """"""
@@ -288,6 +318,22 @@ class LaplacePrior(_MeanVariancePrior):
 
         self._pdf = Laplace()
 
+    def sample(
+            self,
+            size: Optional[Union[int, Sequence[int]]] = None,
+            rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """
+        Draws random samples from the prior
+
+        :param size: shape of the samples
+        :param rng: random number generator. Defaults to a new generator without fixed seed.
+        :return:
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        return rng.laplace(self._mean, np.sqrt(self._variance / 2.), size=size)
+
 
 class StudentsTPrior(_MeanVariancePrior):
     """"""
@@ -310,6 +356,27 @@ class StudentsTPrior(_MeanVariancePrior):
         """
         return super()._get_parameter_values(), self._nu
 
+    def sample(
+            self,
+            size: Optional[Union[int, Sequence[int]]] = None,
+            rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """
+        Draws random samples from the prior
+
+        :param size: shape of the samples
+        :param rng: random number generator. Defaults to a new generator without fixed seed.
+        :return:
+        """
+        if self._nu <= 2.:
+            raise ValueError(f"Sampling from the {self._name} prior requires nu > 2, since its variance is not finite "
+                             f"otherwise. Got nu = {self._nu}.")
+        if rng is None:
+            rng = np.random.default_rng()
+        # NOTE: The variance of the Student's t-distribution is the squared scale multiplied by nu/(nu - 2)
+        scale = np.sqrt(self._variance * (self._nu - 2.) / self._nu)
+        return self._mean + scale * rng.standard_t(self._nu, size=size)
+
     @property
     def nu(self) -> Optional[Numeric]:
         """
@@ -32,6 +32,7 @@ import casadi as ca
 import numpy as np
 from scipy.sparse import issparse
 from scipy.sparse.linalg import norm as sparse_norm
+from scipy.special import erf
 
 if platform.system() == 'Windows':
     from .windows import get_vcvars, WINDOWS_COMPILERS
@@ -50,6 +51,57 @@ TYPES = {
     ca.DM: ca.DM,
     np.ndarray: np.array
 }
+# NumPy equivalents of the elementary operations of CasADi's SX expressions (see vectorize_sx_function). Operations
+# that are not available in the installed version of CasADi are skipped.
+NUMPY_OPERATIONS = {getattr(ca, 'OP_' + name): operation for name, operation in {
+    'ASSIGN': lambda x: x,
+    'ADD': np.add,
+    'SUB': np.subtract,
+    'MUL': np.multiply,
+    'DIV': np.divide,
+    'NEG': np.negative,
+    'EXP': np.exp,
+    'LOG': np.log,
+    'POW': np.power,
+    'CONSTPOW': np.power,
+    'SQRT': np.sqrt,
+    'SQ': np.square,
+    'TWICE': lambda x: 2. * x,
+    'SIN': np.sin,
+    'COS': np.cos,
+    'TAN': np.tan,
+    'ASIN': np.arcsin,
+    'ACOS': np.arccos,
+    'ATAN': np.arctan,
+    'LT': lambda x, y: (x < y).astype(float),
+    'LE': lambda x, y: (x <= y).astype(float),
+    'EQ': lambda x, y: (x == y).astype(float),
+    'NE': lambda x, y: (x != y).astype(float),
+    'NOT': lambda x: np.logical_not(x).astype(float),
+    'AND': lambda x, y: np.logical_and(x, y).astype(float),
+    'OR': lambda x, y: np.logical_or(x, y).astype(float),
+    'FLOOR': np.floor,
+    'CEIL': np.ceil,
+    'FMOD': np.fmod,
+    'FABS': np.fabs,
+    'SIGN': np.sign,
+    'COPYSIGN': np.copysign,
+    'IF_ELSE_ZERO': lambda c, x: np.where(c, x, 0.),
+    'ERF': erf,
+    'FMIN': np.fmin,
+    'FMAX': np.fmax,
+    'INV': np.reciprocal,
+    'SINH': np.sinh,
+    'COSH': np.cosh,
+    'TANH': np.tanh,
+    'ASINH': np.arcsinh,
+    'ACOSH': np.arccosh,
+    'ATANH': np.arctanh,
+    'ATAN2': np.arctan2,
+    'LOG1P': np.log1p,
+    'EXPM1': np.expm1,
+    'HYPOT': np.hypot
+}.items() if hasattr(ca, 'OP_' + name)}
 
 
 def setup_warning(function: Function) -> Function:
@@ -710,6 +762,85 @@ def scale_vector(vector, scaler):
     return s_vector
 
 
+def vectorize_sx_function(function: ca.Function) -> Callable[..., list]:
+    """
+    Translates a CasADi function consisting of SX expressions into a function that is evaluated with NumPy for many
+    arguments at once. Every input of the returned function is a 2-D array with one column per evaluation (or a
+    vector/scalar that is shared by all evaluations) and every output is a 2-D array with one column per evaluation.
+    The operations of the function are evaluated one after another, each of them for all columns at once. This is
+    efficient for a large number of evaluations, e.g. the propagation of the particles of a particle filter.
+
+    :param function: CasADi function consisting of SX expressions (see casadi.Function.expand)
+    :type function: casadi.Function
+    :return: vectorized function
+    """
+    if not function.is_a('SXFunction'):
+        raise TypeError(f"Only functions consisting of SX expressions can be vectorized, got {function.class_name()}")
+    if function.has_free():
+        raise RuntimeError(f"The function has free variables: {', '.join(function.get_free())}")
+
+    n_in = function.n_in()
+    n_out = function.n_out()
+    shape_in = [function.size_in(k) for k in range(n_in)]
+    rows_in = [function.sparsity_in(k).find() for k in range(n_in)]
+    rows_out = [function.sparsity_out(k).find() for k in range(n_out)]
+    numel_out = [function.numel_out(k) for k in range(n_out)]
+
+    instructions = []
+    for k in range(function.n_instructions()):
+        op = function.instruction_id(k)
+        i = function.instruction_input(k)
+        o = function.instruction_output(k)
+        if op == ca.OP_INPUT:
+            instructions.append((op, (i[0], rows_in[i[0]][i[1]]), o[0]))
+        elif op == ca.OP_OUTPUT:
+            instructions.append((op, i[0], (o[0], rows_out[o[0]][o[1]])))
+        elif op == ca.OP_CONST:
+            instructions.append((op, function.instruction_constant(k), o[0]))
+        elif op in NUMPY_OPERATIONS:
+            instructions.append((NUMPY_OPERATIONS[op], i, o[0]))
+        else:
+            raise NotImplementedError(f"The operation with id {op} is not supported by the vectorized evaluation")
+
+    def vectorized_function(*args):
+        """
+
+        :param args:
+        :return:
+        """
+        if len(args) != n_in:
+            raise TypeError(f"Expected {n_in} arguments, got {len(args)}")
+
+        n = 1
+        values = []
+        for k, arg in enumerate(args):
+            arg = np.asarray(arg, dtype=float)
+            if arg.ndim < 2:
+                arg = np.reshape(arg, (-1, 1))
+            if arg.shape[0] != shape_in[k][0] * shape_in[k][1]:
+                arg = np.reshape(arg, (shape_in[k][0] * shape_in[k][1], -1), order='F')
+            if arg.shape[1] > 1:
+                if n > 1 and arg.shape[1] != n:
+                    raise ValueError(f"Dimension mismatch. Expected {n} evaluations, got {arg.shape[1]}.")
+                n = arg.shape[1]
+            values.append(arg)
+
+        work = [None] * function.sz_w()
+        out = [np.zeros((numel, n)) for numel in numel_out]
+        for op, i, o in instructions:
+            if op == ca.OP_INPUT:
+                work[o] = values[i[0]][i[1]]
+            elif op == ca.OP_OUTPUT:
+                out[o[0]][o[1]] = work[i]
+            elif op == ca.OP_CONST:
+                work[o] = i
+            else:
+                work[o] = op(*[work[j] for j in i])
+        return out
+
+    return vectorized_function
+
+
 def who_am_i() -> str:
     """
 
@@ -27,7 +27,7 @@ setup(
     maintainer_email='',
     url='https://www.ccps.tu-darmstadt.de/research_ccps/hilo_mpc/',
     download_url='https://github.com/hilo-mpc/hilo-mpc/releases',
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
     classifiers=[
         'Development Status :: 5 - Production/Stable',
         'Intended Audience :: Developers',
@@ -759,3 +759,71 @@ class TestTimeVariantSys(unittest.TestCase):
         # p_tot.append(p)
         #
         # show(gridplot(p_tot, ncols=3))
+
+
+class TestShiftedWarmStart(unittest.TestCase):
+    def setUp(self) -> None:
+        """
+
+        :return:
+        """
+        model = Model(plot_backend='bokeh')
+        x = model.set_dynamical_states(['Ca', 'Cb', 'Cc'])
+        model.set_measurements(['P'])
+
+        # Unwrap states
+        Ca = x[0]
+        Cb = x[1]
+        Cc = x[2]
+
+        # Known Parameters
+        k1 = 0.5
+        k_1 = 0.05
+        k2 = 0.2
+        k_2 = 0.01
+        RT = 32.84  # L atm/ (mol)
+
+        dCa = - (k1 * Ca - k_1 * Cb * Cc)
+        dCb = k1 * Ca - k_1 * Cb * Cc - 2 * (k2 * Cb ** 2 - k_2 * Cc)
+        dCc = k1 * Ca - k_1 * Cb * Cc + 1 * (k2 * Cb ** 2 - k_2 * Cc)
+
+        model.set_measurement_equations(RT * (Ca + Cb + Cc))
+        model.set_dynamical_equations([dCa, dCb, dCc])
+        model.setup(dt=0.25)
+
+        self.model = model
+
+    def test_shifted_estimates(self) -> None:
+        """
+
+        :return:
+        """
+        for method in ['multiple_shooting', 'collocation']:
+            with self.subTest(integration_method=method):
+                estimators = []
+                for warm_start in [True, 'shift']:
+                    mhe = MHE(self.model)
+                    mhe.quad_arrival_cost.add_states(weights=[1 / (0.5 ** 2), 1 / (0.5 ** 2), 1 / (0.5 ** 2)],
+                                                     guess=[1, 0, 4])
+                    mhe.quad_stage_cost.add_measurements(weights=[1 / (0.25 ** 2)])
+                    mhe.quad_stage_cost.add_state_noise(weights=[1 / (0.001 ** 2), 1 / (0.001 ** 2), 1 / (0.001 ** 2)])
+                    mhe.set_box_constraints(x_lb=[0, 0, 0])
+                    mhe.horizon = 5
+                    mhe.setup(options={'print_level': 0, 'integration_method': method, 'warm_start': warm_start})
+                    estimators.append(mhe)
+                mhe, shift = estimators
+
+                model = self.model.copy(setup=True)
+                model.set_initial_conditions(x0=[0.5, 0.05, 0])
+                for k in range(10):
+                    model.simulate()
+                    mhe.add_measurements(y_meas=model.solution['y'][:, -2])
+                    shift.add_measurements(y_meas=model.solution['y'][:, -2])
+                    x_est, _ = mhe.estimate()
+                    x_shift, _ = shift.estimate()
+                    if x_est is None:
+                        self.assertIsNone(x_shift)
+                    else:
+                        np.testing.assert_allclose(x_shift, x_est, rtol=1e-4, atol=1e-6)
+
+                self.assertEqual(shift._lam_g0.shape, shift._g_lb.shape)
@@ -1,9 +1,11 @@
-from unittest import TestCase, skip
+import time
+from unittest import TestCase, mock, skip
 
 import casadi as ca
 import numpy as np
 
 from hilo_mpc import NMPC, Model, SimpleControlLoop
+from hilo_mpc.util.modeling import QuadraticCost
 
 
 class TestNMPC(TestCase):
@@ -2906,3 +2908,443 @@ class TestTimeVaryingWeights(TestCase):
         # model.solution.plot()
         #
         # nmpc.solution.to_mat('t', 'x', 'extime', 'niterations', 'solvstatus', file_name='results/test.mat')
+
+
+class TestParametricCost(TestCase):
+    def setUp(self) -> None:
+        model = Model(plot_backend='bokeh')
+        # Constants
+        M = 5.
+        m = 1.
+        l = 1.
+        g = 9.81
+
+        # States
+        x = model.set_dynamical_states(['x', 'v', 'theta', 'omega'])
+        v = x[1]
+        theta = x[2]
+        omega = x[3]
+        # Inputs
+        F = model.set_inputs('F')
+
+        # ODE
+        dx = v
+        dv = 1. / (M + m - m * ca.cos(theta)) * (m * g * ca.sin(theta) - m * l * ca.sin(theta) * omega ** 2 + F)
+        dtheta = omega
+        domega = 1. / l * (dv * ca.cos(theta) + g * ca.sin(theta))
+
+        model.set_equations(ode=[dx, dv, dtheta, domega])
+        model.setup(dt=.1)
+
+        self.model = model
+        self.x0 = [2.5, 0., 0.1, 0.]
+        self.u0 = 0.
+
+    def _get_nmpc(self, weights, ref, soft_weight=None, parametric=True):
+        """
+
+        :param weights:
+        :param ref:
+        :param soft_weight:
+        :param parametric:
+        :return:
+        """
+        nmpc = NMPC(self.model)
+        nmpc.quad_stage_cost.add_states(names=['v', 'theta'], ref=ref, weights=weights)
+        nmpc.quad_stage_cost.add_inputs(names='F', weights=0.1)
+        nmpc.quad_terminal_cost.add_states(names=['v', 'theta'], ref=ref, weights=weights)
+        nmpc.horizon = 10
+        nmpc.set_box_constraints(x_ub=[5, 10, 10, 10], x_lb=[-5, -10, -10, -10])
+        nmpc.set_initial_guess(x_guess=self.x0, u_guess=self.u0)
+        if soft_weight is not None:
+            nmpc.set_stage_constraints(nmpc._model.x[0], lb=[2.4], ub=[2.45], is_soft=True, weight=soft_weight)
+        nmpc.setup(options={'parametric_cost': parametric})
+        return nmpc
+
+    def test_parametric_equals_non_parametric(self) -> None:
+        """
+
+        :return:
+        """
+        u_par = self._get_nmpc([10, 5], [0, 0]).optimize(self.x0)
+        u_non_par = self._get_nmpc([10, 5], [0, 0], parametric=False).optimize(self.x0)
+        np.testing.assert_allclose(u_par, u_non_par, rtol=1e-6, atol=1e-8)
+
+    def test_update_weights_and_references(self) -> None:
+        """
+
+        :return:
+        """
+        nmpc = self._get_nmpc([10, 5], [0, 0])
+        solver = nmpc._solver
+        nmpc.optimize(self.x0)
+
+        nmpc.quad_stage_cost.update_weights(['v', 'theta'], [1, 20])
+        nmpc.quad_stage_cost.update_reference(['v', 'theta'], [0., .05])
+        nmpc.quad_terminal_cost.update_weights(['v', 'theta'], np.diag([1, 20]))
+        nmpc.quad_terminal_cost.update_reference(['v', 'theta'], [0., .05])
+        u_par = nmpc.optimize(self.x0)
+        self.assertIs(nmpc._solver, solver)
+
+        u_non_par = self._get_nmpc([1, 20], [0., .05], parametric=False).optimize(self.x0)
+        np.testing.assert_allclose(u_par, u_non_par, rtol=1e-6, atol=1e-8)
+
+    def test_update_soft_constraint_weight(self) -> None:
+        """
+
+        :return:
+        """
+        nmpc = self._get_nmpc([10, 5], [0, 0], soft_weight=np.diag([10.]))
+        nmpc.optimize(self.x0)
+        nmpc.stage_constraint.weight = np.diag([1000.])
+        u_par = nmpc.optimize(self.x0)
+
+        u_non_par = self._get_nmpc([10, 5], [0, 0], soft_weight=np.diag([1000.]), parametric=False).optimize(self.x0)
+        np.testing.assert_allclose(u_par, u_non_par, rtol=1e-6, atol=1e-8)
+
+    def test_update_non_parametric(self) -> None:
+        """
+
+        :return:
+        """
+        nmpc = self._get_nmpc([10, 5], [0, 0], parametric=False)
+        with self.assertRaises(RuntimeError):
+            nmpc.quad_stage_cost.update_weights(['v', 'theta'], [1, 20])
+        with self.assertRaises(ValueError):
+            self._get_nmpc([10, 5], [0, 0]).quad_stage_cost.update_weights(['x'], [1])
+
+    def test_non_parametric_cost_as_quadrature_function(self) -> None:
+        """
+
+        :return:
+        """
+        # Outside the MPC the quadratic cost is never set up, so the weights need to be substituted by the cost itself
+        model = Model(plot_backend='bokeh')
+        x = model.set_dynamical_states(['x1', 'x2'])
+        u = model.set_inputs('u')
+        model.set_dynamical_equations([x[1], -x[0] + u[0]])
+        cost = QuadraticCost(model)
+        cost.add_states(['x1', 'x2'], [1., 2.])
+        model.set_quadrature_function(cost)
+        model.setup(dt=.1)
+        model.set_initial_conditions(x0=[.5, .2])
+        model.simulate(u=1.)
+
+        model_explicit = Model(plot_backend='bokeh')
+        x = model_explicit.set_dynamical_states(['x1', 'x2'])
+        u = model_explicit.set_inputs('u')
+        model_explicit.set_dynamical_equations([x[1], -x[0] + u[0]])
+        model_explicit.set_quadrature_function(x[0] ** 2 + 2. * x[1] ** 2)
+        model_explicit.setup(dt=.1)
+        model_explicit.set_initial_conditions(x0=[.5, .2])
+        model_explicit.simulate(u=1.)
+
+        np.testing.assert_allclose(model.solution['q'], model_explicit.solution['q'])
+
+
+class TestMapHorizon(TestCase):
+    def setUp(self) -> None:
+        model = Model(plot_backend='bokeh')
+        # Constants
+        M = 5.
+        m = 1.
+        l = 1.
+        g = 9.81
+
+        # States
+        x = model.set_dynamical_states(['x', 'v', 'theta', 'omega'])
+        v = x[1]
+        theta = x[2]
+        omega = x[3]
+        # Inputs
+        F = model.set_inputs('F')
+
+        # ODE
+        dx = v
+        dv = 1. / (M + m - m * ca.cos(theta)) * (m * g * ca.sin(theta) - m * l * ca.sin(theta) * omega ** 2 + F)
+        dtheta = omega
+        domega = 1. / l * (dv * ca.cos(theta) + g * ca.sin(theta))
+
+        model.set_equations(ode=[dx, dv, dtheta, domega])
+        model.setup(dt=.1)
+
+        self.model = model
+        self.x0 = [2.5, 0., 0.1, 0.]
+        self.u0 = 0.
+
+    def _optimize(self, options):
+        """
+
+        :param options:
+        :return:
+        """
+        nmpc = NMPC(self.model)
+        nmpc.quad_stage_cost.add_states(names=['v', 'theta'], ref=[0, 0], weights=[10, 5])
+        nmpc.quad_stage_cost.add_inputs(names='F', weights=0.1)
+        nmpc.quad_terminal_cost.add_states(names=['v', 'theta'], ref=[0, 0], weights=[10, 5])
+        nmpc.prediction_horizon = 20
+        nmpc.control_horizon = 10
+        nmpc.set_box_constraints(x_ub=[5, 10, 10, 10], x_lb=[-5, -10, -10, -10])
+        nmpc.set_initial_guess(x_guess=self.x0, u_guess=self.u0)
+        nmpc.set_stage_constraints(nmpc._model.x[0] + nmpc._model.u[0], lb=[-5], ub=[5])
+        nmpc.setup(options=options)
+        u = nmpc.optimize(self.x0)
+        x_pred, _, _ = nmpc.return_prediction()
+        return u, x_pred
+
+    def test_collocation(self) -> None:
+        """
+
+        :return:
+        """
+        u, x_pred = self._optimize({'integration_method': 'collocation'})
+        u_map, x_pred_map = self._optimize({'integration_method': 'collocation', 'map_horizon': True})
+        np.testing.assert_allclose(u_map, u, rtol=1e-6, atol=1e-8)
+        np.testing.assert_allclose(x_pred_map, x_pred, rtol=1e-6, atol=1e-8)
+
+    def test_rk4_discrete_objective(self) -> None:
+        """
+
+        :return:
+        """
+        u, x_pred = self._optimize({'integration_method': 'rk4', 'objective_function': 'discrete'})
+        u_map, x_pred_map = self._optimize({'integration_method': 'rk4', 'objective_function': 'discrete',
+                                            'map_horizon': 'thread'})
+        np.testing.assert_allclose(u_map, u, rtol=1e-6, atol=1e-8)
+        np.testing.assert_allclose(x_pred_map, x_pred, rtol=1e-6, atol=1e-8)
+
+
+class CartPoleTestCase(TestCase):
+    """Base of the tests of the NMPC options, which are run on the cart-pole model"""
+    def setUp(self) -> None:
+        model = Model(plot_backend='bokeh')
+        # Constants
+        M = 5.
+        m = 1.
+        l = 1.
+        g = 9.81
+
+        # States
+        x = model.set_dynamical_states(['x', 'v', 'theta', 'omega'])
+        v = x[1]
+        theta = x[2]
+        omega = x[3]
+        # Inputs
+        F = model.set_inputs('F')
+
+        # ODE
+        dx = v
+        dv = 1. / (M + m - m * ca.cos(theta)) * (m * g * ca.sin(theta) - m * l * ca.sin(theta) * omega ** 2 + F)
+        dtheta = omega
+        domega = 1. / l * (dv * ca.cos(theta) + g * ca.sin(theta))
+
+        model.set_equations(ode=[dx, dv, dtheta, domega])
+        model.setup(dt=.1)
+
+        self.model = model
+        self.x0 = [2.5, 0., 0.1, 0.]
+        self.u0 = 0.
+
+    def _get_nmpc(self, options):
+        """
+
+        :param options:
+        :return:
+        """
+        nmpc = NMPC(self.model)
+        nmpc.quad_stage_cost.add_states(names=['v', 'theta'], ref=[0, 0], weights=[10, 5])
+        nmpc.quad_stage_cost.add_inputs(names='F', weights=0.1)
+        nmpc.horizon = 20
+        nmpc.set_box_constraints(x_ub=[5, 10, 10, 10], x_lb=[-5, -10, -10, -10], u_ub=[20], u_lb=[-20])
+        nmpc.set_initial_guess(x_guess=self.x0, u_guess=self.u0)
+        nmpc.setup(options=options)
+        return nmpc
+
+
+class TestRealTimeIteration(CartPoleTestCase):
+    def test_closed_loop(self) -> None:
+        """
+
+        :return:
+        """
+        nmpc = self._get_nmpc({})
+        rti = self._get_nmpc({'real_time_iteration': True})
+
+        model = self.model
+        model.set_initial_conditions(x0=self.x0)
+        x0 = self.x0
+        for k in range(8):
+            u = nmpc.optimize(x0)
+            rti.prepare()
+            u_rti = rti.feedback(x0)
+            model.simulate(u=u)
+            x0 = model.solution['x:f']
+
+        # After a few iterations the real-time iteration is tracking the solution of the nonlinear program
+        np.testing.assert_allclose(u_rti, u, rtol=1e-3)
+        self.assertEqual(rti.solution.get_by_id('x').shape, (4, 21))
+        self.assertEqual(rti.n_iterations, 8)
+
+    def test_qp_sparsity(self) -> None:
+        """
+
+        :return:
+        """
+        rti = self._get_nmpc({'real_time_iteration': True})
+        rti.prepare()
+
+        # The Hessian passed to the QP solver has exactly the sparsity the QP was declared with
+        H = rti._rti_qp['h']
+        self.assertEqual(H.sparsity(), rti._rti_solver.sparsity_in('h'))
+        self.assertEqual(H.sparsity(), rti._rti_linearization.sparsity_out('H'))
+        self.assertTrue(ca.Sparsity.diag(H.shape[0]).is_subset(H.sparsity()))
+
+    def test_wrong_usage(self) -> None:
+        """
+
+        :return:
+        """
+        with self.assertRaises(RuntimeError):
+            self._get_nmpc({}).prepare()
+        with self.assertRaises(RuntimeError):
+            self._get_nmpc({'real_time_iteration': True}).feedback(self.x0)
+
+
+class TestShiftedWarmStart(CartPoleTestCase):
+    def test_shift_horizon(self) -> None:
+        """
+
+        :return:
+        """
+        vector = ca.DM([10, 0, 1, 2, 3, 4, 5, 6])
+        shifted = NMPC._shift_horizon(vector, [[[1], [2], [3]], [[4, 5], [6, 7]]])
+        np.testing.assert_allclose(shifted, ca.DM([10, 1, 2, 2, 5, 6, 5, 6]))
+
+    def test_closed_loop(self) -> None:
+        """
+
+        :return:
+        """
+        for method in ['rk4', 'collocation']:
+            with self.subTest(integration_method=method):
+                nmpc = self._get_nmpc({'integration_method': method})
+                shift = self._get_nmpc({'integration_method': method, 'warm_start': 'shift'})
+
+                model = self.model.copy(setup=True)
+                model.set_initial_conditions(x0=self.x0)
+                x0 = self.x0
+                for k in range(5):
+                    u = nmpc.optimize(x0)
+                    u_shift = shift.optimize(x0)
+                    np.testing.assert_allclose(u_shift, u, rtol=1e-4, atol=1e-6)
+                    model.simulate(u=u)
+                    x0 = model.solution['x:f']
+
+                self.assertIsNotNone(shift._lam_x0)
+                self.assertEqual(shift._lam_g0.shape, shift._g_lb.shape)
+
+
+class TestMultiStart(CartPoleTestCase):
+    def test_parallel_runs(self) -> None:
+        """
+
+        :return:
+        """
+        nmpc = self._get_nmpc({'integration_method': 'rk4', 'print_level': 0})
+        parallel = self._get_nmpc({'integration_method': 'rk4', 'print_level': 0, 'n_jobs': 2})
+
+        u = nmpc.optimize(self.x0)
+        u_parallel = parallel.optimize(self.x0, runs=4)
+        parallel.close()
+
+        np.testing.assert_allclose(u_parallel, u, rtol=1e-5)
+        self.assertEqual(parallel._solver_status_code, 1)
+
+    def test_close(self) -> None:
+        """
+
+        :return:
+        """
+        nmpc = self._get_nmpc({'integration_method': 'rk4', 'print_level': 0, 'n_jobs': 2})
+
+        nmpc.optimize(self.x0, runs=2)
+        finalizer = nmpc._multi_start_pool_finalizer
+        self.assertTrue(finalizer.alive)
+        nmpc.close()
+        self.assertFalse(finalizer.alive)
+        self.assertIsNone(nmpc._multi_start_pool)
+        nmpc.close()
+
+        # A new pool is started by the next multi-start optimization
+        nmpc.optimize(self.x0, runs=2)
+        self.assertIsNotNone(nmpc._multi_start_pool)
+        nmpc.close()
+
+    def test_n_jobs(self) -> None:
+        """
+
+        :return:
+        """
+        nmpc = self._get_nmpc({'integration_method': 'rk4', 'print_level': 0, 'n_jobs': None})
+        self.assertEqual(nmpc._nlp_options['n_jobs'], 1)
+        nmpc.optimize(self.x0, runs=2)
+        self.assertIsNone(nmpc._multi_start_pool)
+
+        with self.assertRaises(ValueError):
+            self._get_nmpc({'integration_method': 'rk4', 'print_level': 0, 'n_jobs': 0})
+        with self.assertRaises(TypeError):
+            self._get_nmpc({'integration_method': 'rk4', 'print_level': 0, 'n_jobs': 2.})
+
+    def test_early_exit(self) -> None:
+        """
+
+        :return:
+        """
+        nmpc = self._get_nmpc({'integration_method': 'rk4', 'print_level': 0, 'multi_start_tol': np.inf})
+
+        calls = []
+        solver = nmpc._solver
+
+        class Solver:
+            def __call__(self, **kwargs):
+                calls.append(kwargs)
+                return solver(**kwargs)
+
+            @staticmethod
+            def stats():
+                return solver.stats()
+
+        nmpc._solver = Solver()
+        nmpc.optimize(self.x0, runs=5)
+        self.assertEqual(len(calls), 1)
+
+    def test_early_exit_parallel_runs(self) -> None:
+        """
+
+        :return:
+        """
+        nmpc = self._get_nmpc({'integration_method': 'rk4', 'print_level': 0, 'n_jobs': 2, 'multi_start_tol': np.inf})
+        v0 = ca.DM.ones(nmpc._n_v)
+
+        # Both workers are still busy with the perturbed runs after the early exit, which would delay the next call by
+        # the duration of these runs, if the pool was not replaced
+        with mock.patch('hilo_mpc.modules.optimizer._solve_in_worker', solve_slowly):
+            nmpc._multi_start(v0, 3, None)
+            self.assertIsNone(nmpc._multi_start_pool)
+            start = time.perf_counter()
+            nmpc._multi_start(v0, 3, None)
+            self.assertLess(time.perf_counter() - start, 2.5)
+        nmpc.close()
+
+
+def solve_slowly(args):
+    """
+    Replaces the solver in the worker processes of the multi-start optimization. Only the run from the unperturbed
+    initial guess of ones returns immediately, all other runs take 5 seconds.
+
+    :param args:
+    :return:
+    """
+    if not np.all(np.asarray(args['x0']) == 1.):
+        time.sleep(5.)
+    return {'f': ca.DM(0.), 'x': args['x0']}, {'success': True}
@@ -3,6 +3,7 @@ from unittest import TestCase
 import numpy as np
 
 from hilo_mpc import Model, PF
+from hilo_mpc.modules.estimator.pf import RESAMPLING
 
 
 class TestParticleFilterInitialization(TestCase):
@@ -418,3 +419,317 @@ class TestParticleFilterEstimation(TestCase):
     #
     #     pf.estimate(y=[300.941, .245805], u=.01)
     #     # TODO: Finish once bugs are fixed
+
+
+class TestParticleFilterParallelization(TestCase):
+    """"""
+    def setUp(self) -> None:
+        """
+
+        :return:
+        """
+        model = Model(plot_backend='bokeh')
+        equations = """
+        dx_1/dt = -a_1*x_1(t) + b_1*r
+        dx_2/dt = -a_2*x_2(t) + b_2*r + g*u(k)
+        y(k) = x_2(t)
+        r = (1 - x_1(t))*exp(-E/(1 + x_2(t)))
+        """
+        model.set_equations(equations=equations)
+
+        self.model = model
+
+    def _estimate(self, model, **kwargs):
+        """
+
+        :param model:
+        :param kwargs:
+        :return:
+        """
+        np.random.seed(0)
+        pf = PF(model, plot_backend='bokeh')
+        pf.setup(n_samples=200, **kwargs)
+        pf.R = .01
+        pf.Q = [.001, .001]
+        pf.set_initial_guess([.1, .1], P0=[.01, .01])
+        pf.set_initial_parameter_values([.5, .3, 2., .5, .2, .1])
+
+        for y in [.0951, .0905, .0861]:
+            pf.estimate(y=y, u=0.)
+
+        return pf.solution.get_by_id('x')
+
+    def test_particle_filter_parallelization(self) -> None:
+        """
+
+        :return:
+        """
+        model = self.model
+        model.discretize('rk4', inplace=True)
+        model.setup(dt=.1)
+
+        x = self._estimate(model)
+        for parallelization in ['thread', 'openmp', 'numpy']:
+            with self.subTest(parallelization=parallelization):
+                np.testing.assert_allclose(self._estimate(model, parallelization=parallelization), x)
+
+    def test_particle_filter_multiple_steps(self) -> None:
+        """
+
+        :return:
+        """
+        model = self.model
+        model.discretize('rk4', inplace=True)
+        model.setup(dt=.1)
+
+        for parallelization in ['serial', 'numpy']:
+            with self.subTest(parallelization=parallelization):
+                x = self._estimate(model, parallelization=parallelization)
+
+                np.random.seed(0)
+                pf = PF(model, plot_backend='bokeh')
+                pf.setup(n_samples=200, parallelization=parallelization)
+                pf.R = .01
+                pf.Q = [.001, .001]
+                pf.set_initial_guess([.1, .1], P0=[.01, .01])
+                pf.set_initial_parameter_values([.5, .3, 2., .5, .2, .1])
+                pf.estimate(y=np.array([[.0951, .0905, .0861]]), u=0., steps=3)
+
+                np.testing.assert_allclose(pf.solution.get_by_id('x'), x)
+                np.testing.assert_allclose(pf.solution.get_by_id('t'), [[0., .1, .2, .3]])
+                self.assertEqual(pf.solution.get_by_id('X').shape, (400, 4))
+
+    def test_particle_filter_numpy_continuous_model(self) -> None:
+        """
+
+        :return:
+        """
+        model = self.model
+        model.setup(dt=.1)
+
+        pf = PF(model, plot_backend='bokeh')
+        with self.assertRaises(ValueError) as context:
+            pf.setup(parallelization='numpy')
+        self.assertEqual(str(context.exception), "The evaluation of the particle propagation with NumPy is only "
+                                                 "available for discrete-time models")
+
+    def test_particle_filter_parallelization_not_recognized(self) -> None:
+        """
+
+        :return:
+        """
+        model = self.model
+        model.setup(dt=.1)
+
+        pf = PF(model, plot_backend='bokeh')
+        with self.assertRaises(ValueError) as context:
+            pf.setup(parallelization='gpu')
+        self.assertEqual(str(context.exception), "Parallelization 'gpu' not recognized. Choose one of 'serial', "
+                                                 "'openmp', 'thread' or 'numpy'.")
+
+
+class TestParticleFilterResampling(TestCase):
+    """"""
+    def setUp(self) -> None:
+        """
+
+        :return:
+        """
+        model = Model(plot_backend='bokeh', discrete=True)
+        model.set_dynamical_states('x')
+        model.set_measurements('y')
+        model.set_dynamical_equations('x/2 + 25*dt*x/(1 + x^2)')
+        model.set_measurement_equations('x^2/20')
+        model.setup(dt=1.)
+
+        self.model = model
+        self.weights = np.random.default_rng(0).random(1000)
+        self.weights /= self.weights.sum()
+
+    def test_particle_filter_resampling_schemes(self) -> None:
+        """
+
+        :return:
+        """
+        weights = self.weights
+        n = weights.size
+        for scheme, resample in RESAMPLING.items():
+            with self.subTest(resampling=scheme):
+                ind = resample(weights)
+                self.assertEqual(ind.shape, (n, ))
+                self.assertTrue(np.all(np.diff(ind) >= 0) or scheme == 'multinomial')
+                counts = np.bincount(ind, minlength=n)
+                if scheme in ['systematic', 'residual']:
+                    # Every particle is copied at least floor(n*w) times
+                    self.assertTrue(np.all(counts >= np.floor(n * weights)))
+                if scheme == 'systematic':
+                    self.assertTrue(np.all(counts <= np.ceil(n * weights)))
+
+    def test_particle_filter_resampling_not_recognized(self) -> None:
+        """
+
+        :return:
+        """
+        with self.assertRaises(ValueError) as context:
+            PF(self.model, plot_backend='bokeh', resampling='optimal')
+        self.assertEqual(str(context.exception), "Resampling scheme 'optimal' not recognized. Choose one of "
+                                                 "'multinomial', 'systematic', 'stratified' or 'residual'.")
+
+        with self.assertRaises(ValueError) as context:
+            PF(self.model, plot_backend='bokeh', resampling_threshold=2.)
+        self.assertEqual(str(context.exception), "The resampling threshold needs to be a fraction of the sample size "
+                                                 "between 0 and 1")
+
+    def test_particle_filter_effective_sample_size(self) -> None:
+        """
+
+        :return:
+        """
+        np.random.seed(0)
+        pf = PF(self.model, plot_backend='bokeh', resampling='systematic', resampling_threshold=0.)
+        pf.setup(n_samples=100)
+        pf.R = 1.
+        pf.Q = 1.
+        pf.set_initial_guess(.1)
+
+        # The effective sample size never drops below zero, so the particles are weighted but never resampled
+        pf.estimate(y=.5)
+        X = pf.solution.get_by_id('X:f').full().flatten()
+        weights = pf._weights
+        self.assertIsNotNone(weights)
+        self.assertAlmostEqual(weights.sum(), 1.)
+        np.testing.assert_allclose(pf.solution.get_by_id('x:f'), X @ weights)
+
+        pf.resampling_threshold = 1.
+        pf.estimate(y=.5)
+        self.assertIsNone(pf._weights)
+
+
+class TestParticleFilterLikelihood(TestCase):
+    """"""
+    def setUp(self) -> None:
+        """
+
+        :return:
+        """
+        model = Model(plot_backend='bokeh', discrete=True)
+        model.set_dynamical_states('x_1', 'x_2')
+        model.set_measurements('y_1', 'y_2')
+        model.set_dynamical_equations(['x_1 + dt*x_2', '0.9*x_2'])
+        model.set_measurement_equations(['x_1', 'x_1 + x_2'])
+        model.setup(dt=.1)
+
+        self.model = model
+
+    def test_particle_filter_likelihood_full_covariance(self) -> None:
+        """
+
+        :return:
+        """
+        from scipy.stats import multivariate_normal
+
+        pf = PF(self.model, plot_backend='bokeh')
+        pf.setup(n_samples=50)
+
+        rng = np.random.default_rng(0)
+        y = np.array([.5, -.2])
+        Y = rng.standard_normal((2, 50))
+        R = np.array([[1., .6], [.6, 2.]])
+
+        log_pdf = multivariate_normal.logpdf(Y.T, mean=y, cov=R)
+        q = np.exp(log_pdf - log_pdf.max())
+        q /= q.sum()
+
+        update = pf._update_function(y=y, Y=Y, R=R)
+        np.testing.assert_allclose(update['q'].full().flatten(), q)
+        np.testing.assert_allclose(update['log_q'].full().flatten(), np.log(q))
+
+    def test_particle_filter_likelihood_underflow(self) -> None:
+        """
+
+        :return:
+        """
+        np.random.seed(0)
+        pf = PF(self.model, plot_backend='bokeh')
+        pf.setup(n_samples=100)
+        pf.R = [1e-4, 1e-4]
+        pf.Q = [.01, .01]
+        pf.set_initial_guess([0., 0.], P0=[.01, .01])
+
+        # All likelihoods underflow in the linear domain for a measurement this far away from the particles
+        pf.estimate(y=[10., 10.])
+        self.assertTrue(np.all(np.isfinite(pf.solution.get_by_id('x:f'))))
+        self.assertTrue(np.all(np.isfinite(pf.solution.get_by_id('X:f'))))
+
+
+class TestParticleFilterPriorEditing(TestCase):
+    """"""
+    def setUp(self) -> None:
+        """
+
+        :return:
+        """
+        model = Model(plot_backend='bokeh', discrete=True)
+        model.set_dynamical_states('x')
+        model.set_measurements('y')
+        model.set_dynamical_equations('x/2 + 25*dt*x/(1 + x^2)')
+        model.set_measurement_equations('x^2/20')
+        model.setup(dt=1.)
+
+        self.model = model
+
+    def _get_pf(self, max_retries=None):
+        """
+
+        :param max_retries:
+        :return:
+        """
+        np.random.seed(0)
+        pf = PF(self.model, plot_backend='bokeh', prior_editing=True, max_retries=max_retries)
+        pf.setup(n_samples=100)
+        pf.R = .1
+        pf.Q = .1
+        pf.set_initial_guess(1., P0=1.)
+
+        calls = []
+        function = pf._function
+        propagation = pf._propagation_function
+
+        def count_function(**kwargs):
+            calls.append(('function', kwargs['X'].shape[1]))
+            return function(**kwargs)
+
+        def count_propagation(X, p):
+            calls.append(('propagation', X.shape[1]))
+            return propagation(X, p)
+
+        pf._function = count_function
+        pf._propagation_function = count_propagation
+
+        return pf, calls
+
+    def test_particle_filter_prior_editing_offending_particles(self) -> None:
+        """
+
+        :return:
+        """
+        pf, calls = self._get_pf()
+        pf.estimate(y=.2)
+
+        # The full propagation is only evaluated once, afterwards only the offending particles are propagated again
+        self.assertEqual(calls[0], ('function', 100))
+        self.assertGreater(len(calls), 1)
+        self.assertTrue(all(call[0] == 'propagation' and call[1] < 100 for call in calls[1:]))
+        self.assertLessEqual(len(calls) - 1, 5)
+        self.assertTrue(np.all(np.isfinite(pf.solution.get_by_id('x:f'))))
+
+    def test_particle_filter_prior_editing_max_retries(self) -> None:
+        """
+
+        :return:
+        """
+        # No particle can reach a measurement this far off, so prior editing stops after the maximum number of retries
+        pf, calls = self._get_pf(max_retries=3)
+        pf.estimate(y=1e6)
+        self.assertEqual(len(calls), 4)
+        self.assertTrue(np.all(np.isfinite(pf.solution.get_by_id('x:f'))))
@@ -1,4 +1,8 @@
-from unittest import TestCase, skip
+import os
+import platform
+import shutil
+from tempfile import TemporaryDirectory
+from unittest import TestCase, skip, skipUnless
 
 import casadi as ca
 import numpy as np
@@ -752,3 +756,133 @@ class TestDAESystem(TestCase):
             self.model.setup(dt=1.)
         self.assertEqual("Only algebraic equations were supplied for the DAE system. ODE's are still missing.",
                          str(context.exception))
+
+
+class TestBatchSimulation(TestCase):
+    """"""
+    def setUp(self) -> None:
+        """
+
+        :return:
+        """
+        model = Model(plot_backend='bokeh')
+        model.A = np.array([[-1., 0.], [1., -2.]])
+        model.B = np.array([[1.], [0.]])
+        model.setup(dt=.1)
+
+        self.model = model
+
+    def test_batch_matches_sequential_simulation(self) -> None:
+        """
+
+        :return:
+        """
+        x0 = np.array([[1., 0., -1.], [0., 2., .5]])
+        u = np.array([[.5, -.5, 1.]])
+
+        x = self.model.simulate_batch(x0, u=u, steps=4)
+        self.assertEqual(x.shape, (2, 5, 3))
+        # Solution object must not be touched by the batched simulation
+        self.assertTrue(self.model.solution.get_by_id('x').is_empty())
+
+        for k in range(3):
+            self.model.reset_solution(keep_initial_conditions=False)
+            self.model.set_initial_conditions(x0[:, k])
+            self.model.simulate(u=u[:, k], steps=4)
+            np.testing.assert_allclose(self.model.solution.get_by_id('x'), x[:, :, k])
+
+    def test_batch_time_varying_inputs(self) -> None:
+        """
+
+        :return:
+        """
+        x0 = np.array([[1., 0.], [0., 2.]])
+        u = np.random.randn(1, 3, 2)
+
+        x_serial = self.model.simulate_batch(x0, u=u, steps=3)
+        x_thread = self.model.simulate_batch(x0, u=u, steps=3, parallelization='thread', n_threads=2)
+        np.testing.assert_allclose(x_serial, x_thread)
+
+        self.model.reset_solution(keep_initial_conditions=False)
+        self.model.set_initial_conditions(x0[:, 1])
+        self.model.simulate(u=u[:, :, 1], steps=3)
+        np.testing.assert_allclose(self.model.solution.get_by_id('x'), x_serial[:, :, 1])
+
+    def test_batch_wrong_parallelization(self) -> None:
+        """
+
+        :return:
+        """
+        with self.assertRaises(ValueError) as context:
+            self.model.simulate_batch(np.zeros((2, 2)), u=np.zeros((1, 2)), parallelization='gpu')
+        self.assertEqual("Parallelization mode 'gpu' not recognized. Choose one of 'serial', 'openmp' or 'thread'.",
+                         str(context.exception))
+
+
+@skipUnless(platform.system() == 'Linux' and shutil.which('gcc') is not None, "Requires gcc on Linux")
+class TestCompiledFunctionCache(TestCase):
+    """"""
+    def setUp(self) -> None:
+        """
+
+        :return:
+        """
+        self.cache = TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        """
+
+        :return:
+        """
+        self.cache.cleanup()
+
+    @staticmethod
+    def _get_model() -> Model:
+        """
+
+        :return:
+        """
+        model = Model(discrete=True, plot_backend='bokeh')
+        model.A = np.array([[.9, .1], [0., .8]])
+        model.B = np.array([[0.], [.1]])
+        return model
+
+    def test_cache_is_reused(self) -> None:
+        """
+
+        :return:
+        """
+        model = self._get_model()
+        model.setup(dt=1., c_code=True, cache=self.cache.name)
+        self.assertEqual(model._function.class_name(), 'External')
+
+        entries = os.listdir(self.cache.name)
+        self.assertEqual(len(entries), 1)
+        library = os.path.join(self.cache.name, entries[0], 'model.so')
+        modified = os.path.getmtime(library)
+
+        other = self._get_model()
+        other.setup(dt=1., c_code=True, cache=self.cache.name)
+        self.assertEqual(os.listdir(self.cache.name), entries)
+        self.assertEqual(os.path.getmtime(library), modified)
+
+        reference = self._get_model()
+        reference.setup(dt=1.)
+        for mod in [model, other, reference]:
+            mod.set_initial_conditions([1., 1.])
+            mod.simulate(u=1., steps=3)
+        np.testing.assert_allclose(other.solution.get_by_id('x'), reference.solution.get_by_id('x'))
+        np.testing.assert_allclose(model.solution.get_by_id('x'), reference.solution.get_by_id('x'))
+
+    def test_cache_key_changes_with_equations(self) -> None:
+        """
+
+        :return:
+        """
+        model = self._get_model()
+        model.setup(dt=1., c_code=True, cache=self.cache.name)
+
+        other = self._get_model()
+        other.A = np.array([[.5, .1], [0., .8]])
+        other.setup(dt=1., c_code=True, cache=self.cache.name)
+        self.assertEqual(len(os.listdir(self.cache.name)), 2)
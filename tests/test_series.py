@@ -0,0 +1,195 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import casadi as ca
+import numpy as np
+
+from hilo_mpc.modules.base import TimeSeries
+
+
+class TestTimeSeriesCapacity(TestCase):
+    """"""
+    def setUp(self) -> None:
+        """
+
+        :return:
+        """
+        series = TimeSeries(backend='bokeh', capacity=2)
+        vector = {
+            't': {'values_or_names': ['t'], 'shape': (1, 0), 'data_format': ca.DM},
+            'x': {'values_or_names': ['x_1', 'x_2'], 'shape': (2, 0), 'data_format': ca.DM}
+        }
+        series.setup('t', 'x', dt=1., **vector)
+
+        self.series = series
+
+    def test_append_beyond_capacity(self) -> None:
+        """
+
+        :return:
+        """
+        x = np.random.randn(2, 7)
+        for k in range(7):
+            self.series.add('t', float(k))
+            self.series.add('x', x[:, k])
+
+        self.assertEqual(self.series.capacity, 2)
+        self.assertEqual(self.series.n_samples, 7)
+        self.assertFalse(self.series.is_empty('x'))
+        np.testing.assert_allclose(self.series.get_by_id('x'), x)
+        np.testing.assert_allclose(self.series.get_by_id('x:0'), x[:, :1])
+        np.testing.assert_allclose(self.series.get_by_id('x:f'), x[:, -1:])
+        np.testing.assert_allclose(self.series.get_by_name('x_2'), x[1:, :])
+
+        args = self.series.get_function_args(steps=3)
+        np.testing.assert_allclose(args['x0'], x[:, -1:])
+        np.testing.assert_allclose(args['t0'], 6.)
+
+    def test_remove_after_append(self) -> None:
+        """
+
+        :return:
+        """
+        x = np.random.randn(2, 5)
+        self.series.add('x', x)
+        self.series.remove('x', slice(1, None))
+        np.testing.assert_allclose(self.series.get_by_id('x'), x[:, :1])
+
+        self.series.add('x', x[:, 1:3])
+        np.testing.assert_allclose(self.series.get_by_id('x'), x[:, :3])
+
+    def test_wrong_capacity(self) -> None:
+        """
+
+        :return:
+        """
+        with self.assertRaises(ValueError) as context:
+            self.series.capacity = 0
+        self.assertEqual("The capacity needs to be a positive integer", str(context.exception))
+
+    def test_disable_capacity(self) -> None:
+        """
+
+        :return:
+        """
+        x = np.random.randn(2, 4)
+        self.series.add('x', x)
+        self.series.capacity = None
+        self.series.add('x', x)
+        np.testing.assert_allclose(self.series.get_by_id('x'), np.hstack([x, x]))
+
+
+class TestTimeSeriesRetention(TestCase):
+    """"""
+    def setUp(self) -> None:
+        """
+
+        :return:
+        """
+        series = TimeSeries(backend='bokeh')
+        vector = {
+            'x': {'values_or_names': ['x_1', 'x_2'], 'shape': (2, 0), 'data_format': ca.DM}
+        }
+        series.setup('x', dt=1., **vector)
+
+        self.series = series
+        self.x = np.arange(40.).reshape(2, 20)
+
+    def test_discard(self) -> None:
+        """
+
+        :return:
+        """
+        self.series.set_retention(5)
+        for k in range(20):
+            self.series.add('x', self.x[:, k])
+            self.assertLessEqual(self.series.n_samples, 5)
+
+        np.testing.assert_allclose(self.series.get_by_id('x'), self.x[:, -5:])
+        np.testing.assert_allclose(self.series.get_by_id('x:0'), self.x[:, 15:16])
+        self.assertTrue(self.series.get_archive('x').is_empty())
+
+    def test_downsample(self) -> None:
+        """
+
+        :return:
+        """
+        self.series.set_retention(5, policy='downsample', downsampling=3)
+        for k in range(20):
+            self.series.add('x', self.x[:, k])
+
+        np.testing.assert_allclose(self.series.get_by_id('x'), self.x[:, -5:])
+        # Evicted samples 0, ..., 14, from which every third sample is archived
+        np.testing.assert_allclose(self.series.get_archive('x'), self.x[:, [0, 3, 6, 9, 12]])
+
+    def test_spill(self) -> None:
+        """
+
+        :return:
+        """
+        with TemporaryDirectory() as path:
+            self.series.set_retention(5, policy='spill', path=path)
+            for k in range(20):
+                self.series.add('x', self.x[:, k])
+
+            np.testing.assert_allclose(self.series.get_by_id('x'), self.x[:, -5:])
+            np.testing.assert_allclose(self.series.get_archive('x'), self.x[:, :15])
+
+    def test_spill_file(self) -> None:
+        """
+
+        :return:
+        """
+        with TemporaryDirectory() as path:
+            spill_file = os.path.join(path, 'run_x.bin')
+            # Leftover samples of a previous run are not mixed with the new ones
+            self.x[:, :3].T.tofile(spill_file)
+            self.series.set_retention(5, policy='spill', path=path, prefix='run')
+            for k in range(10):
+                self.series.add('x', self.x[:, k])
+            np.testing.assert_allclose(self.series.get_archive('x'), self.x[:, :5])
+
+            self.series.set_retention(None)
+            self.assertFalse(os.path.isfile(spill_file))
+
+    def test_aligned_entries(self) -> None:
+        """
+
+        :return:
+        """
+        series = TimeSeries(backend='bokeh')
+        vector = {
+            't': {'values_or_names': ['t'], 'shape': (1, 0), 'data_format': ca.DM},
+            'x': {'values_or_names': ['x_1', 'x_2'], 'shape': (2, 0), 'data_format': ca.DM},
+            'u': {'values_or_names': ['u'], 'shape': (1, 0), 'data_format': ca.DM}
+        }
+        series.setup('t', 'x', 'u', dt=1., **vector)
+        series.set_retention(5)
+
+        # The inputs lag the time and the states by one sample
+        series.add('t', 0.)
+        series.add('x', self.x[:, 0])
+        for k in range(1, 12):
+            series.add('u', float(k - 1))
+            series.add('t', float(k))
+            series.add('x', self.x[:, k])
+
+        np.testing.assert_allclose(series.get_by_id('t'), [[7., 8., 9., 10., 11.]])
+        np.testing.assert_allclose(series.get_by_id('x'), self.x[:, 7:12])
+        np.testing.assert_allclose(series.get_by_id('u'), [[7., 8., 9., 10.]])
+
+    def test_wrong_policy(self) -> None:
+        """
+
+        :return:
+        """
+        with self.assertRaises(ValueError) as context:
+            self.series.set_retention(5, policy='compress')
+        self.assertEqual("Retention policy 'compress' not recognized. Choose one of 'discard', 'downsample' or "
+                         "'spill'.", str(context.exception))
+
+        with self.assertRaises(ValueError) as context:
+            self.series.set_retention(5, policy='spill')
+        self.assertEqual("The retention policy 'spill' requires a directory supplied via the keyword 'path'",
+                         str(context.exception))
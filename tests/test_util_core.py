@@ -1,8 +1,9 @@
 import unittest
 
+import casadi as ca
 import numpy as np
 
-from hilo_mpc.util.util import check_and_wrap_to_list, scale_vector
+from hilo_mpc.util.util import check_and_wrap_to_list, scale_vector, vectorize_sx_function
 
 
 class MyTestCase(unittest.TestCase):
@@ -51,5 +52,17 @@ class MyTestCase(unittest.TestCase):
         scaler = [10, 10, 10, 10]
         self.assertRaises(ValueError, scale_vector, a, scaler)
 
+    def test_vectorize_sx_function(self):
+        x = ca.SX.sym('x', 2)
+        p = ca.SX.sym('p')
+        f = ca.Function('f', [x, p], [ca.vertcat(x[0] * ca.sin(x[1]) + p ** 2, ca.fmax(x[0], p)), ca.exp(-x[1]), 4.])
+        vectorized = vectorize_sx_function(f)
+
+        X = np.random.randn(2, 50)
+        for out, ref in zip(vectorized(X, .3), f.map(50)(X, .3)):
+            np.testing.assert_allclose(out, ref)
+
+        self.assertRaises(TypeError, vectorize_sx_function, f.wrap())
+
     if __name__ == '__main__':
         unittest.main()